@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Q
+from .fulltext import get_backend
 from .models import ResearchPaper, SearchQuery
 
 
@@ -6,8 +8,19 @@ from .models import ResearchPaper, SearchQuery
 class ResearchPaperAdmin(admin.ModelAdmin):
     list_display = ['title', 'uploaded_at', 'processed', 'page_count', 'word_count']
     list_filter = ['processed', 'uploaded_at']
-    search_fields = ['title', 'full_text']
+    search_fields = ['title']
     readonly_fields = ['id', 'uploaded_at']
+    
+    def get_search_results(self, request, queryset, search_term):
+        # The body is stored compressed, so it is matched through the database full-text index
+        backend = get_backend()
+        if backend is None or not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        condition = Q(title__icontains=search_term)
+        matching = backend.matching(search_term)
+        if matching is not None:
+            condition |= Q(id__in=matching)
+        return queryset.filter(condition), False
 
 
 @admin.register(SearchQuery)
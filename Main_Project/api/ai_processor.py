@@ -1,15 +1,34 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 import re
 
+import numpy as np
+from scipy import sparse
+
+from .sections import SectionSegmenter
+
+
+# Function words carry no signal for sentence similarity
+SUMMARY_STOPWORDS = {
+    'the', 'and', 'for', 'are', 'was', 'were', 'with', 'that', 'this', 'from',
+    'which', 'have', 'has', 'been', 'not', 'but', 'can', 'our', 'their', 'these',
+    'those', 'also', 'its', 'into', 'than', 'then', 'there', 'such', 'using',
+}
+
 
 class AIProcessor:
     """AI-powered summarization and extraction using rule-based and pattern matching."""
     
+    # Bump when extract_key_insights changes so stored insights are recomputed
+    INSIGHTS_VERSION = 2
+    
     @staticmethod
-    def generate_summary(text: str, max_length: int = 500) -> str:
+    def generate_summary(text: str, max_length: int = 500, max_sentences: Optional[int] = None) -> str:
         """
         Generate a summary of the research paper text.
-        Uses extractive summarization approach.
+        Uses extractive summarization: sentences are ranked with TextRank and
+        the best ones are kept, in their original order, until the length
+        budget (`max_length` characters, at most `max_sentences` sentences)
+        is used up.
         """
         if not text or len(text) < 100:
             return "Unable to generate summary. Text too short."
@@ -21,46 +40,93 @@ class AIProcessor:
         if not sentences:
             return text[:max_length] + "..." if len(text) > max_length else text
         
-        # Simple scoring: prefer sentences with keywords, important terms
-        keywords = ['method', 'result', 'conclusion', 'objective', 'aim', 'study', 
-                   'research', 'analysis', 'findings', 'significant', 'important']
+        if max_sentences is None:
+            max_sentences = max(5, len(sentences) // 10)
         
-        scored_sentences = []
-        for i, sentence in enumerate(sentences):
-            score = 0
-            # Higher score for sentences with keywords
-            lower_sentence = sentence.lower()
-            for keyword in keywords:
-                if keyword in lower_sentence:
-                    score += 1
-            
-            # Prefer sentences from introduction and conclusion sections
-            if i < len(sentences) * 0.1 or i > len(sentences) * 0.9:
-                score += 0.5
-            
-            # Prefer longer sentences (but not too long)
-            if 30 < len(sentence) < 200:
-                score += 0.5
-            
-            scored_sentences.append((score, sentence))
+        ranks = AIProcessor.textrank(sentences)
         
-        # Sort by score and take top sentences
-        scored_sentences.sort(key=lambda x: x[0], reverse=True)
-        summary_sentences = scored_sentences[:max(5, len(sentences) // 10)]
-        summary_sentences.sort(key=lambda x: sentences.index(x[1]))  # Maintain order
+        # Take the best-ranked sentences that still fit in the budget
+        chosen = []
+        used = 0
+        for i in np.argsort(-ranks, kind='stable'):
+            cost = len(sentences[i]) + 2  # '. ' separator
+            if chosen and used + cost > max_length:
+                continue
+            chosen.append(i)
+            used += cost
+            if len(chosen) >= max_sentences or used >= max_length:
+                break
+        chosen.sort()  # Maintain order
         
-        summary = '. '.join([s[1] for s in summary_sentences])
+        summary = '. '.join(sentences[i] for i in chosen)
         
-        # If summary is too long, truncate
+        # If summary is too long, truncate (leaving room for the final '.')
         if len(summary) > max_length:
-            summary = summary[:max_length].rsplit('.', 1)[0] + '.'
+            summary = summary[:max_length - 1].rsplit('.', 1)[0] + '.'
         
         return summary or text[:max_length]
     
     @staticmethod
-    def extract_key_insights(text: str) -> Dict[str, any]:
+    def textrank(sentences: List[str], damping: float = 0.85,
+                 max_iter: int = 100, tol: float = 1e-6) -> np.ndarray:
+        """
+        TextRank score for each sentence over a cosine-similarity graph.
+        
+        Sentences are rows of an L2-normalized sparse sentence-term matrix X,
+        so the similarity matrix is X @ X.T. It is never materialized: each
+        power iteration applies it as X @ (X.T @ v), which keeps the cost
+        linear in the number of sentence-term entries.
+        """
+        n = len(sentences)
+        if n == 1:
+            return np.ones(1)
+        
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for i, sentence in enumerate(sentences):
+            for word in set(re.findall(r'[a-z0-9]+', sentence.lower())):
+                if len(word) > 2 and word not in SUMMARY_STOPWORDS:
+                    rows.append(i)
+                    cols.append(vocabulary.setdefault(word, len(vocabulary)))
+        
+        if not vocabulary:
+            return np.full(n, 1.0 / n)
+        
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(n, len(vocabulary))
+        )
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        matrix = sparse.diags(1.0 / norms) @ matrix
+        self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+        matrix_t = matrix.T.tocsr()
+        
+        def similarity_dot(v):
+            # (X X^T - diag) v: similarity to every other sentence
+            return matrix @ (matrix_t @ v) - self_similarity * v
+        
+        degree = similarity_dot(np.ones(n))
+        dangling = degree <= 1e-12
+        degree[dangling] = 1.0
+        
+        ranks = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            spread = ranks / degree
+            spread[dangling] = 0.0
+            new_ranks = (1 - damping) / n + damping * (
+                similarity_dot(spread) + ranks[dangling].sum() / n
+            )
+            if np.abs(new_ranks - ranks).sum() < tol:
+                ranks = new_ranks
+                break
+            ranks = new_ranks
+        return ranks
+    
+    @staticmethod
+    def extract_key_insights(text: str, sections: Optional[Dict[str, List[int]]] = None) -> Dict[str, any]:
         """
         Extract key insights, findings, and important information from the paper.
+        `sections` is the paper's stored section index; it is rebuilt if missing.
         """
         insights = {
             'main_findings': [],
@@ -73,17 +139,17 @@ class AIProcessor:
         if not text:
             return insights
         
+        if sections is None:
+            sections = SectionSegmenter.segment(text)
+        
         # Extract methodology section
-        method_match = re.search(r'(?i)(methodology|methods?|approach)[:\s]*\n(.*?)(?=\n\s*(results?|findings|discussion|conclusion))', 
-                                text, re.DOTALL)
-        if method_match:
-            insights['methodology'] = method_match.group(2).strip()[:1000]
+        method_text = SectionSegmenter.section_text(text, sections, 'methodology')
+        if method_text:
+            insights['methodology'] = method_text.strip()[:1000]
         
         # Extract conclusions
-        concl_match = re.search(r'(?i)(conclusion|conclusions?)[:\s]*\n(.*?)(?=\n\s*(references?|acknowledgment))', 
-                               text, re.DOTALL)
-        if concl_match:
-            concl_text = concl_match.group(2)
+        concl_text = SectionSegmenter.section_text(text, sections, 'conclusion')
+        if concl_text:
             concl_sentences = re.split(r'[.!?]+', concl_text)
             insights['conclusions'] = [s.strip() for s in concl_sentences if len(s.strip()) > 30][:5]
         
@@ -101,8 +167,8 @@ class AIProcessor:
         # Extract key claims (sentences with strong language)
         strong_words = ['significantly', 'important', 'demonstrates', 'proves', 
                        'shows', 'indicates', 'suggests', 'found that']
-        sentences = re.split(r'[.!?]+', text)
-        for sentence in sentences:
+        for match in re.finditer(r'[^.!?]+', text):
+            sentence = match.group(0)
             if any(word in sentence.lower() for word in strong_words) and len(sentence.strip()) > 30:
                 insights['key_claims'].append(sentence.strip()[:200])
                 if len(insights['key_claims']) >= 5:
@@ -0,0 +1,304 @@
+"""
+Batch ingest of many PDFs.
+
+Each paper's extraction, summary and insights (and the compression of its
+content) run in a worker process via `analyze_pdf`, which never touches
+the database. The parent writes finished papers in bulk every
+`batch_size` papers: pages, content rows and paper fields with one
+statement each, then the search indexes.
+
+This module imports no models at load time, so worker processes can
+import it without setting up Django.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import hashlib
+import multiprocessing
+import os
+import threading
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+from .ai_processor import AIProcessor
+from .pdf_processor import PDFProcessor
+from . import compression
+
+
+BATCH_SIZE = 25
+
+# Paper fields set from a worker's result
+RESULT_FIELDS = [
+    'title', 'keywords', 'authors', 'sections', 'insights', 'insights_version', 'page_count', 'word_count',
+]
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def analyze_pdf(path: str, filename: str, zdict: Optional[bytes]) -> Dict:
+    """Everything ingest derives from one PDF; runs in a worker process."""
+    pages = []
+    # Papers are already spread across processes, so pages are not
+    extracted = PDFProcessor.extract_text(path, workers=1, page_callback=lambda *page: pages.append(page))
+    full_text = extracted.get('full_text', '')
+    ai_processor = AIProcessor()
+    sections = extracted.get('sections', {})
+    content = {
+        'full_text': full_text,
+        'summary': ai_processor.generate_summary(full_text) if full_text else '',
+        'abstract': extracted.get('abstract', ''),
+        'references': extracted.get('references', []),
+    }
+    return {
+        'fields': {
+            'title': extracted.get('title', filename) or filename,
+            'keywords': extracted.get('keywords', []),
+            'authors': extracted.get('authors', []),
+            'sections': sections,
+            'insights': ai_processor.extract_key_insights(full_text, sections),
+            'insights_version': AIProcessor.INSIGHTS_VERSION,
+            'page_count': extracted.get('page_count', 0),
+            'word_count': extracted.get('word_count', 0),
+        },
+        'content': content,
+        'compressed': {name: compression.encode(value, zdict) for name, value in content.items()},
+        'pages': pages,
+    }
+
+
+def _new_pool(workers: int) -> ProcessPoolExecutor:
+    # spawn: this runs in server processes, which are unsafe to fork
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Process-wide pool of INGEST_BATCH_WORKERS worker processes, started on
+    first use and shared by later batches, so a request does not pay for
+    spawning interpreters.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = _new_pool(getattr(settings, 'INGEST_BATCH_WORKERS', None) or os.cpu_count() or 1)
+    return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken shared pool (a worker died), so the next batch starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def file_digest(fileobj) -> str:
+    hasher = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(64 * 1024), b''):
+        hasher.update(chunk)
+    fileobj.seek(0)
+    return hasher.hexdigest()
+
+
+def create_papers(sources: Iterable[Tuple[str, object]], reuse_unfinished: bool = False) -> List[Dict]:
+    """
+    Store PDFs and create queued papers for them, skipping files already
+    uploaded. `sources` yields (filename, binary file object) pairs.
+
+    Returns one entry per source: {'filename', 'paper'} for a new paper or
+    {'filename', 'existing'} for a duplicate. With `reuse_unfinished`, an
+    unprocessed, not failed paper with the same content (left by an
+    interrupted batch) is queued again instead of counted as a duplicate;
+    otherwise one whose job was lost (see `ingest.fail_stale`) is failed
+    and the file stored anew.
+    """
+    from .ingest import fail_stale
+    from .models import ResearchPaper
+
+    entries, new_papers, seen = [], [], {}
+    for filename, fileobj in sources:
+        content_hash = file_digest(fileobj)
+        if content_hash in seen:
+            entries.append({'filename': filename, 'existing': seen[content_hash]})
+            continue
+        if not reuse_unfinished:
+            fail_stale(ResearchPaper.objects.filter(content_hash=content_hash))
+        existing = ResearchPaper.objects.filter(content_hash=content_hash).exclude(
+            processing_stage=ResearchPaper.STAGE_FAILED
+        ).order_by('uploaded_at').first()
+        if existing is not None and not (reuse_unfinished and not existing.processed):
+            seen[content_hash] = existing
+            entries.append({'filename': filename, 'existing': existing})
+            continue
+        if existing is None:
+            name = get_valid_filename(os.path.basename(filename)) or 'paper.pdf'
+            existing = ResearchPaper(content_hash=content_hash, title=os.path.basename(filename)[:500])
+            existing.file.name = default_storage.save(f'papers/{name}', File(fileobj, name=name))
+            new_papers.append(existing)
+        seen[content_hash] = existing
+        entries.append({'filename': filename, 'paper': existing})
+
+    ResearchPaper.objects.bulk_create(new_papers)
+    return entries
+
+
+def ingest_batch(papers: List, workers: Optional[int] = None, batch_size: int = BATCH_SIZE,
+                 progress: Optional[Callable[[List[Tuple[object, Optional[str]]]], None]] = None) -> Dict[str, int]:
+    """
+    Process saved papers across a process pool: the shared one from
+    `get_pool`, or one of `workers` processes for this call only when
+    `workers` is given. Finished papers are written every
+    `batch_size` papers, after which `progress` is called with the
+    (paper, error) pairs just written; error is None on success.
+    Returns {'processed': n, 'failed': m}.
+    """
+    from .models import ContentDictionary, ResearchPaper
+
+    if not papers:
+        return {'processed': 0, 'failed': 0}
+    dictionary_id = ContentDictionary.latest_id()
+    zdict = ContentDictionary.data_for(dictionary_id)
+
+    ResearchPaper.objects.filter(pk__in=[paper.pk for paper in papers]).update(
+        processing_stage=ResearchPaper.STAGE_EXTRACTING, updated_at=timezone.now()
+    )
+
+    counts = {'processed': 0, 'failed': 0}
+    done: List[Tuple[object, Optional[Dict], Optional[str]]] = []
+
+    def flush():
+        written = _write_batch(done, dictionary_id)
+        for _, error in written:
+            counts['failed' if error else 'processed'] += 1
+        done.clear()
+        # Papers still in the pool are alive; keep them from looking stale
+        ResearchPaper.objects.filter(pk__in=[paper.pk for paper in futures.values()]).update(
+            updated_at=timezone.now()
+        )
+        if progress is not None:
+            progress(written)
+
+    pool = get_pool() if workers is None else _new_pool(max(1, min(workers, len(papers))))
+    try:
+        futures = {
+            pool.submit(analyze_pdf, paper.file.path, paper.title or os.path.basename(paper.file.name), zdict): paper
+            for paper in papers
+        }
+        for future in as_completed(futures):
+            paper = futures.pop(future)
+            try:
+                done.append((paper, future.result(), None))
+            except Exception as e:
+                print(f"Error processing paper {paper.pk}: {e}")
+                done.append((paper, None, f'Error processing PDF: {str(e)}'))
+                if isinstance(e, BrokenProcessPool) and workers is None:
+                    _discard_pool(pool)
+            if len(done) >= batch_size:
+                flush()
+    except BrokenProcessPool:
+        # Broken before this batch could submit to it
+        _discard_pool(pool)
+        raise
+    finally:
+        if workers is not None:
+            pool.shutdown()
+    if done:
+        flush()
+    return counts
+
+
+def submit(papers: List):
+    """Process saved papers on the background ingest pool."""
+    from .ingest import get_executor
+    return get_executor().submit(_run_job, [paper.pk for paper in papers])
+
+
+def _run_job(paper_ids) -> None:
+    from .models import ResearchPaper
+
+    close_old_connections()
+    try:
+        ingest_batch(list(ResearchPaper.objects.filter(pk__in=paper_ids)))
+    except Exception as e:
+        fail_unfinished(paper_ids, e)
+    finally:
+        close_old_connections()
+
+
+def fail_unfinished(paper_ids, error: Exception) -> None:
+    """Mark papers a crashed batch left unprocessed as failed, so re-uploads are not deduplicated against them."""
+    from .models import ResearchPaper
+
+    print(f"Error processing batch: {error}")
+    ResearchPaper.objects.filter(pk__in=paper_ids, processed=False).update(
+        processing_stage=ResearchPaper.STAGE_FAILED,
+        processing_error=f'Error processing batch: {str(error)}',
+        updated_at=timezone.now()
+    )
+
+
+def _write_batch(done, dictionary_id) -> List[Tuple[object, Optional[str]]]:
+    from .fulltext import get_backend
+    from .models import PaperContent, PaperPage, ResearchPaper
+    from .search_index import SearchIndex
+    from .vector_index import VectorIndex
+
+    succeeded = [(paper, result) for paper, result, error in done if error is None]
+    failed = [(paper, error) for paper, result, error in done if error is not None]
+
+    with transaction.atomic():
+        for paper, error in failed:
+            ResearchPaper.objects.filter(pk=paper.pk).update(
+                processing_stage=ResearchPaper.STAGE_FAILED, processing_error=error, updated_at=timezone.now()
+            )
+        if succeeded:
+            ids = [paper.pk for paper, _ in succeeded]
+            PaperPage.objects.filter(paper_id__in=ids).delete()
+            PaperPage.objects.bulk_create([
+                PaperPage(paper=paper, page_number=number, text=text, char_start=start, char_end=end)
+                for paper, result in succeeded
+                for number, text, start, end in result['pages']
+            ], batch_size=500)
+
+            PaperContent.objects.filter(paper_id__in=ids).delete()
+            PaperContent.objects.bulk_create([
+                PaperContent(paper=paper, dictionary_id=dictionary_id, **result['compressed'])
+                for paper, result in succeeded
+            ])
+
+            for paper, result in succeeded:
+                for field, value in result['fields'].items():
+                    setattr(paper, field, value)
+                paper.processing_stage = ResearchPaper.STAGE_INDEXING
+                # The indexes below read the content already in hand
+                paper.__dict__['_content'] = result['content']
+                paper.__dict__.pop('_content_changed', None)
+            papers = [paper for paper, _ in succeeded]
+            for paper in papers:
+                paper.updated_at = timezone.now()
+            ResearchPaper.objects.bulk_update(papers, RESULT_FIELDS + ['processing_stage', 'updated_at'])
+
+            for paper in papers:
+                SearchIndex.index_paper(paper)
+                VectorIndex.add_paper(paper)
+                paper.processed = True
+                paper.processing_stage = ResearchPaper.STAGE_DONE
+                paper.updated_at = timezone.now()
+            ResearchPaper.objects.bulk_update(papers, ['processed', 'processing_stage', 'updated_at'])
+
+            backend = get_backend()
+            if backend is not None:
+                backend.index_rows(
+                    backend.row(paper.pk, paper.title, paper.keywords, paper.abstract, paper.full_text)
+                    for paper in papers
+                )
+
+    return [(paper, None) for paper, _ in succeeded] + failed
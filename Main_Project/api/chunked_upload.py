@@ -0,0 +1,186 @@
+"""
+Resumable chunked uploads.
+
+A client opens an UploadSession, PUTs the file in order with the offset of
+each chunk, then finalizes it. Chunks stream straight into a partial file
+under MEDIA_ROOT/uploads/ and into a running SHA-256. The session's
+`received` offset only moves once a chunk is on disk, so an interrupted
+client resumes from the offset the status call reports.
+
+A chunk is written and acknowledged under an exclusive lock on the partial
+file, so a second request for the same session is turned away rather than
+writing over the first.
+
+The running hash lives in process memory. When a chunk lands on another
+worker (or after a restart) it is rebuilt from the bytes already on disk.
+
+Sessions untouched for CHUNKED_UPLOAD_EXPIRE_AFTER seconds are deleted with
+their partial files by `expire_stale`, which runs whenever an upload starts
+and from `manage.py expire_uploads`.
+"""
+
+import hashlib
+import os
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.text import get_valid_filename
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+PARTIAL_DIR = 'uploads'
+READ_SIZE = 64 * 1024
+
+_hashers: Dict[object, Tuple[int, object]] = {}
+_hashers_lock = threading.Lock()
+
+
+def partial_path(session) -> str:
+    return default_storage.path(f'{PARTIAL_DIR}/{session.id}.part')
+
+
+def create_partial(session) -> None:
+    path = partial_path(session)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    _remember(session.id, 0, hashlib.sha256())
+
+
+@contextmanager
+def exclusive(session):
+    """
+    Lock the session's partial file for one writer, across threads and
+    processes. Yields False, without waiting, if another request holds it.
+    """
+    with open(partial_path(session), 'rb') as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_chunk(session, stream, offset: int, length: int):
+    """
+    Write `length` bytes from `stream` at `offset` and drop anything past
+    them (left by an interrupted chunk). Call it holding `exclusive`.
+    Returns the hasher covering the file up to the end of the chunk; pass
+    it to `acknowledge` once the session offset is saved. Raises
+    ValueError if the body is short.
+    """
+    hasher = _hasher_at(session, offset)
+    with open(partial_path(session), 'r+b') as f:
+        f.seek(offset)
+        remaining = length
+        while remaining:
+            data = stream.read(min(READ_SIZE, remaining))
+            if not data:
+                break
+            f.write(data)
+            hasher.update(data)
+            remaining -= len(data)
+        f.truncate()
+    if remaining:
+        raise ValueError(f'Chunk ended {remaining} bytes before its Content-Length')
+    return hasher
+
+
+def acknowledge(session, offset: int, hasher) -> None:
+    _remember(session.id, offset, hasher)
+
+
+def digest(session) -> str:
+    """SHA-256 of the received file."""
+    return _hasher_at(session, session.received).hexdigest()
+
+
+def complete(session) -> str:
+    """Move the finished file into the papers directory; returns its storage name."""
+    filename = get_valid_filename(os.path.basename(session.filename)) or f'{session.id}.pdf'
+    name = default_storage.get_available_name(f'papers/{filename}')
+    target = default_storage.path(name)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(partial_path(session), target)
+    _forget(session.id)
+    return name
+
+
+def discard(session) -> None:
+    _forget(session.id)
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+
+
+def expire_stale() -> int:
+    """
+    Delete sessions idle for CHUNKED_UPLOAD_EXPIRE_AFTER seconds, with their
+    partial files, and drop cached hashes of sessions no longer open.
+    Returns the number of sessions deleted.
+    """
+    from .models import UploadSession
+
+    cutoff = timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_EXPIRE_AFTER)
+    stale = list(UploadSession.objects.filter(updated_at__lt=cutoff))
+    for session in stale:
+        if session.status == UploadSession.STATUS_OPEN:
+            discard(session)
+    # Deleted only if still idle, in case a client resumed meanwhile
+    deleted, _ = UploadSession.objects.filter(
+        id__in=[session.id for session in stale], updated_at__lt=cutoff
+    ).delete()
+
+    # Sessions finished or deleted by another process leave their hash here
+    with _hashers_lock:
+        cached = list(_hashers)
+    open_ids = set(UploadSession.objects.filter(
+        id__in=cached, status=UploadSession.STATUS_OPEN
+    ).values_list('id', flat=True))
+    for session_id in cached:
+        if session_id not in open_ids:
+            _forget(session_id)
+    return deleted
+
+
+def _hasher_at(session, offset: int):
+    with _hashers_lock:
+        cached = _hashers.get(session.id)
+    if cached is not None and cached[0] == offset:
+        # A copy, so a chunk that loses a race leaves the cached state intact
+        return cached[1].copy()
+    hasher = hashlib.sha256()
+    remaining = offset
+    with open(partial_path(session), 'rb') as f:
+        while remaining:
+            data = f.read(min(READ_SIZE, remaining))
+            if not data:
+                raise ValueError('Partial upload is shorter than its acknowledged offset')
+            hasher.update(data)
+            remaining -= len(data)
+    return hasher
+
+
+def _remember(session_id, offset: int, hasher) -> None:
+    with _hashers_lock:
+        _hashers[session_id] = (offset, hasher)
+
+
+def _forget(session_id) -> None:
+    with _hashers_lock:
+        _hashers.pop(session_id, None)
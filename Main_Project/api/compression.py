@@ -0,0 +1,104 @@
+"""
+Compression of large paper content (full text, summary, abstract, references).
+
+Each value is stored as its own zlib stream, optionally primed with a preset
+dictionary trained on the corpus (`manage.py train_content_dictionary`).
+Papers share most of their vocabulary and boilerplate ("in this paper",
+"et al.", journal names), so a dictionary lets even short values such as
+abstracts compress well. Values are independent, so reading one never
+decompresses another, and a prefix can be decompressed without the rest.
+"""
+
+import json
+import re
+import zlib
+from collections import Counter
+from typing import Iterable, Optional
+
+
+# zlib's window: the part of a dictionary a stream can reference
+DICTIONARY_SIZE = 32 * 1024
+
+LEVEL = 6
+
+# Training input is capped so it runs in bounded memory on any corpus
+SAMPLE_CHARS = 64 * 1024
+MAX_TRAINING_CHARS = 16 * 1024 * 1024
+
+_PHRASE_RE = re.compile(r'\S+\s+')
+
+
+def compress(text: str, zdict: Optional[bytes] = None) -> bytes:
+    if not text:
+        return b''
+    if zdict:
+        compressor = zlib.compressobj(LEVEL, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(LEVEL)
+    return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+
+def decompress(data: bytes, zdict: Optional[bytes] = None, max_chars: Optional[int] = None) -> str:
+    """Text of a compressed value; with `max_chars`, only that much is inflated."""
+    if not data:
+        return ''
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    if max_chars is None:
+        return (decompressor.decompress(bytes(data)) + decompressor.flush()).decode('utf-8')
+    # A character is at most 4 UTF-8 bytes; a cut mid-character is dropped
+    raw = decompressor.decompress(bytes(data), max_chars * 4)
+    return raw.decode('utf-8', errors='ignore')[:max_chars]
+
+
+def encode(value, zdict: Optional[bytes] = None) -> bytes:
+    """Compress a content value; lists and dicts are stored as JSON."""
+    if not isinstance(value, str):
+        value = json.dumps(value) if value else ''
+    return compress(value, zdict)
+
+
+def decode(data: bytes, zdict: Optional[bytes] = None, empty=str, max_chars: Optional[int] = None):
+    """Inverse of `encode`; `empty` is the type of the value (str, or list/dict for JSON)."""
+    text = decompress(data, zdict, max_chars)
+    if empty is str:
+        return text
+    return json.loads(text) if text else empty()
+
+
+def train_dictionary(samples: Iterable[str], size: int = DICTIONARY_SIZE) -> bytes:
+    """
+    Build a preset dictionary from sample texts.
+
+    Runs of one to four words are scored by how many bytes they would save
+    (occurrences x length); the best are concatenated up to `size` bytes,
+    most valuable last, since zlib encodes nearer matches more cheaply.
+    """
+    counts = Counter()
+    total = 0
+    for text in samples:
+        text = (text or '')[:SAMPLE_CHARS]
+        if not text:
+            continue
+        words = _PHRASE_RE.findall(text)
+        for n in (1, 2, 3, 4):
+            counts.update(''.join(words[i:i + n]) for i in range(len(words) - n + 1))
+        total += len(text)
+        if total >= MAX_TRAINING_CHARS:
+            break
+
+    ranked = sorted(
+        ((count * len(phrase), phrase) for phrase, count in counts.items() if count > 1 and len(phrase) > 3),
+        reverse=True
+    )
+    chosen, used, seen = [], 0, ''
+    for _, phrase in ranked:
+        encoded = phrase.encode('utf-8')
+        # A phrase already inside a chosen one adds nothing
+        if used + len(encoded) > size or phrase in seen:
+            continue
+        chosen.append(encoded)
+        seen += phrase
+        used += len(encoded)
+        if used >= size - 4:
+            break
+    return b''.join(reversed(chosen))
@@ -0,0 +1,315 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connection, transaction
+from django.db.models.expressions import RawSQL
+
+from . import compression
+from .search_index import FIELD_WEIGHTS, SearchIndex
+
+
+# Side table holding the full-text index of processed papers
+FTS_TABLE = 'api_paper_fts'
+
+# Maps the rowids of the contentless FTS5 table to papers
+DOCS_TABLE = 'api_paper_fts_docs'
+
+# Fields indexed, in index column order
+INDEXED_FIELDS = ('title', 'keywords', 'abstract', 'full_text')
+
+# PostgreSQL caps a tsvector at 1MB; index at most this much of the body
+PG_MAX_BODY_CHARS = 500000
+
+BATCH_SIZE = 200
+
+
+class FullTextBackend(ABC):
+    """
+    Database-native full-text index over ResearchPaper, kept in side
+    tables keyed by paper id. Papers are indexed from their decompressed
+    content on save; ranking runs entirely in SQL and queries return only
+    (paper_id, score) pairs.
+    """
+
+    vendor = ''
+    # Tables that must exist for the index to be used
+    tables: Tuple[str, ...] = (FTS_TABLE,)
+
+    @abstractmethod
+    def create(self, cursor) -> None:
+        """Create the index tables."""
+
+    @abstractmethod
+    def drop(self, cursor) -> None:
+        """Drop the index tables."""
+
+    def index(self, paper) -> None:
+        """Add or refresh a paper's entry; unprocessed papers are removed."""
+        if not paper.processed:
+            self.remove(paper.pk)
+            return
+        self.index_rows([self.row(paper.pk, *(getattr(paper, field) for field in INDEXED_FIELDS))])
+
+    @abstractmethod
+    def index_rows(self, rows) -> int:
+        """Write (db_id, title, keywords, abstract, full_text) rows from `row`; returns the count."""
+
+    @abstractmethod
+    def remove(self, paper_id) -> None:
+        """Drop a paper from the index."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Empty the index."""
+
+    def rebuild(self) -> int:
+        """Re-index every processed paper; returns the number indexed."""
+        from .models import ResearchPaper
+        papers = ResearchPaper.objects.filter(processed=True).select_related('content').only(
+            'id', 'title', 'keywords', 'processed', 'content'
+        )
+        count, batch = 0, []
+        with transaction.atomic():
+            self.clear()
+            for paper in papers.iterator(chunk_size=BATCH_SIZE):
+                batch.append(self.row(paper.pk, *(getattr(paper, field) for field in INDEXED_FIELDS)))
+                if len(batch) >= BATCH_SIZE:
+                    count += self.index_rows(batch)
+                    batch = []
+            count += self.index_rows(batch)
+        return count
+
+    def row(self, paper_id, title, keywords, abstract, full_text) -> tuple:
+        return (self._db_id(paper_id), title or '', ' '.join(keywords or []), abstract or '', full_text or '')
+
+    @abstractmethod
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """(paper_id, score) pairs for the query, best first."""
+
+    @abstractmethod
+    def matching(self, query: str) -> Optional[RawSQL]:
+        """Subquery of the ids of matching papers, for `id__in` filters; None if nothing can match."""
+
+    @staticmethod
+    def terms(query: str) -> List[str]:
+        # Same tokens as the BM25 index; alphanumeric only, so safe to splice into query syntax
+        return list(dict.fromkeys(SearchIndex.tokenize(query)))
+
+    @staticmethod
+    def _db_id(paper_id) -> str:
+        from .models import ResearchPaper
+        return ResearchPaper._meta.pk.get_db_prep_value(paper_id, connection)
+
+
+class SQLiteFTS5Backend(FullTextBackend):
+    """
+    Contentless FTS5 table ranked with its built-in BM25. It holds only the
+    index, not another copy of the (otherwise compressed) text; DOCS_TABLE
+    maps its rowids to papers.
+
+    A contentless row can only be deleted by re-supplying the values it
+    indexed, so DOCS_TABLE also keeps them, compressed. Re-indexing or
+    removing a paper deletes its old entry with them, which keeps the
+    index and its BM25 statistics exact.
+    """
+
+    vendor = 'sqlite'
+    tables = (FTS_TABLE, DOCS_TABLE)
+
+    def create(self, cursor) -> None:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{', '.join(INDEXED_FIELDS)}, content = '', "
+            f"tokenize = 'porter unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {DOCS_TABLE} ('
+            f'id integer NOT NULL PRIMARY KEY AUTOINCREMENT, paper_id char(32) NOT NULL UNIQUE, '
+            f"indexed blob NOT NULL DEFAULT x'')"
+        )
+
+    def drop(self, cursor) -> None:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        cursor.execute(f'DROP TABLE IF EXISTS {DOCS_TABLE}')
+
+    def index_rows(self, rows) -> int:
+        rows = list({row[0]: row for row in rows}.values())
+        if not rows:
+            return 0
+        columns = ', '.join(INDEXED_FIELDS)
+        with connection.cursor() as cursor:
+            indexed = self._indexed(cursor, [row[0] for row in rows])
+            for row in rows:
+                values = compression.encode(list(row[1:]))
+                if row[0] in indexed:
+                    # A paper keeps its rowid; only its entry is replaced
+                    rowid, old_values = indexed[row[0]]
+                    self._delete_entry(cursor, rowid, old_values)
+                    cursor.execute(f'UPDATE {DOCS_TABLE} SET indexed = %s WHERE id = %s', [values, rowid])
+                else:
+                    cursor.execute(f'INSERT INTO {DOCS_TABLE} (paper_id, indexed) VALUES (%s, %s)', [row[0], values])
+                    rowid = cursor.lastrowid
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (%s, %s, %s, %s, %s)', [rowid, *row[1:]]
+                )
+        return len(rows)
+
+    def remove(self, paper_id) -> None:
+        db_id = self._db_id(paper_id)
+        with connection.cursor() as cursor:
+            indexed = self._indexed(cursor, [db_id])
+            if db_id in indexed:
+                rowid, values = indexed[db_id]
+                self._delete_entry(cursor, rowid, values)
+                cursor.execute(f'DELETE FROM {DOCS_TABLE} WHERE id = %s', [rowid])
+
+    @staticmethod
+    def _indexed(cursor, db_ids) -> Dict[str, Tuple[int, bytes]]:
+        """paper db id -> (rowid, compressed indexed values) for papers in the index."""
+        indexed = {}
+        for start in range(0, len(db_ids), 500):
+            chunk = db_ids[start:start + 500]
+            cursor.execute(
+                f"SELECT paper_id, id, indexed FROM {DOCS_TABLE} WHERE paper_id IN ({', '.join(['%s'] * len(chunk))})",
+                chunk
+            )
+            indexed.update((paper_id, (rowid, values)) for paper_id, rowid, values in cursor.fetchall())
+        return indexed
+
+    @staticmethod
+    def _delete_entry(cursor, rowid: int, values: bytes) -> None:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {', '.join(INDEXED_FIELDS)}) "
+            f"VALUES ('delete', %s, %s, %s, %s, %s)",
+            [rowid, *compression.decode(values, empty=list)]
+        )
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('delete-all')")
+            cursor.execute(f'DELETE FROM {DOCS_TABLE}')
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        match = self._match_expression(query)
+        if match is None or top_k <= 0:
+            return []
+        # bm25() is lower-is-better; the weights follow the column order
+        weights = ', '.join(str(float(FIELD_WEIGHTS[field])) for field in INDEXED_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT docs.paper_id, -bm25({FTS_TABLE}, {weights}) AS score '
+                f'FROM {FTS_TABLE} JOIN {DOCS_TABLE} docs ON docs.id = {FTS_TABLE}.rowid '
+                f'WHERE {FTS_TABLE} MATCH %s ORDER BY score DESC LIMIT %s',
+                [match, top_k]
+            )
+            return [(_uuid_str(paper_id), score) for paper_id, score in cursor.fetchall()]
+
+    def matching(self, query: str) -> Optional[RawSQL]:
+        match = self._match_expression(query)
+        if match is None:
+            return None
+        return RawSQL(
+            f'SELECT paper_id FROM {DOCS_TABLE} WHERE id IN '
+            f'(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)',
+            [match]
+        )
+
+    def _match_expression(self, query: str) -> Optional[str]:
+        terms = self.terms(query)
+        if not terms:
+            return None
+        # Any term may match; BM25 ranks papers matching more of them higher
+        return ' OR '.join(f'"{term}"' for term in terms)
+
+
+class PostgresBackend(FullTextBackend):
+    """Weighted tsvector column with a GIN index, ranked with ts_rank_cd."""
+
+    vendor = 'postgresql'
+
+    # setweight labels in INDEXED_FIELDS order (title highest)
+    LABELS = {'title': 'A', 'keywords': 'B', 'abstract': 'C', 'full_text': 'D'}
+
+    def create(self, cursor) -> None:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} ('
+            f'paper_id uuid PRIMARY KEY REFERENCES api_researchpaper (id) ON DELETE CASCADE, '
+            f'document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document_idx ON {FTS_TABLE} USING GIN (document)')
+
+    def drop(self, cursor) -> None:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+    def index_rows(self, rows) -> int:
+        rows = [(*row[:-1], row[-1][:PG_MAX_BODY_CHARS]) for row in {row[0]: row for row in rows}.values()]
+        if not rows:
+            return 0
+        document = ' || '.join(
+            f"setweight(to_tsvector('english', %s), '{self.LABELS[field]}')" for field in INDEXED_FIELDS
+        )
+        with connection.cursor() as cursor:
+            # The row is replaced in place, so re-indexing leaves nothing behind
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (paper_id, document) VALUES (%s, {document}) '
+                f'ON CONFLICT (paper_id) DO UPDATE SET document = EXCLUDED.document',
+                rows
+            )
+        return len(rows)
+
+    def remove(self, paper_id) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE paper_id = %s', [self._db_id(paper_id)])
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        tsquery = self._tsquery(query)
+        if tsquery is None or top_k <= 0:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT paper_id, ts_rank_cd(document, q) AS score "
+                f"FROM {FTS_TABLE}, to_tsquery('english', %s) q "
+                f"WHERE document @@ q ORDER BY score DESC LIMIT %s",
+                [tsquery, top_k]
+            )
+            return [(str(paper_id), score) for paper_id, score in cursor.fetchall()]
+
+    def matching(self, query: str) -> Optional[RawSQL]:
+        tsquery = self._tsquery(query)
+        if tsquery is None:
+            return None
+        return RawSQL(
+            f"SELECT paper_id FROM {FTS_TABLE} WHERE document @@ to_tsquery('english', %s)", [tsquery]
+        )
+
+    def _tsquery(self, query: str) -> Optional[str]:
+        terms = self.terms(query)
+        return ' | '.join(terms) if terms else None
+
+
+BACKENDS: Dict[str, FullTextBackend] = {
+    backend.vendor: backend for backend in (SQLiteFTS5Backend(), PostgresBackend())
+}
+
+_available: Dict[str, bool] = {}
+
+
+def get_backend() -> Optional[FullTextBackend]:
+    """Backend for the default database, or None if it has no full-text index."""
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return None
+    # Only present tables are cached, so a later migrate is picked up without a restart
+    if not _available.get(connection.vendor):
+        _available[connection.vendor] = set(backend.tables) <= set(connection.introspection.table_names())
+    return backend if _available[connection.vendor] else None
+
+
+def _uuid_str(value) -> str:
+    # SQLite stores UUID primary keys as 32 hex digits
+    from uuid import UUID
+    return str(UUID(str(value)))
@@ -0,0 +1,186 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, List
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import PaperPage, ResearchPaper
+from .pdf_processor import PDFProcessor
+from .ai_processor import AIProcessor
+from .search_index import SearchIndex
+from .vector_index import VectorIndex
+from . import timing
+
+
+# Stages a paper moves through, in order
+PIPELINE_STAGES = [
+    ResearchPaper.STAGE_QUEUED,
+    ResearchPaper.STAGE_EXTRACTING,
+    ResearchPaper.STAGE_SUMMARIZING,
+    ResearchPaper.STAGE_INDEXING,
+    ResearchPaper.STAGE_DONE,
+]
+
+# Stages a paper stays in once its job has ended
+FINAL_STAGES = [ResearchPaper.STAGE_DONE, ResearchPaper.STAGE_FAILED]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class PageWriter:
+    """Persist extracted pages in small batches as they are produced."""
+
+    batch_size = 50
+
+    def __init__(self, paper: ResearchPaper):
+        self.paper = paper
+        self.buffer: List[PaperPage] = []
+        with timing.stage('db_pages'):
+            PaperPage.objects.filter(paper=paper).delete()
+
+    def add(self, page_number: int, text: str, char_start: int, char_end: int) -> None:
+        self.buffer.append(PaperPage(
+            paper=self.paper,
+            page_number=page_number,
+            text=text,
+            char_start=char_start,
+            char_end=char_end
+        ))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            with timing.stage('db_pages'):
+                PaperPage.objects.bulk_create(self.buffer)
+            self.buffer = []
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for background ingest jobs."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'INGEST_WORKERS', 2),
+                thread_name_prefix='ingest'
+            )
+    return _executor
+
+
+def set_stage(paper: ResearchPaper, stage: str) -> None:
+    paper.processing_stage = stage
+    ResearchPaper.objects.filter(pk=paper.pk).update(processing_stage=stage, updated_at=timezone.now())
+
+
+def fail_stale(papers: QuerySet) -> int:
+    """
+    Fail papers among `papers` whose stage has not changed for
+    INGEST_STALE_AFTER seconds. Jobs live in the memory of the process that
+    queued them, so such a paper's job was lost (e.g. to a restart) and
+    would otherwise stay "processing" forever. Returns the number failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'INGEST_STALE_AFTER', 3600))
+    return papers.filter(processed=False, updated_at__lt=cutoff).exclude(
+        processing_stage__in=FINAL_STAGES
+    ).update(
+        processing_stage=ResearchPaper.STAGE_FAILED,
+        processing_error='Processing was interrupted; upload the paper again',
+        updated_at=timezone.now()
+    )
+
+
+def process_paper(paper: ResearchPaper, filename: str) -> ResearchPaper:
+    """
+    Run the full ingest pipeline for a saved paper: text extraction,
+    summarization and indexing. Raises on failure.
+    """
+    set_stage(paper, ResearchPaper.STAGE_EXTRACTING)
+    processor = PDFProcessor()
+    page_writer = PageWriter(paper)
+    extracted_data = processor.extract_text(paper.file.path, page_callback=page_writer.add)
+    page_writer.flush()
+
+    # Store extracted data
+    paper.full_text = extracted_data.get('full_text', '')
+    paper.title = extracted_data.get('title', filename) or filename
+    paper.abstract = extracted_data.get('abstract', '')
+    paper.keywords = extracted_data.get('keywords', [])
+    paper.authors = extracted_data.get('authors', [])
+    paper.references = extracted_data.get('references', [])
+    paper.sections = extracted_data.get('sections', {})
+    paper.page_count = extracted_data.get('page_count', 0)
+    paper.word_count = extracted_data.get('word_count', 0)
+
+    # Generate AI summary
+    set_stage(paper, ResearchPaper.STAGE_SUMMARIZING)
+    ai_processor = AIProcessor()
+    if paper.full_text:
+        with timing.stage('summarize'):
+            paper.summary = ai_processor.generate_summary(paper.full_text)
+    with timing.stage('insights'):
+        paper.insights = ai_processor.extract_key_insights(paper.full_text, paper.sections)
+    paper.insights_version = AIProcessor.INSIGHTS_VERSION
+
+    paper.processing_stage = ResearchPaper.STAGE_INDEXING
+    with timing.stage('db_save'):
+        paper.save()
+
+    # Add to the search indexes
+    with timing.stage('search_index'):
+        SearchIndex.index_paper(paper)
+    with timing.stage('vector_index'):
+        VectorIndex.add_paper(paper)
+
+    paper.processed = True
+    paper.processing_stage = ResearchPaper.STAGE_DONE
+    with timing.stage('db_save'):
+        paper.save(update_fields=['processed', 'processing_stage'])
+    return paper
+
+
+def submit(paper: ResearchPaper, filename: str):
+    """Queue a saved paper for background processing."""
+    return get_executor().submit(_run_job, paper.pk, filename)
+
+
+def _run_job(paper_id, filename: str) -> None:
+    close_old_connections()
+    try:
+        paper = ResearchPaper.objects.get(pk=paper_id)
+        try:
+            process_paper(paper, filename)
+        except Exception as e:
+            print(f"Error processing paper {paper_id}: {e}")
+            SearchIndex.remove_paper(paper)
+            ResearchPaper.objects.filter(pk=paper_id).update(
+                processing_stage=ResearchPaper.STAGE_FAILED,
+                processing_error=f'Error processing PDF: {str(e)}',
+                updated_at=timezone.now()
+            )
+    finally:
+        close_old_connections()
+
+
+def stage_progress(stage: str) -> Dict[str, object]:
+    """Per-stage status for a paper that is still being processed."""
+    current = PIPELINE_STAGES.index(stage) if stage in PIPELINE_STAGES else 0
+    stages: List[Dict[str, str]] = []
+    for i, name in enumerate(PIPELINE_STAGES[1:-1], start=1):
+        if i < current:
+            state = 'complete'
+        elif i == current:
+            state = 'running'
+        else:
+            state = 'pending'
+        stages.append({'stage': name, 'status': state})
+    return {
+        'stage': stage,
+        'stages': stages,
+        'progress': int(100 * max(current - 1, 0) / (len(PIPELINE_STAGES) - 2)),
+    }
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import ResearchPaper
+from api.vector_index import VectorIndex
+
+
+class Command(BaseCommand):
+    help = 'Build the memory-mapped LSA vector index from all processed papers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dimensions', type=int, default=None,
+                            help='Number of latent dimensions (default: VECTOR_INDEX_DIMENSIONS)')
+
+    def handle(self, *args, **options):
+        papers = ResearchPaper.objects.filter(processed=True).select_related('content').only(
+            'id', 'title', 'content'
+        )
+        try:
+            count = VectorIndex.build(papers, dimensions=options['dimensions'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {count} papers into {VectorIndex.directory()}'
+        ))
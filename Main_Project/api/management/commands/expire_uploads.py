@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api import chunked_upload
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads idle for CHUNKED_UPLOAD_EXPIRE_AFTER seconds, with their partial files.'
+
+    def handle(self, *args, **options):
+        count = chunked_upload.expire_stale()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {count} expired uploads'))
@@ -0,0 +1,98 @@
+import json
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import batch_ingest
+
+
+class Command(BaseCommand):
+    help = (
+        'Ingest every PDF in a directory across a process pool. Progress is checkpointed, '
+        'so an interrupted run picks up where it stopped when run again.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Directory containing the PDFs')
+        parser.add_argument('--recursive', action='store_true', help='Include subdirectories')
+        parser.add_argument('--workers', type=int, default=None,
+                            help='Worker processes (default: INGEST_BATCH_WORKERS, or the CPU count)')
+        parser.add_argument('--batch-size', type=int, default=batch_ingest.BATCH_SIZE,
+                            help='Papers written to the database at a time')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <directory>/.ingest_checkpoint.json)')
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint')
+
+    def handle(self, *args, **options):
+        directory = Path(options['directory'])
+        if not directory.is_dir():
+            raise CommandError(f'{directory} is not a directory')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        checkpoint_path = Path(options['checkpoint'] or directory / '.ingest_checkpoint.json')
+
+        pattern = '**/*.pdf' if options['recursive'] else '*.pdf'
+        paths = sorted(path for path in directory.glob(pattern) if path.is_file())
+        checkpoint = {} if options['restart'] else self.load_checkpoint(checkpoint_path)
+        pending = [path for path in paths if str(path.relative_to(directory)) not in checkpoint]
+        self.stdout.write(f'{len(paths)} PDFs, {len(paths) - len(pending)} already done, {len(pending)} to ingest')
+
+        # Store the files and create queued papers; duplicates are settled here
+        entries = batch_ingest.create_papers(self.sources(pending, directory), reuse_unfinished=True)
+        papers, sources, copies = [], {}, {}
+        for entry in entries:
+            if 'paper' in entry:
+                papers.append(entry['paper'])
+                sources[entry['paper'].pk] = entry['filename']
+            elif entry['existing'].pk in sources:
+                # A copy of a file earlier in this run: done once that one is
+                copies.setdefault(entry['existing'].pk, []).append(entry['filename'])
+            else:
+                checkpoint[entry['filename']] = {'id': str(entry['existing'].pk), 'status': 'duplicate'}
+        self.save_checkpoint(checkpoint_path, checkpoint)
+
+        total, finished = len(papers), 0
+
+        def progress(written):
+            nonlocal finished
+            for paper, error in written:
+                finished += 1
+                if error:
+                    self.stderr.write(f'[{finished}/{total}] {sources[paper.pk]}: {error}')
+                else:
+                    # Failed papers are left out, so the next run retries them
+                    checkpoint[sources[paper.pk]] = {'id': str(paper.pk), 'status': 'processed'}
+                    for filename in copies.get(paper.pk, []):
+                        checkpoint[filename] = {'id': str(paper.pk), 'status': 'duplicate'}
+            self.save_checkpoint(checkpoint_path, checkpoint)
+            self.stdout.write(f'[{finished}/{total}] written')
+
+        counts = batch_ingest.ingest_batch(
+            papers, workers=options['workers'], batch_size=options['batch_size'], progress=progress
+        )
+        duplicates = len(entries) - total
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {counts['processed']} papers, {counts['failed']} failed, {duplicates} duplicates skipped"
+        ))
+
+    @staticmethod
+    def sources(paths, directory):
+        for path in paths:
+            with open(path, 'rb') as f:
+                yield str(path.relative_to(directory)), f
+
+    @staticmethod
+    def load_checkpoint(path: Path) -> dict:
+        try:
+            return json.loads(path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            raise CommandError(f'Unreadable checkpoint {path}: {e}; use --restart to ignore it')
+
+    @staticmethod
+    def save_checkpoint(path: Path, checkpoint: dict) -> None:
+        # Written to a temporary file and renamed, so a crash never leaves it half-written
+        temporary = path.with_name(path.name + '.tmp')
+        temporary.write_text(json.dumps(checkpoint, indent=1))
+        os.replace(temporary, path)
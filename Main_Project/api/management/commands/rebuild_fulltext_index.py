@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.fulltext import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the database full-text index (SQLite FTS5 / PostgreSQL tsvector) from all processed papers.'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        if backend is None:
+            raise CommandError('Full-text index is not available on this database. Run manage.py migrate.')
+        count = backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} papers ({backend.vendor})'))
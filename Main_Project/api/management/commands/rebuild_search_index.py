@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.search_index import SearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the BM25 search index from all processed papers.'
+
+    def handle(self, *args, **options):
+        count = SearchIndex.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} papers'))
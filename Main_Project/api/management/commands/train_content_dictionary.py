@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api import compression
+from api.models import CONTENT_FIELDS, ContentDictionary, PaperContent, ResearchPaper
+
+
+BATCH_SIZE = 200
+
+
+class Command(BaseCommand):
+    help = (
+        'Train a compression dictionary on a sample of processed papers. New content is '
+        'compressed with the newest dictionary; --recompress rewrites existing rows with it.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=1000, help='Number of papers to train on')
+        parser.add_argument('--size', type=int, default=compression.DICTIONARY_SIZE, help='Dictionary size in bytes')
+        parser.add_argument('--recompress', action='store_true', help='Re-encode all stored content with the new dictionary')
+        parser.add_argument('--vacuum', action='store_true', help='Reclaim freed space afterwards (VACUUM)')
+
+    def handle(self, *args, **options):
+        if not 0 < options['size'] <= compression.DICTIONARY_SIZE:
+            raise CommandError(f'--size must be between 1 and {compression.DICTIONARY_SIZE}')
+
+        papers = ResearchPaper.objects.filter(processed=True).select_related('content').only('id', 'content')
+        papers = papers.order_by('?')[:options['samples']]
+        samples = []
+        for paper in papers.iterator(chunk_size=BATCH_SIZE):
+            samples.extend([paper.abstract, paper.summary, paper.full_text])
+        if not samples:
+            raise CommandError('No processed papers to train on')
+
+        data = compression.train_dictionary(samples, size=options['size'])
+        dictionary = ContentDictionary.objects.create(data=data, sample_count=len(samples) // 3)
+        self.stdout.write(f'Trained dictionary {dictionary.pk} ({len(data)} bytes) on {dictionary.sample_count} papers')
+
+        if options['recompress']:
+            before = self.stored_bytes()
+            count = self.recompress(dictionary.pk)
+            self.stdout.write(f'Recompressed {count} papers: {before} -> {self.stored_bytes()} bytes')
+        if options['vacuum']:
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+        self.stdout.write(self.style.SUCCESS('Done'))
+
+    def recompress(self, dictionary_id) -> int:
+        zdict = ContentDictionary.data_for(dictionary_id)
+        rows = PaperContent.objects.exclude(dictionary_id=dictionary_id).order_by('pk')
+        count, last = 0, None
+        while True:
+            batch = rows.filter(pk__gt=last) if last is not None else rows
+            batch = list(batch[:BATCH_SIZE])
+            if not batch:
+                return count
+            for row in batch:
+                for name in CONTENT_FIELDS:
+                    row.write(name, row.read(name), zdict)
+                row.dictionary_id = dictionary_id
+            with transaction.atomic():
+                PaperContent.objects.bulk_update(batch, ['dictionary', *CONTENT_FIELDS])
+            count += len(batch)
+            last = batch[-1].pk
+
+    @staticmethod
+    def stored_bytes() -> int:
+        total = 0
+        for values in PaperContent.objects.values_list(*CONTENT_FIELDS).iterator(chunk_size=BATCH_SIZE):
+            total += sum(len(value) for value in values)
+        return total
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:37
+
+from django.db import migrations, models
+
+
+def mark_processed_done(apps, schema_editor):
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    ResearchPaper.objects.filter(processed=True).update(processing_stage='done')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchpaper',
+            name='processing_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='researchpaper',
+            name='processing_stage',
+            field=models.CharField(choices=[('queued', 'Queued'), ('extracting', 'Extracting text'), ('summarizing', 'Generating summary'), ('indexing', 'Indexing'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=20),
+        ),
+        migrations.RunPython(mark_processed_done, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_processing_stage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaperPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page_number', models.IntegerField()),
+                ('text', models.TextField(blank=True)),
+                ('char_start', models.IntegerField(default=0)),
+                ('char_end', models.IntegerField(default=0)),
+                ('paper', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pages', to='api.researchpaper')),
+            ],
+            options={
+                'ordering': ['page_number'],
+                'unique_together': {('paper', 'page_number')},
+            },
+        ),
+    ]
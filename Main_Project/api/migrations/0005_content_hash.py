@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:42
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_files(apps, schema_editor):
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    for paper in ResearchPaper.objects.exclude(file='').iterator():
+        hasher = hashlib.sha256()
+        try:
+            with paper.file.open('rb') as f:
+                for chunk in f.chunks():
+                    hasher.update(chunk)
+        except (OSError, ValueError):
+            continue
+        ResearchPaper.objects.filter(pk=paper.pk).update(content_hash=hasher.hexdigest())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_paper_page'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchpaper',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.RunPython(hash_existing_files, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_sections'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='researchpaper',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='paper_uploaded_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='researchpaper',
+            index=models.Index(fields=['processed', '-uploaded_at', '-id'], name='paper_processed_uploaded_idx'),
+        ),
+    ]
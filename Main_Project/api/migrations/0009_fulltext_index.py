@@ -0,0 +1,65 @@
+import warnings
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+# The index as first shipped (see 0014 for the current one), written out
+# here so the migration does not change with the api.fulltext module
+FTS_TABLE = 'api_paper_fts'
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            try:
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                    f"paper_id UNINDEXED, title, keywords, abstract, full_text, "
+                    f"tokenize = 'porter unicode61 remove_diacritics 2')"
+                )
+            except OperationalError as e:
+                # SQLite builds without FTS5; search falls back to the other modes
+                warnings.warn(f'Full-text index not created: {e}')
+                return
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (paper_id, title, keywords, abstract, full_text) "
+                f"SELECT id, title, keywords, abstract, full_text FROM api_researchpaper WHERE processed"
+            )
+        else:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {FTS_TABLE} ('
+                f'paper_id uuid PRIMARY KEY REFERENCES api_researchpaper (id) ON DELETE CASCADE, '
+                f'document tsvector NOT NULL)'
+            )
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {FTS_TABLE}_document_idx ON {FTS_TABLE} USING GIN (document)')
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (paper_id, document) "
+                f"SELECT id, "
+                f"setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                f"setweight(to_tsvector('english', coalesce(keywords::text, '')), 'B') || "
+                f"setweight(to_tsvector('english', coalesce(abstract, '')), 'C') || "
+                f"setweight(to_tsvector('english', coalesce(left(full_text, 500000), '')), 'D') "
+                f"FROM api_researchpaper WHERE processed"
+            )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_paper_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
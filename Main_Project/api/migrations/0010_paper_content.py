@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:17
+
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Self-contained: compression is written out here so the migration does not
+# change with api.compression
+LEVEL = 6
+
+CONTENT_FIELDS = ('full_text', 'summary', 'abstract', 'references')
+
+BATCH_SIZE = 200
+
+
+def _compress(text):
+    if not text:
+        return b''
+    compressor = zlib.compressobj(LEVEL)
+    return compressor.compress(text.encode('utf-8')) + compressor.flush()
+
+
+def _decompress(data, zdict):
+    if not data:
+        return ''
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(bytes(data)) + decompressor.flush()).decode('utf-8')
+
+
+def _batches(queryset):
+    # Keyset batches by primary key, so memory stays bounded on large tables
+    last = None
+    while True:
+        page = queryset.order_by('pk')
+        if last is not None:
+            page = page.filter(pk__gt=last)
+        page = list(page[:BATCH_SIZE])
+        if not page:
+            return
+        yield page
+        last = page[-1][0] if isinstance(page[-1], tuple) else page[-1].pk
+
+
+def compress_content(apps, schema_editor):
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    PaperContent = apps.get_model('api', 'PaperContent')
+    for batch in _batches(ResearchPaper.objects.values_list('id', *CONTENT_FIELDS)):
+        PaperContent.objects.bulk_create([
+            PaperContent(
+                paper_id=paper_id,
+                full_text=_compress(full_text),
+                summary=_compress(summary),
+                abstract=_compress(abstract),
+                references=_compress(json.dumps(references) if references else ''),
+            )
+            for paper_id, full_text, summary, abstract, references in batch
+        ])
+
+
+def decompress_content(apps, schema_editor):
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    PaperContent = apps.get_model('api', 'PaperContent')
+    ContentDictionary = apps.get_model('api', 'ContentDictionary')
+    dictionaries = {row.pk: bytes(row.data) for row in ContentDictionary.objects.all()}
+    for batch in _batches(PaperContent.objects.all()):
+        papers = []
+        for content in batch:
+            zdict = dictionaries.get(content.dictionary_id)
+            values = {name: _decompress(getattr(content, name), zdict) for name in CONTENT_FIELDS}
+            values['references'] = json.loads(values['references']) if values['references'] else []
+            papers.append(ResearchPaper(pk=content.paper_id, **values))
+        ResearchPaper.objects.bulk_update(papers, CONTENT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.BinaryField()),
+                ('sample_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PaperContent',
+            fields=[
+                ('paper', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='content', serialize=False, to='api.researchpaper')),
+                ('full_text', models.BinaryField(default=b'')),
+                ('summary', models.BinaryField(default=b'')),
+                ('abstract', models.BinaryField(default=b'')),
+                ('references', models.BinaryField(default=b'')),
+                ('dictionary', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='api.contentdictionary')),
+            ],
+        ),
+        migrations.RunPython(compress_content, decompress_content),
+        migrations.RemoveField(
+            model_name='researchpaper',
+            name='abstract',
+        ),
+        migrations.RemoveField(
+            model_name='researchpaper',
+            name='full_text',
+        ),
+        migrations.RemoveField(
+            model_name='researchpaper',
+            name='references',
+        ),
+        migrations.RemoveField(
+            model_name='researchpaper',
+            name='summary',
+        ),
+    ]
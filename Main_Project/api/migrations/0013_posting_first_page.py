@@ -0,0 +1,38 @@
+import re
+
+from django.db import migrations, models
+
+
+def fill_first_pages(apps, schema_editor):
+    # Self-contained: terms are matched by the index's token pattern, and only
+    # terms that already have a posting are touched
+    PaperPage = apps.get_model('api', 'PaperPage')
+    Posting = apps.get_model('api', 'Posting')
+    paper_ids = Posting.objects.values_list('paper_id', flat=True).distinct()
+    for paper_id in paper_ids.iterator():
+        pages = {}
+        for page_number, text in PaperPage.objects.filter(paper_id=paper_id).order_by(
+            'page_number'
+        ).values_list('page_number', 'text').iterator():
+            for token in re.findall(r'[a-z0-9]+', (text or '').lower()):
+                pages.setdefault(token, page_number)
+        postings = list(Posting.objects.filter(paper_id=paper_id).select_related('term'))
+        for posting in postings:
+            posting.first_page = pages.get(posting.term.term)
+        Posting.objects.bulk_update(postings, ['first_page'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_paper_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posting',
+            name='first_page',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_first_pages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+import json
+import warnings
+import zlib
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+# Self-contained: table names, schema and decompression are written out here
+# so the migration does not change with api.fulltext or api.compression
+FTS_TABLE = 'api_paper_fts'
+DOCS_TABLE = 'api_paper_fts_docs'
+TOKENIZE = "tokenize = 'porter unicode61 remove_diacritics 2'"
+
+BATCH_SIZE = 200
+
+
+def _decompress(data, zdict):
+    if not data:
+        return ''
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(bytes(data)) + decompressor.flush()).decode('utf-8')
+
+
+def _indexed_papers(apps):
+    """(hex paper id, title, keywords, abstract, full_text) of every processed paper."""
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    PaperContent = apps.get_model('api', 'PaperContent')
+    ContentDictionary = apps.get_model('api', 'ContentDictionary')
+    dictionaries = {row.pk: bytes(row.data) for row in ContentDictionary.objects.all()}
+    papers = ResearchPaper.objects.filter(processed=True).order_by('pk').values_list('pk', 'title', 'keywords')
+    last = None
+    while True:
+        batch = list((papers.filter(pk__gt=last) if last is not None else papers)[:BATCH_SIZE])
+        if not batch:
+            return
+        contents = PaperContent.objects.filter(paper_id__in=[pk for pk, _, _ in batch]).values_list(
+            'paper_id', 'dictionary_id', 'abstract', 'full_text'
+        )
+        texts = {
+            paper_id: (_decompress(abstract, dictionaries.get(dictionary_id)),
+                       _decompress(full_text, dictionaries.get(dictionary_id)))
+            for paper_id, dictionary_id, abstract, full_text in contents
+        }
+        for pk, title, keywords in batch:
+            abstract, full_text = texts.get(pk, ('', ''))
+            if isinstance(keywords, str):
+                keywords = json.loads(keywords)
+            yield pk.hex, title or '', ' '.join(keywords or []), abstract, full_text
+        last = batch[-1][0]
+
+
+def create_contentless_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        if vendor != 'sqlite':
+            # PostgreSQL's tsvector index is re-created by 0015
+            return
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"title, keywords, abstract, full_text, content = '', {TOKENIZE})"
+            )
+        except OperationalError as e:
+            # SQLite builds without FTS5; search falls back to the other modes
+            warnings.warn(f'Full-text index not created: {e}')
+            return
+        cursor.execute(
+            f'CREATE TABLE {DOCS_TABLE} ('
+            f'id integer NOT NULL PRIMARY KEY AUTOINCREMENT, paper_id char(32) NOT NULL UNIQUE)'
+        )
+        for paper_id, *fields in _indexed_papers(apps):
+            cursor.execute(f'INSERT INTO {DOCS_TABLE} (paper_id) VALUES (%s)', [paper_id])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, keywords, abstract, full_text) VALUES (%s, %s, %s, %s, %s)',
+                [cursor.lastrowid, *fields]
+            )
+
+
+def restore_content_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {DOCS_TABLE}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                f"paper_id UNINDEXED, title, keywords, abstract, full_text, {TOKENIZE})"
+            )
+        except OperationalError as e:
+            warnings.warn(f'Full-text index not created: {e}')
+            return
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (paper_id, title, keywords, abstract, full_text) VALUES (%s, %s, %s, %s, %s)',
+            _indexed_papers(apps)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_posting_first_page'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_contentless_index, restore_content_index),
+    ]
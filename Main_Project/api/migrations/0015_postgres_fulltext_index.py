@@ -0,0 +1,89 @@
+import json
+import zlib
+
+from django.db import migrations
+
+
+# Self-contained: table name, schema and decompression are written out here
+# so the migration does not change with api.fulltext or api.compression
+FTS_TABLE = 'api_paper_fts'
+
+# PostgreSQL caps a tsvector at 1MB; index at most this much of the body
+MAX_BODY_CHARS = 500000
+
+BATCH_SIZE = 200
+
+
+def _decompress(data, zdict):
+    if not data:
+        return ''
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(bytes(data)) + decompressor.flush()).decode('utf-8')
+
+
+def _indexed_papers(apps):
+    """(paper id, title, keywords, abstract, full_text) of every processed paper."""
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    PaperContent = apps.get_model('api', 'PaperContent')
+    ContentDictionary = apps.get_model('api', 'ContentDictionary')
+    dictionaries = {row.pk: bytes(row.data) for row in ContentDictionary.objects.all()}
+    papers = ResearchPaper.objects.filter(processed=True).order_by('pk').values_list('pk', 'title', 'keywords')
+    last = None
+    while True:
+        batch = list((papers.filter(pk__gt=last) if last is not None else papers)[:BATCH_SIZE])
+        if not batch:
+            return
+        contents = PaperContent.objects.filter(paper_id__in=[pk for pk, _, _ in batch]).values_list(
+            'paper_id', 'dictionary_id', 'abstract', 'full_text'
+        )
+        texts = {
+            paper_id: (_decompress(abstract, dictionaries.get(dictionary_id)),
+                       _decompress(full_text, dictionaries.get(dictionary_id)))
+            for paper_id, dictionary_id, abstract, full_text in contents
+        }
+        for pk, title, keywords in batch:
+            abstract, full_text = texts.get(pk, ('', ''))
+            if isinstance(keywords, str):
+                keywords = json.loads(keywords)
+            yield pk, title or '', ' '.join(keywords or []), abstract, full_text[:MAX_BODY_CHARS]
+        last = batch[-1][0]
+
+
+def create_tsvector_index(apps, schema_editor):
+    # 0014 dropped the PostgreSQL index; SQLite keeps its FTS5 table
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        cursor.execute(
+            f'CREATE TABLE {FTS_TABLE} ('
+            f'paper_id uuid PRIMARY KEY REFERENCES api_researchpaper (id) ON DELETE CASCADE, '
+            f'document tsvector NOT NULL)'
+        )
+        cursor.execute(f'CREATE INDEX {FTS_TABLE}_document_idx ON {FTS_TABLE} USING GIN (document)')
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (paper_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('english', %s), 'A') || "
+            f"setweight(to_tsvector('english', %s), 'B') || "
+            f"setweight(to_tsvector('english', %s), 'C') || "
+            f"setweight(to_tsvector('english', %s), 'D'))",
+            _indexed_papers(apps)
+        )
+
+
+def drop_tsvector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_contentless_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_tsvector_index, drop_tsvector_index),
+    ]
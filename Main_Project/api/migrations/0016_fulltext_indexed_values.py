@@ -0,0 +1,116 @@
+import json
+import warnings
+import zlib
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+
+# Self-contained: table names, schema and (de)compression are written out here
+# so the migration does not change with api.fulltext or api.compression
+FTS_TABLE = 'api_paper_fts'
+DOCS_TABLE = 'api_paper_fts_docs'
+TOKENIZE = "tokenize = 'porter unicode61 remove_diacritics 2'"
+
+BATCH_SIZE = 200
+
+
+def _compress_values(values):
+    """The indexed values as api.compression.encode stores a list."""
+    compressor = zlib.compressobj(6)
+    return compressor.compress(json.dumps(list(values)).encode('utf-8')) + compressor.flush()
+
+
+def _decompress(data, zdict):
+    if not data:
+        return ''
+    decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return (decompressor.decompress(bytes(data)) + decompressor.flush()).decode('utf-8')
+
+
+def _indexed_papers(apps):
+    """(hex paper id, title, keywords, abstract, full_text) of every processed paper."""
+    ResearchPaper = apps.get_model('api', 'ResearchPaper')
+    PaperContent = apps.get_model('api', 'PaperContent')
+    ContentDictionary = apps.get_model('api', 'ContentDictionary')
+    dictionaries = {row.pk: bytes(row.data) for row in ContentDictionary.objects.all()}
+    papers = ResearchPaper.objects.filter(processed=True).order_by('pk').values_list('pk', 'title', 'keywords')
+    last = None
+    while True:
+        batch = list((papers.filter(pk__gt=last) if last is not None else papers)[:BATCH_SIZE])
+        if not batch:
+            return
+        contents = PaperContent.objects.filter(paper_id__in=[pk for pk, _, _ in batch]).values_list(
+            'paper_id', 'dictionary_id', 'abstract', 'full_text'
+        )
+        texts = {
+            paper_id: (_decompress(abstract, dictionaries.get(dictionary_id)),
+                       _decompress(full_text, dictionaries.get(dictionary_id)))
+            for paper_id, dictionary_id, abstract, full_text in contents
+        }
+        for pk, title, keywords in batch:
+            abstract, full_text = texts.get(pk, ('', ''))
+            if isinstance(keywords, str):
+                keywords = json.loads(keywords)
+            yield pk.hex, title or '', ' '.join(keywords or []), abstract, full_text
+        last = batch[-1][0]
+
+
+def _create_index(cursor, docs_columns):
+    try:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"title, keywords, abstract, full_text, content = '', {TOKENIZE})"
+        )
+    except OperationalError as e:
+        # SQLite builds without FTS5; search falls back to the other modes
+        warnings.warn(f'Full-text index not created: {e}')
+        return False
+    cursor.execute(
+        f'CREATE TABLE {DOCS_TABLE} ('
+        f'id integer NOT NULL PRIMARY KEY AUTOINCREMENT, paper_id char(32) NOT NULL UNIQUE{docs_columns})'
+    )
+    return True
+
+
+def _refill(apps, schema_editor, keep_values):
+    # Rebuilt rather than altered: rows of the old table may have no
+    # recorded values and the index may hold entries no paper maps to
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {DOCS_TABLE}')
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+        if not _create_index(cursor, ", indexed blob NOT NULL DEFAULT x''" if keep_values else ''):
+            return
+        for paper_id, *fields in _indexed_papers(apps):
+            if keep_values:
+                cursor.execute(
+                    f'INSERT INTO {DOCS_TABLE} (paper_id, indexed) VALUES (%s, %s)',
+                    [paper_id, _compress_values(fields)]
+                )
+            else:
+                cursor.execute(f'INSERT INTO {DOCS_TABLE} (paper_id) VALUES (%s)', [paper_id])
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, keywords, abstract, full_text) VALUES (%s, %s, %s, %s, %s)',
+                [cursor.lastrowid, *fields]
+            )
+
+
+def keep_indexed_values(apps, schema_editor):
+    _refill(apps, schema_editor, keep_values=True)
+
+
+def drop_indexed_values(apps, schema_editor):
+    _refill(apps, schema_editor, keep_values=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_postgres_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(keep_indexed_values, drop_indexed_values),
+    ]
@@ -1,31 +1,173 @@
 from django.db import models
+from typing import Dict, Optional
 import uuid
 
+from . import compression
+
+
+# Large ResearchPaper values kept compressed in PaperContent -> empty value
+CONTENT_FIELDS = {
+    'full_text': str,
+    'summary': str,
+    'abstract': str,
+    'references': list,
+}
+
+
+def _content_property(name: str) -> property:
+    """Model attribute backed by PaperContent, decompressed on first access."""
+    def fget(self):
+        values = self.__dict__.setdefault('_content', {})
+        if name not in values:
+            values[name] = self._read_content(name)
+        return values[name]
+    
+    def fset(self, value):
+        self.__dict__.setdefault('_content', {})[name] = value
+        self.__dict__.setdefault('_content_changed', set()).add(name)
+    
+    return property(fget, fset)
+
 
 class ResearchPaper(models.Model):
+    STAGE_QUEUED = 'queued'
+    STAGE_EXTRACTING = 'extracting'
+    STAGE_SUMMARIZING = 'summarizing'
+    STAGE_INDEXING = 'indexing'
+    STAGE_DONE = 'done'
+    STAGE_FAILED = 'failed'
+    STAGE_CHOICES = [
+        (STAGE_QUEUED, 'Queued'),
+        (STAGE_EXTRACTING, 'Extracting text'),
+        (STAGE_SUMMARIZING, 'Generating summary'),
+        (STAGE_INDEXING, 'Indexing'),
+        (STAGE_DONE, 'Done'),
+        (STAGE_FAILED, 'Failed'),
+    ]
+    
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     title = models.CharField(max_length=500)
     file = models.FileField(upload_to='papers/')
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     processed = models.BooleanField(default=False)
+    processing_stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_QUEUED)
+    processing_error = models.TextField(blank=True)
+    # Touched on every stage change; a paper stuck in a running stage past
+    # INGEST_STALE_AFTER lost its job (e.g. to a restart)
+    updated_at = models.DateTimeField(auto_now=True)
     
-    # Extracted content
-    full_text = models.TextField(blank=True)
-    summary = models.TextField(blank=True)
+    # Extracted content; full_text, summary, abstract and references are
+    # stored compressed in PaperContent and read back on first access
+    full_text = _content_property('full_text')
+    summary = _content_property('summary')
     keywords = models.JSONField(default=list, blank=True)
-    abstract = models.TextField(blank=True)
+    abstract = _content_property('abstract')
     authors = models.JSONField(default=list, blank=True)
-    references = models.JSONField(default=list, blank=True)
+    references = _content_property('references')
+    # Section name -> [start, end] character span in full_text
+    sections = models.JSONField(default=dict, blank=True)
+    insights = models.JSONField(default=dict, blank=True)
+    # AIProcessor.INSIGHTS_VERSION that produced `insights`; 0 = not computed
+    insights_version = models.IntegerField(default=0)
     
     # Metadata
     page_count = models.IntegerField(default=0)
     word_count = models.IntegerField(default=0)
     
+    # Search index
+    index_length = models.IntegerField(default=0)
+    
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            # Keyset pagination of the paper list, newest first
+            models.Index(fields=['-uploaded_at', '-id'], name='paper_uploaded_id_idx'),
+            models.Index(fields=['processed', '-uploaded_at', '-id'], name='paper_processed_uploaded_idx'),
+        ]
     
     def __str__(self):
         return self.title or f"Paper {self.id}"
+    
+    def save(self, *args, **kwargs):
+        changed = self.__dict__.get('_content_changed', set())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            changed = changed & update_fields
+            kwargs['update_fields'] = (update_fields - set(CONTENT_FIELDS)) | {'updated_at'}
+        super().save(*args, **kwargs)
+        if changed:
+            PaperContent.store(self, {name: getattr(self, name) for name in changed})
+            self.__dict__['_content_changed'] -= changed
+    
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None:
+            self.__dict__.pop('_content', None)
+            self.__dict__.pop('_content_changed', None)
+    
+    def full_text_prefix(self, chars: int) -> str:
+        """The first `chars` characters of full_text, inflating no more than needed."""
+        if 'full_text' in self.__dict__.get('_content', {}):
+            return self.full_text[:chars]
+        row = self._content_row()
+        return row.read('full_text', max_chars=chars) if row is not None else ''
+    
+    def _content_row(self) -> Optional['PaperContent']:
+        if self._state.adding:
+            return None
+        try:
+            # Cached on the instance, including a missing row
+            return self.content
+        except PaperContent.DoesNotExist:
+            return None
+    
+    def _read_content(self, name: str):
+        row = self._content_row()
+        if row is None:
+            return CONTENT_FIELDS[name]()
+        return row.read(name)
+
+
+class UploadSession(models.Model):
+    """A chunked upload in progress (see api.chunked_upload)."""
+    STATUS_OPEN = 'open'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Receiving chunks'),
+        (STATUS_COMPLETE, 'Complete'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    # Bytes acknowledged so far; the next chunk must start here
+    received = models.BigIntegerField(default=0)
+    expected_sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    paper = models.ForeignKey(ResearchPaper, null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+
+class PaperPage(models.Model):
+    paper = models.ForeignKey(ResearchPaper, on_delete=models.CASCADE, related_name='pages')
+    page_number = models.IntegerField()
+    text = models.TextField(blank=True)
+    # Offsets of this page within the paper's full_text
+    char_start = models.IntegerField(default=0)
+    char_end = models.IntegerField(default=0)
+    
+    class Meta:
+        ordering = ['page_number']
+        unique_together = [('paper', 'page_number')]
+    
+    def __str__(self):
+        return f"{self.paper_id} p.{self.page_number}"
 
 
 class SearchQuery(models.Model):
@@ -39,3 +181,111 @@ class SearchQuery(models.Model):
     
     def __str__(self):
         return self.query[:50]
+
+
+class IndexTerm(models.Model):
+    term = models.CharField(max_length=64, unique=True)
+    doc_freq = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return self.term
+
+
+class Posting(models.Model):
+    term = models.ForeignKey(IndexTerm, on_delete=models.CASCADE, related_name='postings')
+    paper = models.ForeignKey(ResearchPaper, on_delete=models.CASCADE, related_name='postings')
+    frequency = models.IntegerField(default=0)
+    # First page whose text contains the term; null if only other fields do
+    first_page = models.IntegerField(null=True, blank=True)
+    
+    class Meta:
+        unique_together = [('term', 'paper')]
+    
+    def __str__(self):
+        return f"{self.term_id} -> {self.paper_id} ({self.frequency})"
+
+
+class SearchIndexStats(models.Model):
+    """Corpus-wide BM25 statistics, kept in a single row."""
+    doc_count = models.IntegerField(default=0)
+    total_length = models.BigIntegerField(default=0)
+    
+    @classmethod
+    def load(cls):
+        stats, _ = cls.objects.get_or_create(pk=1)
+        return stats
+    
+    def __str__(self):
+        return f"{self.doc_count} documents"
+
+
+class ContentDictionary(models.Model):
+    """Preset compression dictionary trained on paper text (see api.compression)."""
+    data = models.BinaryField()
+    sample_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Dictionary {self.pk} ({len(self.data)} bytes)"
+    
+    @classmethod
+    def latest_id(cls) -> Optional[int]:
+        return cls.objects.order_by('-id').values_list('id', flat=True).first()
+    
+    @classmethod
+    def data_for(cls, dictionary_id: Optional[int]) -> Optional[bytes]:
+        # Dictionaries are never modified, so each process loads one at most once
+        if dictionary_id is None:
+            return None
+        if dictionary_id not in _dictionaries:
+            _dictionaries[dictionary_id] = bytes(cls.objects.values_list('data', flat=True).get(pk=dictionary_id))
+        return _dictionaries[dictionary_id]
+
+
+_dictionaries: Dict[int, bytes] = {}
+
+
+class PaperContent(models.Model):
+    """
+    The large values of a ResearchPaper, each compressed separately so
+    reading one (or a prefix of one) never inflates the others. Read and
+    written through the matching ResearchPaper properties.
+    """
+    paper = models.OneToOneField(ResearchPaper, on_delete=models.CASCADE, primary_key=True, related_name='content')
+    dictionary = models.ForeignKey(ContentDictionary, null=True, blank=True, on_delete=models.PROTECT, related_name='+')
+    full_text = models.BinaryField(default=b'')
+    summary = models.BinaryField(default=b'')
+    abstract = models.BinaryField(default=b'')
+    references = models.BinaryField(default=b'')
+    
+    def __str__(self):
+        return f"Content of {self.paper_id}"
+    
+    def read(self, name: str, max_chars: Optional[int] = None):
+        zdict = ContentDictionary.data_for(self.dictionary_id)
+        return compression.decode(getattr(self, name), zdict, CONTENT_FIELDS[name], max_chars)
+    
+    def write(self, name: str, value, zdict: Optional[bytes]) -> None:
+        setattr(self, name, compression.encode(value or CONTENT_FIELDS[name](), zdict))
+    
+    @classmethod
+    def store(cls, paper: ResearchPaper, values: Dict) -> 'PaperContent':
+        """Compress and save changed content values of a saved paper."""
+        row = paper._content_row()
+        dictionary_id = ContentDictionary.latest_id()
+        if row is None or row.dictionary_id != dictionary_id:
+            # New rows, and rows from an older dictionary, are written in full
+            values = {name: values[name] if name in values else getattr(paper, name) for name in CONTENT_FIELDS}
+        created = row is None
+        if created:
+            row = cls(paper=paper)
+        row.dictionary_id = dictionary_id
+        zdict = ContentDictionary.data_for(dictionary_id)
+        for name, value in values.items():
+            row.write(name, value, zdict)
+        if created:
+            row.save(force_insert=True)
+            paper.content = row
+        else:
+            row.save(update_fields=['dictionary', *values])
+        return row
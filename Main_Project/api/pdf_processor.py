@@ -1,17 +1,152 @@
 import pdfplumber
 import PyPDF2
-from typing import Dict, List, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import multiprocessing
+import os
 import re
+import threading
+
+from django.conf import settings
+
+from .sections import SectionSegmenter
+from . import timing
+
+
+# Pages are joined with a blank line in full_text
+PAGE_SEPARATOR = '\n\n'
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    return getattr(settings, 'PDF_EXTRACT_WORKERS', None) or os.cpu_count() or 1
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool for page extraction, created on first use with
+    PDF_EXTRACT_WORKERS processes (default: CPU count). Callers bound their
+    own share of it by how many tasks they keep submitted.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a multi-threaded server process is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=pool_size(),
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool so the next caller starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[str]:
+    """Extract the text of pages [start, end) in a worker process."""
+    with pdfplumber.open(pdf_path, pages=range(start + 1, end + 1)) as pdf:
+        return [page.extract_text() or '' for page in pdf.pages]
 
 
 class PDFProcessor:
     """Process PDF files to extract text and metadata."""
     
+    # Papers with fewer pages are extracted serially; process startup and
+    # re-opening the file in each worker is not worth it for short documents
+    PARALLEL_MIN_PAGES = 40
+    # Pages per task; small enough to balance load across workers
+    PAGES_PER_TASK = 16
+    
+    @staticmethod
+    @timing.timed('pdf_metadata')
+    def read_metadata(pdf_path: str) -> Dict[str, any]:
+        """Read page count, title and authors from the PDF metadata."""
+        info = {'page_count': 0, 'metadata': {}, 'title': '', 'authors': []}
+        try:
+            with pdfplumber.open(pdf_path) as pdf:
+                info['page_count'] = len(pdf.pages)
+                if pdf.metadata:
+                    info['metadata'] = pdf.metadata
+                    info['title'] = pdf.metadata.get('Title', '')
+                    if pdf.metadata.get('Author'):
+                        info['authors'] = [author.strip() for author in pdf.metadata.get('Author', '').split(',')]
+        except Exception as e:
+            print(f"Error with pdfplumber: {e}")
+            # Fallback to PyPDF2
+            try:
+                with open(pdf_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    info['page_count'] = len(pdf_reader.pages)
+                    if pdf_reader.metadata:
+                        info['metadata'] = pdf_reader.metadata
+                        info['title'] = pdf_reader.metadata.get('/Title', '')
+            except Exception as e2:
+                print(f"Error with PyPDF2: {e2}")
+        return info
+    
+    @staticmethod
+    def iter_pages(pdf_path: str, workers: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (page_number, text) for every page, in order, as it is extracted.
+        Long documents are split into page ranges extracted in parallel by a
+        shared process pool, at most `workers` ranges at a time (default: the
+        pool size, PDF_EXTRACT_WORKERS; 1 disables it).
+        If pdfplumber fails part-way, PyPDF2 resumes from the failing page.
+        """
+        next_page = 1
+        try:
+            # Extract text using pdfplumber (better for structured content)
+            with pdfplumber.open(pdf_path) as pdf:
+                page_count = len(pdf.pages)
+                if workers is None:
+                    workers = pool_size()
+                if workers > 1 and page_count >= PDFProcessor.PARALLEL_MIN_PAGES:
+                    for text in PDFProcessor._iter_parallel(pdf_path, page_count, workers):
+                        yield next_page, text
+                        next_page += 1
+                
+                for page in pdf.pages[next_page - 1:]:
+                    with timing.stage('pdfplumber'):
+                        text = page.extract_text() or ''
+                        # Drop cached layout objects so memory stays flat on long documents
+                        page.flush_cache()
+                    yield next_page, text
+                    next_page += 1
+        
+        except Exception as e:
+            print(f"Error with pdfplumber: {e}")
+            # Fallback to PyPDF2
+            try:
+                with open(pdf_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    for i in range(next_page - 1, len(pdf_reader.pages)):
+                        with timing.stage('pypdf2_fallback'):
+                            text = pdf_reader.pages[i].extract_text() or ''
+                        yield i + 1, text
+            except Exception as e2:
+                print(f"Error with PyPDF2: {e2}")
+    
     @staticmethod
-    def extract_text(pdf_path: str) -> Dict[str, any]:
+    def extract_text(pdf_path: str, workers: Optional[int] = None,
+                     page_callback: Optional[Callable[[int, str, int, int], None]] = None) -> Dict[str, any]:
         """
         Extract text and metadata from PDF file.
         Returns a dictionary with extracted information.
+        
+        If `page_callback` is given it is called as
+        `page_callback(page_number, text, char_start, char_end)` as each page
+        is produced (offsets index into `full_text`), and the per-page data is
+        not kept in the result.
         """
         result = {
             'full_text': '',
@@ -22,86 +157,104 @@ class PDFProcessor:
             'title': '',
             'authors': [],
             'keywords': [],
-            'references': []
+            'references': [],
+            'sections': {}
         }
+        result.update(PDFProcessor.read_metadata(pdf_path))
         
-        try:
-            # Extract text using pdfplumber (better for structured content)
-            with pdfplumber.open(pdf_path) as pdf:
-                result['page_count'] = len(pdf.pages)
-                
-                # Extract metadata
-                if pdf.metadata:
-                    result['metadata'] = pdf.metadata
-                    result['title'] = pdf.metadata.get('Title', '')
-                    if pdf.metadata.get('Author'):
-                        result['authors'] = [author.strip() for author in pdf.metadata.get('Author', '').split(',')]
-                
-                # Extract text from all pages
-                full_text = []
-                for i, page in enumerate(pdf.pages):
-                    text = page.extract_text() or ''
-                    full_text.append(text)
-                    result['pages'].append({
-                        'page_number': i + 1,
-                        'text': text
-                    })
-                
-                result['full_text'] = '\n\n'.join(full_text)
-                
-        except Exception as e:
-            print(f"Error with pdfplumber: {e}")
-            # Fallback to PyPDF2
-            try:
-                with open(pdf_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    result['page_count'] = len(pdf_reader.pages)
-                    
-                    if pdf_reader.metadata:
-                        result['metadata'] = pdf_reader.metadata
-                        result['title'] = pdf_reader.metadata.get('/Title', '')
-                    
-                    full_text = []
-                    for i, page in enumerate(pdf_reader.pages):
-                        text = page.extract_text() or ''
-                        full_text.append(text)
-                    
-                    result['full_text'] = '\n\n'.join(full_text)
-            except Exception as e2:
-                print(f"Error with PyPDF2: {e2}")
-                return result
+        page_texts = []
+        offset = 0
+        for page_number, text in PDFProcessor.iter_pages(pdf_path, workers):
+            char_start, char_end = offset, offset + len(text)
+            if page_callback is not None:
+                page_callback(page_number, text, char_start, char_end)
+            else:
+                result['pages'].append({
+                    'page_number': page_number,
+                    'text': text
+                })
+            page_texts.append(text)
+            offset = char_end + len(PAGE_SEPARATOR)
+        
+        result['full_text'] = PAGE_SEPARATOR.join(page_texts)
         
         # Post-process extracted text
+        with timing.stage('text_postprocess'):
+            PDFProcessor._post_process(result)
+        
+        return result
+    
+    @staticmethod
+    def _post_process(result: Dict[str, any]) -> None:
+        """Sections, abstract, keywords, references, title and word count from full_text."""
         if result['full_text']:
+            full_text = result['full_text']
+            # One pass over the text locates every section
+            sections = SectionSegmenter.segment(full_text)
+            result['sections'] = sections
+            
             # Extract abstract (usually after title, before introduction)
-            abstract_match = re.search(r'(?i)(abstract|summary)[:\s]*\n(.*?)(?=\n\s*(introduction|1\.|keywords|references))', 
-                                     result['full_text'], re.DOTALL)
-            if abstract_match:
-                result['abstract'] = abstract_match.group(2).strip()[:2000]  # Limit length
+            abstract_text = SectionSegmenter.section_text(full_text, sections, 'abstract')
+            if abstract_text:
+                result['abstract'] = abstract_text.strip()[:2000]  # Limit length
             
-            # Extract keywords (look for "Keywords:" section)
-            keywords_match = re.search(r'(?i)keywords?[:\s]*\n([^\n]+)', result['full_text'])
-            if keywords_match:
-                keywords_text = keywords_match.group(1)
+            # Extract keywords (first line of the "Keywords:" section)
+            keywords_text = SectionSegmenter.section_text(full_text, sections, 'keywords').strip()
+            if keywords_text:
+                keywords_text = keywords_text.split('\n', 1)[0]
                 result['keywords'] = [kw.strip() for kw in re.split(r'[,;]', keywords_text) if kw.strip()]
             
-            # Extract references (look for references section)
-            refs_match = re.search(r'(?i)references?\s*\n(.*)', result['full_text'], re.DOTALL)
-            if refs_match:
-                refs_text = refs_match.group(1)
+            # Extract references (from the last references heading)
+            refs_text = SectionSegmenter.section_text(full_text, sections, 'references')
+            if refs_text:
                 # Split references by common patterns
-                refs = re.split(r'\n\s*\[\d+\]|\n\s*\d+\.', refs_text)
+                refs = re.split(r'\n\s*\[\d+\]|\n\s*\d+\.', '\n' + refs_text)
                 result['references'] = [ref.strip() for ref in refs if len(ref.strip()) > 10][:50]  # Limit to 50
             
             # If title not in metadata, try to extract from first page
             if not result['title']:
-                first_page = result['full_text'].split('\n\n')[0][:500]
+                first_page = result['full_text'].split(PAGE_SEPARATOR)[0][:500]
                 lines = [line.strip() for line in first_page.split('\n') if len(line.strip()) > 10]
                 if lines:
                     result['title'] = lines[0][:200]
         
         # Calculate word count
         result['word_count'] = len(result['full_text'].split())
+    
+    @staticmethod
+    def _iter_parallel(pdf_path: str, page_count: int, workers: int) -> Iterator[str]:
+        """
+        Extract page ranges in worker processes, `workers` at a time, and
+        yield page texts in page order. Stops early if the pool fails; the
+        caller continues serially from the next page.
+        """
+        step = PDFProcessor.PAGES_PER_TASK
+        ranges = deque((start, min(start + step, page_count)) for start in range(0, page_count, step))
+        pool = None
+        futures = deque()
+        try:
+            pool = _get_pool()
+            while ranges and len(futures) < workers:
+                futures.append(pool.submit(_extract_page_range, pdf_path, *ranges.popleft()))
+        except Exception as e:
+            print(f"Parallel extraction unavailable, falling back to serial: {e}")
+            if isinstance(e, BrokenProcessPool):
+                _discard_pool(pool)
+            for pending in futures:
+                pending.cancel()
+            return
         
-        return result
-
+        while futures:
+            try:
+                with timing.stage('pdfplumber'):
+                    texts = futures.popleft().result()
+                if ranges:
+                    futures.append(pool.submit(_extract_page_range, pdf_path, *ranges.popleft()))
+            except Exception as e:
+                print(f"Parallel extraction failed, falling back to serial: {e}")
+                if isinstance(e, BrokenProcessPool):
+                    _discard_pool(pool)
+                for pending in futures:
+                    pending.cancel()
+                return
+            yield from texts
@@ -0,0 +1,255 @@
+from collections import Counter
+from typing import Dict, List, Tuple
+import heapq
+import math
+import re
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import IndexTerm, PaperPage, Posting, ResearchPaper, SearchIndexStats
+
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was',
+    'were', 'which', 'with', 'we', 'our', 'can', 'also', 'not', 'been', 'these',
+}
+
+# Field weights: a term in the title counts as several occurrences in the body
+FIELD_WEIGHTS = {
+    'title': 3,
+    'keywords': 2,
+    'abstract': 1,
+    'full_text': 1,
+}
+
+# SQLite limits the number of bound parameters per statement
+BATCH_SIZE = 500
+
+
+class SearchIndex:
+    """Persistent inverted index over research papers with BM25 ranking."""
+
+    k1 = 1.2
+    b = 0.75
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Split text into lowercase index terms, dropping stopwords."""
+        if not text:
+            return []
+        return [
+            token for token in re.findall(r'[a-z0-9]+', text.lower())
+            if 1 < len(token) <= 64 and token not in STOPWORDS
+        ]
+
+    @staticmethod
+    def term_frequencies(paper: ResearchPaper) -> Counter:
+        """Weighted term frequencies for every indexed field of a paper."""
+        counts = Counter()
+        fields = {
+            'title': paper.title,
+            'keywords': ' '.join(paper.keywords or []),
+            'abstract': paper.abstract,
+            'full_text': paper.full_text,
+        }
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for token in SearchIndex.tokenize(text):
+                counts[token] += weight
+        return counts
+
+    @staticmethod
+    def first_pages(paper: ResearchPaper) -> Dict[str, int]:
+        """Number of the first page each term of a paper's text appears on."""
+        pages: Dict[str, int] = {}
+        for page_number, text in PaperPage.objects.filter(paper=paper).order_by(
+            'page_number'
+        ).values_list('page_number', 'text').iterator():
+            for token in SearchIndex.tokenize(text):
+                pages.setdefault(token, page_number)
+        return pages
+
+    @staticmethod
+    def index_paper(paper: ResearchPaper) -> None:
+        """Add a paper to the index, replacing any postings it already has."""
+        counts = SearchIndex.term_frequencies(paper)
+        length = sum(counts.values())
+        first_pages = SearchIndex.first_pages(paper) if counts else {}
+
+        with transaction.atomic():
+            SearchIndex._remove_postings(paper)
+            if not counts:
+                return
+
+            terms = list(counts)
+            term_ids = {}
+            for start in range(0, len(terms), BATCH_SIZE):
+                batch = terms[start:start + BATCH_SIZE]
+                IndexTerm.objects.bulk_create(
+                    [IndexTerm(term=term) for term in batch], ignore_conflicts=True
+                )
+                term_ids.update(
+                    IndexTerm.objects.filter(term__in=batch).values_list('term', 'id')
+                )
+
+            ids = list(term_ids.values())
+            for start in range(0, len(ids), BATCH_SIZE):
+                IndexTerm.objects.filter(id__in=ids[start:start + BATCH_SIZE]).update(
+                    doc_freq=F('doc_freq') + 1
+                )
+
+            Posting.objects.bulk_create(
+                [Posting(term_id=term_ids[term], paper=paper, frequency=freq, first_page=first_pages.get(term))
+                 for term, freq in counts.items()],
+                batch_size=BATCH_SIZE
+            )
+
+            ResearchPaper.objects.filter(pk=paper.pk).update(index_length=length)
+            paper.index_length = length
+            SearchIndexStats.load()
+            SearchIndexStats.objects.filter(pk=1).update(
+                doc_count=F('doc_count') + 1,
+                total_length=F('total_length') + length
+            )
+
+    @staticmethod
+    def remove_paper(paper: ResearchPaper) -> None:
+        """Remove a paper's postings and its contribution to corpus statistics."""
+        with transaction.atomic():
+            SearchIndex._remove_postings(paper)
+
+    @staticmethod
+    def _remove_postings(paper: ResearchPaper) -> None:
+        term_ids = list(Posting.objects.filter(paper=paper).values_list('term_id', flat=True))
+        if not term_ids:
+            return
+
+        for start in range(0, len(term_ids), BATCH_SIZE):
+            IndexTerm.objects.filter(id__in=term_ids[start:start + BATCH_SIZE]).update(
+                doc_freq=F('doc_freq') - 1
+            )
+        Posting.objects.filter(paper=paper).delete()
+
+        length = ResearchPaper.objects.filter(pk=paper.pk).values_list(
+            'index_length', flat=True
+        ).first() or 0
+        ResearchPaper.objects.filter(pk=paper.pk).update(index_length=0)
+        SearchIndexStats.objects.filter(pk=1).update(
+            doc_count=F('doc_count') - 1,
+            total_length=F('total_length') - length
+        )
+
+    @staticmethod
+    def search(query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Rank papers against the query with BM25.
+        Returns (paper_id, score) pairs, best first.
+
+        Query terms are scored in decreasing IDF order (MaxScore). Once the
+        k-th best score exceeds what the remaining terms could add, papers
+        that have not been seen yet can no longer enter the top k, so later
+        posting lists are only read for the surviving candidates (in batches
+        of BATCH_SIZE ids, unless they outnumber the term's postings).
+        """
+        terms = list(dict.fromkeys(SearchIndex.tokenize(query)))
+        if not terms or top_k <= 0:
+            return []
+
+        stats = SearchIndexStats.objects.filter(pk=1).first()
+        if not stats or stats.doc_count <= 0:
+            return []
+
+        n = stats.doc_count
+        avg_length = stats.total_length / n if stats.total_length > 0 else 1.0
+        k1, b = SearchIndex.k1, SearchIndex.b
+
+        index_terms = IndexTerm.objects.filter(term__in=terms, doc_freq__gt=0)
+        weighted = []
+        for term in index_terms:
+            idf = math.log(1 + (n - term.doc_freq + 0.5) / (term.doc_freq + 0.5))
+            weighted.append((idf, term.id, term.doc_freq))
+        if not weighted:
+            return []
+
+        # Highest IDF first; a term can contribute at most idf * (k1 + 1)
+        weighted.sort(reverse=True)
+        upper_bounds = [idf * (k1 + 1) for idf, _, _ in weighted]
+        remaining = sum(upper_bounds)
+
+        scores: Dict[str, float] = {}
+        for (idf, term_id, doc_freq), upper_bound in zip(weighted, upper_bounds):
+            postings = Posting.objects.filter(term_id=term_id)
+            batches = [postings]
+            candidates = None
+
+            threshold = SearchIndex._kth_score(scores, top_k)
+            if threshold is not None and threshold >= remaining:
+                # Drop candidates that can no longer reach the top k
+                scores = {pid: s for pid, s in scores.items() if s + remaining >= threshold}
+                candidates = scores.keys()
+                if len(scores) < doc_freq:
+                    # Read only the candidates' postings, not the whole list
+                    ids = list(scores)
+                    batches = [
+                        postings.filter(paper_id__in=ids[start:start + BATCH_SIZE])
+                        for start in range(0, len(ids), BATCH_SIZE)
+                    ]
+
+            for batch in batches:
+                for paper_id, freq, length in batch.values_list(
+                    'paper_id', 'frequency', 'paper__index_length'
+                ).iterator():
+                    key = str(paper_id)
+                    if candidates is not None and key not in candidates:
+                        continue
+                    norm = k1 * (1 - b + b * length / avg_length)
+                    scores[key] = scores.get(key, 0.0) + idf * freq * (k1 + 1) / (freq + norm)
+
+            remaining -= upper_bound
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    @staticmethod
+    def locate_pages(paper_ids: List[str], query: str) -> Dict[str, int]:
+        """
+        Number of the first page of each paper that mentions a query term,
+        trying terms in query order; papers with no such page are left out.
+        One query, answered from the postings.
+        """
+        terms = list(dict.fromkeys(SearchIndex.tokenize(query)))
+        if not terms or not paper_ids:
+            return {}
+        found: Dict[str, Dict[str, int]] = {}
+        for paper_id, term, page_number in Posting.objects.filter(
+            paper_id__in=paper_ids, term__term__in=terms, first_page__isnull=False
+        ).values_list('paper_id', 'term__term', 'first_page'):
+            found.setdefault(str(paper_id), {})[term] = page_number
+        return {
+            paper_id: next(pages[term] for term in terms if term in pages)
+            for paper_id, pages in found.items()
+        }
+
+    @staticmethod
+    def _kth_score(scores: Dict[str, float], k: int):
+        if len(scores) < k:
+            return None
+        return heapq.nlargest(k, scores.values())[-1]
+
+    @staticmethod
+    def rebuild() -> int:
+        """Drop the whole index and re-index every processed paper."""
+        with transaction.atomic():
+            Posting.objects.all().delete()
+            IndexTerm.objects.all().delete()
+            ResearchPaper.objects.update(index_length=0)
+            SearchIndexStats.objects.update_or_create(
+                pk=1, defaults={'doc_count': 0, 'total_length': 0}
+            )
+
+        count = 0
+        for paper in ResearchPaper.objects.filter(processed=True).select_related('content').iterator():
+            SearchIndex.index_paper(paper)
+            count += 1
+        return count
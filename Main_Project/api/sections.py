@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional, Tuple
+import re
+
+
+# Heading text (lowercase) -> canonical section name
+SECTION_ALIASES = {
+    'abstract': 'abstract',
+    'summary': 'abstract',
+    'keywords': 'keywords',
+    'keyword': 'keywords',
+    'index terms': 'keywords',
+    'introduction': 'introduction',
+    'methodology': 'methodology',
+    'methods': 'methodology',
+    'method': 'methodology',
+    'approach': 'methodology',
+    'materials and methods': 'methodology',
+    'results': 'results',
+    'result': 'results',
+    'findings': 'results',
+    'experiments': 'results',
+    'evaluation': 'results',
+    'discussion': 'discussion',
+    'conclusion': 'conclusion',
+    'conclusions': 'conclusion',
+    'concluding remarks': 'conclusion',
+    'acknowledgment': 'acknowledgments',
+    'acknowledgments': 'acknowledgments',
+    'acknowledgement': 'acknowledgments',
+    'acknowledgements': 'acknowledgments',
+    'references': 'references',
+    'reference': 'references',
+    'bibliography': 'references',
+    'appendix': 'appendix',
+}
+
+# Sections whose last heading wins; an early stray "Reference" line must not
+# swallow the whole paper
+LAST_OCCURRENCE = {'references'}
+
+# Longer lines are body text, never headings
+MAX_HEADING_LENGTH = 80
+
+# "3. Results", "IV. Discussion", "Conclusions:" on a line of its own
+HEADING_RE = re.compile(
+    r'^\s*(?:(?:\d+|[IVX]+)[.)]?\s+)?([A-Za-z][A-Za-z &]{1,40}?)\s*[:.—-]?\s*$'
+)
+# "Keywords: a, b, c" / "Abstract— We ..." with the body on the same line
+INLINE_RE = re.compile(r'^\s*(abstract|keywords?|index terms)\s*[:.—-]\s*(?=\S)', re.IGNORECASE)
+# Other numbered top-level headings ("2. Related Work") end the previous section
+NUMBERED_RE = re.compile(r'^\s*(?:\d+|[IVX]+)\.?\s+[A-Z][A-Za-z0-9,:&\- ]{2,60}$')
+
+
+class SectionSegmenter:
+    """Split paper text into sections with a single linear scan over its lines."""
+
+    @staticmethod
+    def segment(text: str) -> Dict[str, List[int]]:
+        """
+        Build a section index for the text.
+        Returns {section name: [start, end]} character spans of each
+        section's body (the heading line itself is excluded).
+        """
+        if not text:
+            return {}
+
+        # (section name or None, heading start, body start)
+        headings: List[Tuple[Optional[str], int, int]] = []
+        in_references = False
+        pos = 0
+        length = len(text)
+        while pos < length:
+            end = text.find('\n', pos)
+            if end == -1:
+                end = length
+            line = text[pos:end]
+            heading = SectionSegmenter._match_heading(line, in_references)
+            if heading is not None:
+                name, body_offset = heading
+                body_start = pos + body_offset if body_offset is not None else min(end + 1, length)
+                headings.append((name, pos, body_start))
+                if name is not None:
+                    in_references = name == 'references'
+            pos = end + 1
+
+        sections: Dict[str, List[int]] = {}
+        for i, (name, _, body_start) in enumerate(headings):
+            if name is None:
+                continue
+            if name in sections and name not in LAST_OCCURRENCE:
+                continue
+            body_end = headings[i + 1][1] if i + 1 < len(headings) else length
+            sections[name] = [body_start, max(body_start, body_end)]
+        return sections
+
+    @staticmethod
+    def _match_heading(line: str, in_references: bool):
+        """
+        Returns (section name, body offset within the line) for a heading
+        line, (None, None) for an unrecognised numbered heading, or None.
+        A body offset of None means the body starts on the next line.
+        """
+        inline = INLINE_RE.match(line[:MAX_HEADING_LENGTH])
+        if inline:
+            return SECTION_ALIASES.get(inline.group(1).lower()), inline.end()
+
+        if len(line) > MAX_HEADING_LENGTH:
+            return None
+
+        match = HEADING_RE.match(line)
+        if match:
+            name = SECTION_ALIASES.get(' '.join(match.group(1).lower().split()))
+            if name is not None:
+                return name, None
+
+        # Reference lists are full of numbered lines; only named headings
+        # (e.g. an appendix) can end them
+        if not in_references and NUMBERED_RE.match(line) and len(line.split()) <= 8:
+            return None, None
+        return None
+
+    @staticmethod
+    def section_text(text: str, sections: Dict[str, List[int]], name: str) -> str:
+        """Text of one section, or '' if the paper has no such section."""
+        span = sections.get(name)
+        if not span:
+            return ''
+        return text[span[0]:span[1]]
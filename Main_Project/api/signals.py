@@ -0,0 +1,39 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .fulltext import INDEXED_FIELDS, get_backend
+from .models import ResearchPaper
+from .search_index import SearchIndex
+from .vector_index import VectorIndex
+
+
+# Saves touching any of these refresh the paper's full-text entry
+FULLTEXT_TRIGGER_FIELDS = frozenset(INDEXED_FIELDS) | {'processed'}
+
+
+@receiver(post_save, sender=ResearchPaper)
+def update_fulltext_index(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        return
+    # Content fields are saved to PaperContent, so they are not in update_fields
+    changed = instance.__dict__.get('_content_changed', set())
+    if update_fields is not None and not FULLTEXT_TRIGGER_FIELDS.intersection({*update_fields, *changed}):
+        return
+    backend = get_backend()
+    if backend is not None:
+        # Unprocessed papers are dropped from the index
+        backend.index(instance)
+
+
+@receiver(post_delete, sender=ResearchPaper)
+def remove_from_fulltext_index(sender, instance, **kwargs):
+    backend = get_backend()
+    if backend is not None:
+        backend.remove(instance.pk)
+
+
+@receiver(pre_delete, sender=ResearchPaper)
+def remove_from_search_indexes(sender, instance, **kwargs):
+    # Before the cascade deletes the postings, so term and corpus statistics are updated
+    SearchIndex.remove_paper(instance)
+    VectorIndex.remove_paper(instance.pk)
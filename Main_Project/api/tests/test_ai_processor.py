@@ -0,0 +1,91 @@
+import re
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from api.ai_processor import SUMMARY_STOPWORDS, AIProcessor
+from api.models import ResearchPaper
+
+
+SENTENCES = [
+    'Graph neural networks rank citation graphs',
+    'Citation graphs connect papers through references',
+    'Neural networks learn node embeddings for graphs',
+    'Bananas ripen faster beside apples in warm kitchens',
+    'Ranking citation graphs with neural networks beats counting references',
+]
+
+
+def dense_textrank(sentences, damping=0.85):
+    """TextRank with the similarity matrix built in full, as a reference."""
+    words = [{word for word in re.findall(r'[a-z0-9]+', s.lower()) if len(word) > 2 and word not in SUMMARY_STOPWORDS}
+             for s in sentences]
+    n = len(sentences)
+    similarity = np.array([[len(a & b) / np.sqrt(len(a) * len(b)) if i != j else 0.0
+                            for j, b in enumerate(words)] for i, a in enumerate(words)])
+    degree = similarity.sum(axis=1)
+    dangling = degree == 0
+    degree[dangling] = 1.0
+    ranks = np.full(n, 1.0 / n)
+    for _ in range(200):
+        spread = ranks / degree
+        spread[dangling] = 0.0
+        ranks = (1 - damping) / n + damping * (similarity @ spread + ranks[dangling].sum() / n)
+    return ranks
+
+
+class TextRankTests(SimpleTestCase):
+    def test_matches_dense_reference(self):
+        np.testing.assert_allclose(AIProcessor.textrank(SENTENCES), dense_textrank(SENTENCES), atol=1e-5)
+
+    def test_central_sentence_ranks_first_and_unrelated_last(self):
+        order = list(np.argsort(-AIProcessor.textrank(SENTENCES), kind='stable'))
+
+        self.assertEqual(order[0], 4)
+        self.assertEqual(order[-1], 3)
+
+    def test_ranks_sum_to_one(self):
+        self.assertAlmostEqual(AIProcessor.textrank(SENTENCES).sum(), 1.0, places=5)
+        np.testing.assert_array_equal(AIProcessor.textrank(['Only one sentence here']), [1.0])
+
+
+class SummaryTests(SimpleTestCase):
+    text = '. '.join(SENTENCES) + '.'
+
+    def test_keeps_best_sentences_in_original_order(self):
+        summary = AIProcessor.generate_summary(self.text, max_length=1000, max_sentences=2)
+
+        self.assertEqual(summary, f'{SENTENCES[0]}. {SENTENCES[4]}')
+
+    def test_respects_length_budget(self):
+        for max_length in (60, 120, 200):
+            summary = AIProcessor.generate_summary(self.text, max_length=max_length)
+
+            self.assertLessEqual(len(summary), max_length)
+            self.assertIn(SENTENCES[4][:max_length // 2], summary)
+
+    def test_short_text_is_not_summarized(self):
+        self.assertEqual(AIProcessor.generate_summary('Too short.'), 'Unable to generate summary. Text too short.')
+
+
+class InsightsRecomputeTests(TestCase):
+    def test_stale_insights_are_recomputed_once(self):
+        paper = ResearchPaper(title='Graphs', processed=True, insights={'stale': True}, insights_version=1)
+        paper.full_text = '1. Conclusion\nCitation graphs are best ranked by neural networks trained on references.\n'
+        paper.save()
+        client = APIClient()
+
+        with mock.patch.object(AIProcessor, 'extract_key_insights',
+                               wraps=AIProcessor.extract_key_insights) as extract:
+            first = client.get(f'/api/result/{paper.pk}/')
+            second = client.get(f'/api/result/{paper.pk}/')
+
+        self.assertEqual(extract.call_count, 1)
+        self.assertEqual(first.data['insights'], second.data['insights'])
+        self.assertEqual(first.data['insights']['conclusions'],
+                         ['Citation graphs are best ranked by neural networks trained on references'])
+        paper.refresh_from_db()
+        self.assertEqual(paper.insights_version, AIProcessor.INSIGHTS_VERSION)
+        self.assertEqual(paper.sections, {'conclusion': [14, len(paper.full_text)]})
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import chunked_upload
+from api.models import ResearchPaper, UploadSession
+
+
+DATA = bytes(range(256)) * 40
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root, CHUNKED_UPLOAD_CHUNK_SIZE=4096)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+
+    def start(self, data=DATA, **body):
+        response = self.client.post('/api/uploads/', {'filename': 'paper.pdf', 'size': len(data), **body},
+                                    format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.data['upload_id']
+
+    def put(self, upload_id, chunk, offset):
+        return self.client.put(f'/api/uploads/{upload_id}/?offset={offset}', chunk,
+                               content_type='application/octet-stream')
+
+    def send(self, upload_id, data=DATA, start=0):
+        for offset in range(start, len(data), 4096):
+            response = self.put(upload_id, data[offset:offset + 4096], offset)
+            self.assertEqual(response.status_code, 200)
+        return response
+
+    def finalize(self, upload_id):
+        return self.client.post(f'/api/uploads/{upload_id}/finalize/', {}, format='json')
+
+    def test_chunks_advance_the_offset(self):
+        upload_id = self.start()
+
+        response = self.put(upload_id, DATA[:4096], 0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['offset'], response.data['status']), (4096, 'open'))
+        response = self.send(upload_id, start=4096)
+        self.assertEqual(response.data['offset'], len(DATA))
+        session = UploadSession.objects.get(id=upload_id)
+        with open(chunked_upload.partial_path(session), 'rb') as f:
+            self.assertEqual(f.read(), DATA)
+
+    def test_resume_from_the_reported_offset(self):
+        upload_id = self.start()
+        self.put(upload_id, DATA[:4096], 0)
+        # A fresh process has to rebuild the running hash from disk
+        chunked_upload._forget(UploadSession.objects.get(id=upload_id).id)
+
+        offset = self.client.get(f'/api/uploads/{upload_id}/').data['offset']
+        self.send(upload_id, start=offset)
+
+        session = UploadSession.objects.get(id=upload_id)
+        self.assertEqual(chunked_upload.digest(session), hashlib.sha256(DATA).hexdigest())
+
+    def test_chunk_at_the_wrong_offset_conflicts(self):
+        upload_id = self.start()
+        self.put(upload_id, DATA[:4096], 0)
+
+        for offset in (0, 8192):
+            response = self.put(upload_id, DATA[offset:offset + 4096], offset)
+            self.assertEqual(response.status_code, 409)
+            self.assertEqual(response.data['offset'], 4096)
+
+    def test_concurrent_writer_is_turned_away(self):
+        upload_id = self.start()
+        self.put(upload_id, DATA[:4096], 0)
+        session = UploadSession.objects.get(id=upload_id)
+
+        # Another request is mid-way through the chunk at 4096
+        with chunked_upload.exclusive(session) as locked:
+            self.assertTrue(locked)
+            response = self.put(upload_id, b'x' * 4096, 4096)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(UploadSession.objects.get(id=upload_id).received, 4096)
+        with open(chunked_upload.partial_path(session), 'rb') as f:
+            self.assertEqual(f.read(), DATA[:4096])
+        self.send(upload_id, start=4096)
+        self.assertEqual(chunked_upload.digest(UploadSession.objects.get(id=upload_id)),
+                         hashlib.sha256(DATA).hexdigest())
+
+    def test_chunk_past_the_declared_size_is_rejected(self):
+        upload_id = self.start(data=DATA[:100])
+
+        response = self.put(upload_id, DATA[:200], 0)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get(id=upload_id).received, 0)
+
+    def test_incomplete_upload_cannot_be_finalized(self):
+        upload_id = self.start()
+        self.put(upload_id, DATA[:4096], 0)
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(UploadSession.objects.get(id=upload_id).status, 'open')
+
+    def test_sha256_mismatch_discards_the_upload(self):
+        upload_id = self.start(sha256='0' * 64)
+        self.send(upload_id)
+        session = UploadSession.objects.get(id=upload_id)
+
+        response = self.finalize(upload_id)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(hashlib.sha256(DATA).hexdigest(), response.data['error'])
+        self.assertFalse(UploadSession.objects.filter(id=upload_id).exists())
+        self.assertFalse(os.path.exists(chunked_upload.partial_path(session)))
+
+    def test_finalized_upload_rejects_chunks_and_repeats_its_result(self):
+        existing = ResearchPaper.objects.create(
+            title='Folding', content_hash=hashlib.sha256(DATA).hexdigest(), processed=True,
+            processing_stage=ResearchPaper.STAGE_DONE
+        )
+        upload_id = self.start(sha256=hashlib.sha256(DATA).hexdigest())
+        self.send(upload_id)
+
+        first, retry = self.finalize(upload_id), self.finalize(upload_id)
+
+        for response in (first, retry):
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual((response.data['id'], response.data['deduplicated']), (str(existing.id), True))
+        response = self.put(upload_id, DATA[:4096], 0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['status'], 'complete')
+
+    def test_expire_stale_removes_idle_sessions(self):
+        idle_id, active_id = self.start(), self.start()
+        self.put(idle_id, DATA[:4096], 0)
+        UploadSession.objects.filter(id=idle_id).update(updated_at=timezone.now() - timedelta(days=2))
+        idle = UploadSession.objects.get(id=idle_id)
+
+        self.assertEqual(chunked_upload.expire_stale(), 1)
+
+        self.assertEqual([str(pk) for pk in UploadSession.objects.values_list('id', flat=True)], [active_id])
+        self.assertFalse(os.path.exists(chunked_upload.partial_path(idle)))
+        self.assertNotIn(idle.id, chunked_upload._hashers)
@@ -0,0 +1,132 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from api.fulltext import DOCS_TABLE, FTS_TABLE, get_backend
+from api.models import ResearchPaper
+
+
+def make_paper(title, full_text):
+    paper = ResearchPaper(title=title, processed=True)
+    paper.full_text = full_text
+    paper.save()
+    return paper
+
+
+def fts_rows() -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+class FullTextIndexTests(TestCase):
+    def setUp(self):
+        self.backend = get_backend()
+        if self.backend is None:
+            self.skipTest(f'No full-text index on this {connection.vendor} database')
+
+    def ids(self, query):
+        return [paper_id for paper_id, _ in self.backend.search(query)]
+
+    def test_saved_papers_are_searchable_by_body(self):
+        paper = make_paper('Folding', 'Zebrafish embryos fold proteins')
+        make_paper('Graphs', 'Ranking nodes')
+
+        self.assertEqual(self.ids('zebrafish'), [str(paper.pk)])
+        self.assertEqual(
+            list(ResearchPaper.objects.filter(id__in=self.backend.matching('zebrafish'))), [paper]
+        )
+
+    def test_title_matches_rank_above_body_matches(self):
+        body = make_paper('Graphs', 'A note on zebrafish')
+        title = make_paper('Zebrafish', 'A note on graphs')
+
+        self.assertEqual(self.ids('zebrafish'), [str(title.pk), str(body.pk)])
+
+    def test_content_only_save_reindexes(self):
+        paper = make_paper('Folding', 'Zebrafish embryos')
+        paper.full_text = 'Axolotl regeneration'
+
+        paper.save(update_fields=['full_text'])
+
+        self.assertEqual(self.ids('zebrafish'), [])
+        self.assertEqual(self.ids('axolotl'), [str(paper.pk)])
+
+    def test_reindexing_replaces_the_entry(self):
+        paper = make_paper('Folding', 'Zebrafish embryos')
+        paper.full_text = 'Axolotl regeneration'
+        paper.save()
+
+        self.assertEqual(fts_rows(), 1)
+        self.assertEqual(self.ids('axolotl'), [str(paper.pk)])
+
+    def test_unprocessed_and_deleted_papers_drop_out(self):
+        pending = make_paper('Folding', 'Zebrafish embryos')
+        deleted = make_paper('Folding', 'Zebrafish larvae')
+        pending.processed = False
+        pending.save(update_fields=['processed'])
+        deleted.delete()
+
+        self.assertEqual(self.ids('zebrafish'), [])
+
+    def test_rebuild_reindexes_every_processed_paper(self):
+        paper = make_paper('Folding', 'Zebrafish embryos')
+        make_paper('Graphs', 'Ranking nodes').delete()
+
+        self.assertEqual(self.backend.rebuild(), 1)
+
+        self.assertEqual(fts_rows(), 1)
+        self.assertEqual(self.ids('zebrafish'), [str(paper.pk)])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite FTS5 index')
+class SQLiteFullTextIndexTests(TestCase):
+    def setUp(self):
+        if get_backend() is None:
+            self.skipTest('SQLite was built without FTS5')
+
+    def test_index_holds_no_copy_of_the_text(self):
+        make_paper('Folding', 'Zebrafish embryos fold proteins')
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT full_text FROM {FTS_TABLE}')
+            self.assertEqual(cursor.fetchall(), [(None,)])
+
+    def vocabulary(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts_vocab USING fts5vocab(main, {FTS_TABLE}, 'row')")
+            cursor.execute('SELECT term, doc FROM temp.fts_vocab')
+            return dict(cursor.fetchall())
+
+    def test_reindexing_and_deleting_remove_old_entries(self):
+        paper = make_paper('Folding', 'Zebrafish embryos')
+        other = make_paper('Graphs', 'Zebrafish nodes')
+        paper.full_text = 'Axolotl regeneration'
+        paper.save()
+
+        self.assertEqual(fts_rows(), 2)
+        self.assertEqual(self.vocabulary()['zebrafish'], 1)
+        other.delete()
+
+        self.assertEqual(fts_rows(), 1)
+        self.assertNotIn('zebrafish', self.vocabulary())
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT count(*) FROM {DOCS_TABLE}')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('integrity-check', 0)")
+
+    def test_unprocessing_removes_the_entry(self):
+        paper = make_paper('Folding', 'Zebrafish embryos')
+        paper.processed = False
+        paper.save(update_fields=['processed'])
+
+        self.assertEqual((fts_rows(), self.vocabulary()), (0, {}))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'PostgreSQL tsvector index')
+class PostgresFullTextIndexTests(TestCase):
+    def test_long_bodies_are_truncated_to_fit_a_tsvector(self):
+        paper = make_paper('Folding', 'zebrafish ' * 200000)
+
+        self.assertEqual([paper_id for paper_id, _ in get_backend().search('zebrafish')], [str(paper.pk)])
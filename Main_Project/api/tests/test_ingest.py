@@ -0,0 +1,188 @@
+import shutil
+import tempfile
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api import ingest
+from api.ai_processor import AIProcessor
+from api.models import PaperPage, Posting, ResearchPaper
+from api.search_index import SearchIndex
+from api.tests.test_ingest_papers import make_pdf
+from api.tests.test_pdf_processor import page_lines
+from benchmarks.synthetic import write_pdf
+
+
+class InlineExecutor:
+    """Runs submitted jobs at once, in the test's thread and transaction."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+class IngestTestCase(TestCase):
+    def setUp(self):
+        self.media_root = media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root, VECTOR_INDEX_DIR=f'{media_root}/vector_index')
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+
+    def upload(self, text='Protein folding in zebrafish embryos', **data):
+        pdf = ContentFile(make_pdf(text), name='paper.pdf')
+        return self.client.post('/api/upload/', {'file': pdf, **data}, format='multipart')
+
+    def result(self, paper_id):
+        return self.client.get(f'/api/result/{paper_id}/')
+
+
+@mock.patch('api.ingest.close_old_connections', lambda: None)
+@mock.patch('api.ingest.get_executor', InlineExecutor)
+class BackgroundIngestTests(IngestTestCase):
+    def test_job_moves_through_every_stage(self):
+        with mock.patch('api.ingest.set_stage', wraps=ingest.set_stage) as set_stage:
+            response = self.upload(**{'async': 'true'})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual((response.data['stage'], response.data['progress']), (ResearchPaper.STAGE_QUEUED, 0))
+        self.assertEqual([call.args[1] for call in set_stage.call_args_list],
+                         [ResearchPaper.STAGE_EXTRACTING, ResearchPaper.STAGE_SUMMARIZING])
+        paper = ResearchPaper.objects.get(pk=response.data['id'])
+        self.assertEqual((paper.processed, paper.processing_stage), (True, ResearchPaper.STAGE_DONE))
+        self.assertEqual(self.result(paper.pk).status_code, 200)
+
+    def test_failed_job_is_reported(self):
+        with mock.patch.object(AIProcessor, 'extract_key_insights', side_effect=RuntimeError('model crashed')):
+            response = self.upload(**{'async': 'true'})
+
+        result = self.result(response.data['id'])
+
+        self.assertEqual(result.status_code, 500)
+        self.assertEqual(result.data['status'], 'failed')
+        self.assertEqual(result.data['error'], 'Error processing PDF: model crashed')
+
+    def test_running_job_reports_its_stage(self):
+        paper = ResearchPaper.objects.create(title='Paper', processing_stage=ResearchPaper.STAGE_SUMMARIZING)
+
+        result = self.result(paper.pk)
+
+        self.assertEqual(result.status_code, 202)
+        self.assertEqual(result.data['stages'], [
+            {'stage': ResearchPaper.STAGE_EXTRACTING, 'status': 'complete'},
+            {'stage': ResearchPaper.STAGE_SUMMARIZING, 'status': 'running'},
+            {'stage': ResearchPaper.STAGE_INDEXING, 'status': 'pending'},
+        ])
+        self.assertEqual(result.data['progress'], 33)
+
+
+@override_settings(INGEST_STALE_AFTER=60)
+class FailStaleTests(TestCase):
+    def make_paper(self, stage, minutes_ago, processed=False):
+        paper = ResearchPaper.objects.create(title=stage, processing_stage=stage, processed=processed)
+        ResearchPaper.objects.filter(pk=paper.pk).update(updated_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return paper
+
+    def test_fails_only_unfinished_papers_idle_for_too_long(self):
+        stale = self.make_paper(ResearchPaper.STAGE_EXTRACTING, 5)
+        self.make_paper(ResearchPaper.STAGE_EXTRACTING, 0)
+        self.make_paper(ResearchPaper.STAGE_DONE, 5, processed=True)
+        self.make_paper(ResearchPaper.STAGE_FAILED, 5)
+
+        self.assertEqual(ingest.fail_stale(ResearchPaper.objects.all()), 1)
+
+        stale.refresh_from_db()
+        self.assertEqual(stale.processing_stage, ResearchPaper.STAGE_FAILED)
+        self.assertIn('interrupted', stale.processing_error)
+        self.assertEqual(ResearchPaper.objects.filter(processing_stage=ResearchPaper.STAGE_FAILED).count(), 2)
+
+    def test_result_of_a_lost_job_is_failed(self):
+        stale = self.make_paper(ResearchPaper.STAGE_SUMMARIZING, 5)
+
+        result = APIClient().get(f'/api/result/{stale.pk}/')
+
+        self.assertEqual(result.status_code, 500)
+        self.assertEqual(result.data['status'], 'failed')
+
+
+class PageIndexTests(IngestTestCase):
+    def ingest_pages(self, pages):
+        path = f'{tempfile.mkdtemp(dir=self.media_root)}/paper.pdf'
+        write_pdf(path, page_lines(pages))
+        paper = ResearchPaper.objects.create(title='paper.pdf')
+        with open(path, 'rb') as f:
+            paper.file.save('paper.pdf', f)
+        return ingest.process_paper(paper, 'paper.pdf')
+
+    def test_pages_are_written_in_batches(self):
+        with mock.patch.object(ingest.PageWriter, 'batch_size', 2), \
+                mock.patch.object(PaperPage.objects, 'bulk_create', wraps=PaperPage.objects.bulk_create) as bulk_create:
+            paper = self.ingest_pages(5)
+
+        self.assertEqual([len(call.args[0]) for call in bulk_create.call_args_list], [2, 2, 1])
+        pages = list(paper.pages.order_by('page_number'))
+        self.assertEqual([page.page_number for page in pages], [1, 2, 3, 4, 5])
+        for page in pages:
+            self.assertEqual(paper.full_text[page.char_start:page.char_end], page.text)
+
+    def test_postings_record_the_first_page_of_each_term(self):
+        paper = self.ingest_pages(4)
+
+        self.assertEqual(Posting.objects.get(paper=paper, term__term='marker3').first_page, 3)
+        self.assertEqual(Posting.objects.get(paper=paper, term__term='line').first_page, 1)
+        self.assertEqual(SearchIndex.locate_pages([str(paper.pk)], 'marker4 marker2'), {str(paper.pk): 4})
+
+
+@override_settings(INGEST_STALE_AFTER=60)
+class DeduplicationTests(IngestTestCase):
+    def test_reupload_returns_the_existing_paper(self):
+        first = self.upload()
+        second = self.upload()
+
+        self.assertEqual((first.status_code, second.status_code), (201, 200))
+        self.assertEqual(second.data['id'], first.data['id'])
+        self.assertTrue(second.data['deduplicated'])
+        self.assertEqual(ResearchPaper.objects.count(), 1)
+        self.assertEqual(self.upload('Ranking nodes of citation graphs').status_code, 201)
+
+    def test_reupload_while_processing_follows_the_running_job(self):
+        first = self.upload()
+        ResearchPaper.objects.filter(pk=first.data['id']).update(
+            processed=False, processing_stage=ResearchPaper.STAGE_SUMMARIZING
+        )
+
+        second = self.upload()
+
+        self.assertEqual(second.status_code, 202)
+        self.assertEqual((second.data['id'], second.data['stage']), (first.data['id'], ResearchPaper.STAGE_SUMMARIZING))
+
+    def test_failed_paper_is_not_reused(self):
+        first = self.upload()
+        ResearchPaper.objects.filter(pk=first.data['id']).update(
+            processed=False, processing_stage=ResearchPaper.STAGE_FAILED
+        )
+
+        second = self.upload()
+
+        self.assertEqual(second.status_code, 201)
+        self.assertNotEqual(second.data['id'], first.data['id'])
+
+    def test_stale_paper_is_failed_and_not_reused(self):
+        first = self.upload()
+        ResearchPaper.objects.filter(pk=first.data['id']).update(
+            processed=False, processing_stage=ResearchPaper.STAGE_EXTRACTING,
+            updated_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        second = self.upload()
+
+        self.assertEqual(second.status_code, 201)
+        self.assertNotEqual(second.data['id'], first.data['id'])
+        self.assertEqual(ResearchPaper.objects.get(pk=first.data['id']).processing_stage, ResearchPaper.STAGE_FAILED)
@@ -0,0 +1,130 @@
+import io
+import json
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from api import batch_ingest
+from api.models import ResearchPaper
+
+
+def make_pdf(text: str) -> bytes:
+    """A one-page PDF showing `text`."""
+    stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'.encode()
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    pdf, offsets = bytearray(b'%PDF-1.4\n'), []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+class IngestPapersCommandTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.checkpoint = self.directory / '.ingest_checkpoint.json'
+        (self.directory / 'folding.pdf').write_bytes(make_pdf('Protein folding in zebrafish embryos'))
+        (self.directory / 'graphs.pdf').write_bytes(make_pdf('Ranking nodes of citation graphs'))
+
+    def ingest(self, *args):
+        stdout = io.StringIO()
+        call_command('ingest_papers', str(self.directory), '--workers', '1', *args,
+                     stdout=stdout, stderr=io.StringIO())
+        return stdout.getvalue()
+
+    def read_checkpoint(self):
+        return json.loads(self.checkpoint.read_text())
+
+    def test_checkpoints_processed_papers(self):
+        output = self.ingest()
+
+        self.assertIn('2 PDFs, 0 already done, 2 to ingest', output)
+        checkpoint = self.read_checkpoint()
+        self.assertEqual(sorted(checkpoint), ['folding.pdf', 'graphs.pdf'])
+        for entry in checkpoint.values():
+            self.assertEqual(entry['status'], 'processed')
+            self.assertTrue(ResearchPaper.objects.get(pk=entry['id']).processed)
+
+    def test_rerun_skips_checkpointed_files(self):
+        self.checkpoint.write_text(json.dumps({'folding.pdf': {'id': 'earlier', 'status': 'processed'}}))
+
+        output = self.ingest()
+
+        self.assertIn('2 PDFs, 1 already done, 1 to ingest', output)
+        self.assertEqual(list(ResearchPaper.objects.values_list('title', flat=True)),
+                         ['Ranking nodes of citation graphs'])
+        self.assertEqual(self.read_checkpoint()['folding.pdf']['id'], 'earlier')
+        self.assertIn('0 to ingest', self.ingest())
+        self.assertEqual(ResearchPaper.objects.count(), 1)
+
+    def test_resume_reuses_papers_an_interrupted_run_left_queued(self):
+        # Files stored and papers created, then the run died before processing
+        with open(self.directory / 'folding.pdf', 'rb') as f:
+            [entry] = batch_ingest.create_papers([('folding.pdf', f)])
+
+        self.ingest()
+
+        self.assertEqual(ResearchPaper.objects.count(), 2)
+        self.assertEqual(self.read_checkpoint()['folding.pdf']['id'], str(entry['paper'].pk))
+        self.assertTrue(ResearchPaper.objects.get(pk=entry['paper'].pk).processed)
+
+    def test_restart_ignores_the_checkpoint(self):
+        self.checkpoint.write_text('{"folding.pdf": ')
+
+        with self.assertRaises(CommandError):
+            self.ingest()
+        output = self.ingest('--restart')
+
+        self.assertIn('0 already done, 2 to ingest', output)
+        self.assertEqual(sorted(self.read_checkpoint()), ['folding.pdf', 'graphs.pdf'])
+
+    def test_copy_within_a_run_is_checkpointed_once_its_original_is_processed(self):
+        shutil.copy(self.directory / 'folding.pdf', self.directory / 'folding-copy.pdf')
+
+        with mock.patch('api.batch_ingest.ingest_batch', side_effect=RuntimeError('worker crashed')):
+            with self.assertRaises(RuntimeError):
+                self.ingest()
+        self.assertEqual(self.read_checkpoint(), {})
+
+        self.ingest()
+
+        copies = [entry for name, entry in self.read_checkpoint().items() if name.startswith('folding')]
+        self.assertEqual(sorted(entry['status'] for entry in copies), ['duplicate', 'processed'])
+        self.assertEqual(copies[0]['id'], copies[1]['id'])
+        self.assertEqual(ResearchPaper.objects.count(), 2)
+
+    @override_settings(INGEST_BATCH_WORKERS=1)
+    def test_batches_share_one_process_pool(self):
+        with mock.patch.object(batch_ingest, '_pool', None), \
+                mock.patch('api.batch_ingest.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool_class:
+            for name in ('folding.pdf', 'graphs.pdf'):
+                with open(self.directory / name, 'rb') as f:
+                    papers = [entry['paper'] for entry in batch_ingest.create_papers([(name, f)])]
+                self.assertEqual(batch_ingest.ingest_batch(papers), {'processed': 1, 'failed': 0})
+            self.addCleanup(batch_ingest._pool.shutdown)
+
+        self.assertEqual(pool_class.call_count, 1)
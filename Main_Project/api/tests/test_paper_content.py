@@ -0,0 +1,121 @@
+import io
+import zlib
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api import compression, models
+from api.models import ContentDictionary, PaperContent, ResearchPaper
+
+
+BODY = 'In this paper we show that protein folding is predictable. ' * 200
+ABSTRACT = 'In this paper we show that folding is predictable.'
+
+
+def make_paper(**content):
+    paper = ResearchPaper(title='Folding', processed=True)
+    for name, value in content.items():
+        setattr(paper, name, value)
+    paper.save()
+    return paper
+
+
+class PaperContentTests(TestCase):
+    def setUp(self):
+        # Dictionary ids are reused once a test's rows are rolled back
+        models._dictionaries.clear()
+
+    def test_round_trip(self):
+        references = ['Smith, J. (2020). Nature.', 'Doe, A. (2017). NeurIPS.']
+        paper = make_paper(full_text=BODY, summary='Folding is predictable.', abstract=ABSTRACT,
+                           references=references)
+
+        fresh = ResearchPaper.objects.get(pk=paper.pk)
+
+        self.assertEqual(fresh.full_text, BODY)
+        self.assertEqual(fresh.summary, 'Folding is predictable.')
+        self.assertEqual(fresh.abstract, ABSTRACT)
+        self.assertEqual(fresh.references, references)
+
+    def test_content_is_stored_compressed(self):
+        paper = make_paper(full_text=BODY)
+
+        stored = bytes(PaperContent.objects.get(paper=paper).full_text)
+
+        self.assertLess(len(stored), len(BODY) // 10)
+        self.assertEqual(zlib.decompress(stored).decode('utf-8'), BODY)
+
+    def test_missing_content_reads_as_empty(self):
+        paper = ResearchPaper.objects.create(title='Empty')
+        PaperContent.objects.filter(paper=paper).delete()
+
+        fresh = ResearchPaper.objects.get(pk=paper.pk)
+
+        self.assertEqual((fresh.full_text, fresh.abstract, fresh.references), ('', '', []))
+        self.assertEqual(fresh.full_text_prefix(10), '')
+
+    def test_update_fields_writes_only_named_content(self):
+        paper = make_paper(full_text=BODY, abstract='Old abstract')
+        paper.abstract = 'New abstract'
+        paper.full_text = 'Unsaved body'
+        paper.title = 'Unsaved title'
+
+        paper.save(update_fields=['abstract'])
+
+        fresh = ResearchPaper.objects.get(pk=paper.pk)
+        self.assertEqual(fresh.abstract, 'New abstract')
+        self.assertEqual(fresh.full_text, BODY)
+        self.assertEqual(fresh.title, 'Folding')
+
+    def test_update_fields_without_content_leaves_content_alone(self):
+        paper = ResearchPaper.objects.get(pk=make_paper(full_text=BODY).pk)
+        paper.title = 'Renamed'
+
+        with CaptureQueriesContext(connection) as queries:
+            paper.save(update_fields=['title'])
+
+        writes = [query['sql'] for query in queries.captured_queries
+                  if query['sql'].startswith(('INSERT INTO "api_papercontent"', 'UPDATE "api_papercontent"'))]
+        self.assertEqual(writes, [])
+        fresh = ResearchPaper.objects.get(pk=paper.pk)
+        self.assertEqual((fresh.title, fresh.full_text), ('Renamed', BODY))
+
+    def test_prefix_reads(self):
+        text = 'Ünïcödé prefix — ' * 1000
+        paper = make_paper(full_text=text)
+        fresh = ResearchPaper.objects.select_related('content').get(pk=paper.pk)
+
+        for chars in (0, 1, 17, 5000, len(text) + 10):
+            self.assertEqual(fresh.full_text_prefix(chars), text[:chars])
+        # A prefix read does not inflate (or cache) the whole value
+        self.assertNotIn('full_text', fresh.__dict__.get('_content', {}))
+
+    def test_decompress_max_chars_inflates_only_a_prefix(self):
+        data = compression.compress('é' * 100000)
+
+        self.assertEqual(compression.decompress(data, max_chars=3), 'ééé')
+
+    def test_new_content_uses_the_latest_dictionary(self):
+        old = make_paper(full_text=BODY, abstract=ABSTRACT)
+
+        call_command('train_content_dictionary', samples=10, stdout=io.StringIO())
+        new = make_paper(full_text=BODY, abstract=ABSTRACT)
+
+        old_row, new_row = PaperContent.objects.get(paper=old), PaperContent.objects.get(paper=new)
+        self.assertIsNone(old_row.dictionary_id)
+        self.assertEqual(new_row.dictionary_id, ContentDictionary.latest_id())
+        self.assertLess(len(new_row.abstract), len(old_row.abstract))
+        for paper in (old, new):
+            fresh = ResearchPaper.objects.get(pk=paper.pk)
+            self.assertEqual((fresh.full_text, fresh.abstract), (BODY, ABSTRACT))
+
+    def test_recompress_rewrites_rows_with_the_new_dictionary(self):
+        paper = make_paper(full_text=BODY, summary='Folding is predictable.')
+
+        call_command('train_content_dictionary', samples=10, recompress=True, stdout=io.StringIO())
+
+        self.assertEqual(PaperContent.objects.get(paper=paper).dictionary_id, ContentDictionary.latest_id())
+        fresh = ResearchPaper.objects.get(pk=paper.pk)
+        self.assertEqual((fresh.full_text, fresh.summary), (BODY, 'Folding is predictable.'))
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.models import ResearchPaper
+
+
+class PaperListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        self.papers = []
+        # Papers 2 and 3 share a timestamp, so their order falls to the id
+        for i, minutes in enumerate([0, 1, 2, 2, 3, 4, 5]):
+            paper = ResearchPaper.objects.create(title=f'Paper {i}', processed=i % 2 == 0)
+            ResearchPaper.objects.filter(pk=paper.pk).update(uploaded_at=now - timedelta(minutes=minutes))
+            self.papers.append(ResearchPaper.objects.get(pk=paper.pk))
+
+    def expected_order(self, papers):
+        return [str(paper.pk) for paper in sorted(papers, key=lambda paper: (paper.uploaded_at, paper.pk), reverse=True)]
+
+    def fetch_all(self, **params):
+        ids, cursor, pages = [], None, 0
+        while True:
+            query = dict(params, **({'cursor': cursor} if cursor else {}))
+            response = self.client.get('/api/papers/', query)
+            self.assertEqual(response.status_code, 200)
+            ids += [paper['id'] for paper in response.data['papers']]
+            pages += 1
+            cursor = response.data['next_cursor']
+            if cursor is None:
+                return ids, pages
+
+    def test_pages_cover_every_paper_once_newest_first(self):
+        ids, pages = self.fetch_all(limit=3)
+
+        self.assertEqual(ids, self.expected_order(self.papers))
+        self.assertEqual(pages, 3)
+
+    def test_equal_timestamps_are_not_skipped_at_page_boundaries(self):
+        for limit in range(1, 8):
+            ids, _ = self.fetch_all(limit=limit)
+            self.assertEqual(ids, self.expected_order(self.papers), f'limit={limit}')
+
+    def test_last_full_page_has_no_cursor(self):
+        response = self.client.get('/api/papers/', {'limit': 7})
+
+        self.assertEqual(response.data['count'], 7)
+        self.assertIsNone(response.data['next_cursor'])
+
+    def test_processed_filter_applies_across_pages(self):
+        ids, _ = self.fetch_all(limit=2, processed='true')
+
+        self.assertEqual(ids, self.expected_order([paper for paper in self.papers if paper.processed]))
+
+    def test_rows_omit_content(self):
+        response = self.client.get('/api/papers/', {'limit': 1})
+
+        self.assertEqual(
+            set(response.data['papers'][0]),
+            {'id', 'title', 'uploaded_at', 'processed', 'page_count', 'word_count'}
+        )
+
+    def test_invalid_parameters(self):
+        for params in ({'cursor': 'not-a-cursor'}, {'limit': 'ten'}, {'processed': 'maybe'}):
+            response = self.client.get('/api/papers/', params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pdfplumber
+from django.test import SimpleTestCase, override_settings
+
+from api import pdf_processor
+from api.pdf_processor import PDFProcessor
+from benchmarks.synthetic import LINES_PER_PAGE, write_pdf
+
+
+def page_lines(pages):
+    """Text whose page i (1-based) is filled with lines naming that page."""
+    return '\n'.join(f'Line {line} of page marker{page}' for page in range(1, pages + 1)
+                     for line in range(LINES_PER_PAGE))
+
+
+class PDFProcessorTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.directory = Path(directory)
+
+    def write(self, pages):
+        path = str(self.directory / f'{pages}.pdf')
+        self.assertEqual(write_pdf(path, page_lines(pages)), pages)
+        return path
+
+    def assert_pages_in_order(self, pages, count):
+        self.assertEqual([number for number, _ in pages], list(range(1, count + 1)))
+        for number, text in pages:
+            self.assertIn(f'marker{number}', text)
+            self.assertNotIn(f'marker{number + 1}\n', text)
+
+    @override_settings(PDF_EXTRACT_WORKERS=2)
+    def test_long_document_is_extracted_in_parallel(self):
+        self.addCleanup(lambda: pdf_processor._pool and pdf_processor._pool.shutdown())
+        path = self.write(PDFProcessor.PARALLEL_MIN_PAGES + 5)
+
+        with mock.patch.object(PDFProcessor, '_iter_parallel', wraps=PDFProcessor._iter_parallel) as parallel:
+            pages = list(PDFProcessor.iter_pages(path))
+
+        self.assertEqual(parallel.call_count, 1)
+        self.assert_pages_in_order(pages, PDFProcessor.PARALLEL_MIN_PAGES + 5)
+        self.assertEqual(pages, list(PDFProcessor.iter_pages(path, workers=1)))
+
+    def test_short_document_is_extracted_serially(self):
+        path = self.write(3)
+
+        with mock.patch.object(PDFProcessor, '_iter_parallel') as parallel:
+            pages = list(PDFProcessor.iter_pages(path, workers=4))
+
+        parallel.assert_not_called()
+        self.assert_pages_in_order(pages, 3)
+
+    def test_pypdf2_resumes_from_the_failing_page(self):
+        path = self.write(5)
+        extract_text = pdfplumber.page.Page.extract_text
+
+        def fail_on_page_3(page, *args, **kwargs):
+            if page.page_number == 3:
+                raise ValueError('unreadable page')
+            return extract_text(page, *args, **kwargs)
+
+        with mock.patch('pdfplumber.page.Page.extract_text', autospec=True, side_effect=fail_on_page_3), \
+                mock.patch('PyPDF2.PageObject.extract_text', autospec=True,
+                           side_effect=lambda page, *args, **kwargs: 'pypdf2') as pypdf2:
+            pages = list(PDFProcessor.iter_pages(path, workers=1))
+
+        self.assertEqual([number for number, _ in pages], [1, 2, 3, 4, 5])
+        self.assertIn('marker2', pages[1][1])
+        self.assertEqual([text for _, text in pages[2:]], ['pypdf2'] * 3)
+        self.assertEqual(pypdf2.call_count, 3)
+
+    def test_page_offsets_index_full_text(self):
+        path = self.write(3)
+        spans = []
+
+        result = PDFProcessor.extract_text(path, workers=1, page_callback=lambda *page: spans.append(page))
+
+        self.assertEqual(result['page_count'], 3)
+        for number, text, start, end in spans:
+            self.assertEqual(result['full_text'][start:end], text)
@@ -0,0 +1,133 @@
+import math
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.models import IndexTerm, Posting, ResearchPaper, SearchIndexStats
+from api.search_index import SearchIndex
+
+
+def make_paper(title='', abstract='', full_text='', keywords=None):
+    paper = ResearchPaper(title=title, processed=True, keywords=keywords or [])
+    paper.abstract = abstract
+    paper.full_text = full_text
+    paper.save()
+    SearchIndex.index_paper(paper)
+    return paper
+
+
+class SearchIndexTests(TestCase):
+    def test_tokenize_drops_stopwords_and_single_characters(self):
+        self.assertEqual(SearchIndex.tokenize('The Graph of a Neural-Network, v2'), ['graph', 'neural', 'network', 'v2'])
+
+    def test_title_match_outranks_body_match(self):
+        in_title = make_paper(title='Protein folding', full_text='a study of structures')
+        in_body = make_paper(title='Structures', full_text='protein folding in a study')
+
+        ranked = SearchIndex.search('protein')
+
+        self.assertEqual([paper_id for paper_id, _ in ranked], [str(in_title.pk), str(in_body.pk)])
+        self.assertGreater(ranked[0][1], ranked[1][1])
+
+    def test_score_matches_bm25(self):
+        paper = make_paper(title='Quantum annealing', full_text='annealing schedules for quantum hardware')
+        make_paper(title='Graph retrieval', full_text='ranking graphs for retrieval')
+
+        stats = SearchIndexStats.objects.get(pk=1)
+        self.assertEqual(stats.doc_count, 2)
+        avg_length = stats.total_length / stats.doc_count
+        paper.refresh_from_db(fields=['index_length'])
+        # 'annealing': once in the title (weight 3) and once in the body
+        freq, doc_freq, n = 4, 1, 2
+        idf = math.log(1 + (n - doc_freq + 0.5) / (doc_freq + 0.5))
+        norm = SearchIndex.k1 * (1 - SearchIndex.b + SearchIndex.b * paper.index_length / avg_length)
+        expected = idf * freq * (SearchIndex.k1 + 1) / (freq + norm)
+
+        [(paper_id, score)] = SearchIndex.search('annealing')
+
+        self.assertEqual(paper_id, str(paper.pk))
+        self.assertAlmostEqual(score, expected)
+
+    def test_more_occurrences_rank_higher(self):
+        papers = [make_paper(title='ranking ' * count, full_text='filler text') for count in range(1, 4)]
+
+        ranked = SearchIndex.search('ranking')
+
+        self.assertEqual([paper_id for paper_id, _ in ranked], [str(paper.pk) for paper in reversed(papers)])
+
+    def test_top_k_matches_full_ranking(self):
+        # A rare term scored first lets MaxScore skip papers that cannot reach the top k
+        for count in range(1, 8):
+            make_paper(title='ranking ' * count, full_text='filler text ' + 'rare ' * (count % 3))
+
+        full = SearchIndex.search('rare ranking filler', top_k=100)
+        top = SearchIndex.search('rare ranking filler', top_k=3)
+
+        self.assertEqual(len(full), 7)
+        self.assertEqual(top, full[:3])
+
+    def test_reindex_replaces_postings(self):
+        paper = make_paper(title='Transformers', full_text='attention is all you need')
+        paper.full_text = 'convolutions everywhere'
+        paper.save()
+        SearchIndex.index_paper(paper)
+
+        self.assertEqual(SearchIndex.search('attention'), [])
+        self.assertEqual([paper_id for paper_id, _ in SearchIndex.search('convolutions')], [str(paper.pk)])
+        stats = SearchIndexStats.objects.get(pk=1)
+        self.assertEqual(stats.doc_count, 1)
+        self.assertEqual(stats.total_length, ResearchPaper.objects.get(pk=paper.pk).index_length)
+        self.assertEqual(IndexTerm.objects.get(term='attention').doc_freq, 0)
+
+    def test_pruned_terms_read_only_candidate_postings(self):
+        # Five tied papers, which all survive pruning
+        tied = {str(make_paper(title='Zebrafish study', full_text='zebrafish larvae').pk) for _ in range(5)}
+        for i in range(15):
+            make_paper(title=f'Graph study {i}')
+        full = SearchIndex.search('zebrafish study', top_k=100)
+
+        # More surviving candidates than fit in one IN (...) batch
+        with mock.patch('api.search_index.BATCH_SIZE', 2), CaptureQueriesContext(connection) as queries:
+            top = SearchIndex.search('zebrafish study', top_k=1)
+
+        self.assertIn(top[0][0], tied)
+        self.assertAlmostEqual(top[0][1], full[0][1])
+        candidate_reads = [query['sql'] for query in queries.captured_queries
+                           if 'FROM "api_posting"' in query['sql'] and '"paper_id" IN' in query['sql']]
+        self.assertEqual(len(candidate_reads), 3)
+
+    def test_remove_paper(self):
+        kept = make_paper(title='Graph networks')
+        removed = make_paper(title='Graph retrieval')
+
+        SearchIndex.remove_paper(removed)
+
+        self.assertEqual([paper_id for paper_id, _ in SearchIndex.search('graph')], [str(kept.pk)])
+        self.assertFalse(Posting.objects.filter(paper=removed).exists())
+        self.assertEqual(SearchIndexStats.objects.get(pk=1).doc_count, 1)
+        self.assertEqual(IndexTerm.objects.get(term='graph').doc_freq, 1)
+
+    def test_deleting_a_paper_updates_statistics(self):
+        kept = make_paper(title='Graph networks')
+        deleted = make_paper(title='Graph retrieval', full_text='retrieval of graph nodes')
+        other = make_paper(title='Graph search')
+
+        deleted.delete()
+        ResearchPaper.objects.filter(pk=other.pk).delete()
+
+        self.assertEqual([paper_id for paper_id, _ in SearchIndex.search('graph')], [str(kept.pk)])
+        stats = SearchIndexStats.objects.get(pk=1)
+        self.assertEqual((stats.doc_count, stats.total_length), (1, ResearchPaper.objects.get(pk=kept.pk).index_length))
+        self.assertEqual(IndexTerm.objects.get(term='graph').doc_freq, 1)
+        self.assertEqual(IndexTerm.objects.get(term='retrieval').doc_freq, 0)
+
+    def test_rebuild_indexes_only_processed_papers(self):
+        processed = make_paper(title='Sparse retrieval')
+        pending = ResearchPaper.objects.create(title='Sparse attention', processed=False)
+
+        self.assertEqual(SearchIndex.rebuild(), 1)
+
+        self.assertEqual([paper_id for paper_id, _ in SearchIndex.search('sparse')], [str(processed.pk)])
+        self.assertFalse(Posting.objects.filter(paper=pending).exists())
@@ -0,0 +1,66 @@
+from django.test import SimpleTestCase
+
+from api.sections import SectionSegmenter
+
+
+def section(text, name):
+    return SectionSegmenter.section_text(text, SectionSegmenter.segment(text), name)
+
+
+class SectionSegmenterTests(SimpleTestCase):
+    def test_numbered_headings_split_sections(self):
+        text = ('1. Introduction\nWhy this matters.\n'
+                '2. Methods\nWe measured things.\n'
+                'III. RESULTS\nThings were measured.\n')
+
+        sections = SectionSegmenter.segment(text)
+
+        self.assertEqual(list(sections), ['introduction', 'methodology', 'results'])
+        self.assertEqual(section(text, 'methodology'), 'We measured things.\n')
+        self.assertEqual(section(text, 'results'), 'Things were measured.\n')
+
+    def test_unrecognised_numbered_heading_ends_the_previous_section(self):
+        text = '1. Introduction\nWhy this matters.\n2. Related Work\nOthers did it.\n3. Conclusion\nDone.\n'
+
+        self.assertEqual(section(text, 'introduction'), 'Why this matters.\n')
+        self.assertEqual(section(text, 'conclusion'), 'Done.\n')
+
+    def test_inline_abstract_and_keywords(self):
+        text = ('A Study of Graphs\n'
+                'Abstract— We rank the nodes of citation graphs.\n'
+                'Keywords: graphs, ranking, citations\n'
+                '1. Introduction\nGraphs are everywhere.\n')
+
+        self.assertEqual(section(text, 'abstract'), 'We rank the nodes of citation graphs.\n')
+        self.assertEqual(section(text, 'keywords'), 'graphs, ranking, citations\n')
+        self.assertEqual(section(text, 'introduction'), 'Graphs are everywhere.\n')
+
+    def test_body_line_mentioning_reference_is_not_a_heading(self):
+        text = ('1. Methods\n'
+                'We follow the reference implementation described below.\n'
+                'References\n[1] A. Author. A paper. 2020.\n')
+
+        self.assertEqual(section(text, 'methodology'), 'We follow the reference implementation described below.\n')
+        self.assertEqual(section(text, 'references'), '[1] A. Author. A paper. 2020.\n')
+
+    def test_last_references_heading_wins(self):
+        text = ('1. Introduction\nSee the list below.\n'
+                'Reference\n'
+                '2. Results\nIt works.\n'
+                'References\n[1] A. Author. A paper. 2020.\n'
+                '2. Second Entry Title Here\n')
+
+        sections = SectionSegmenter.segment(text)
+
+        self.assertEqual(section(text, 'results'), 'It works.\n')
+        self.assertEqual(SectionSegmenter.section_text(text, sections, 'references'),
+                         '[1] A. Author. A paper. 2020.\n2. Second Entry Title Here\n')
+
+    def test_first_occurrence_wins_for_other_sections(self):
+        text = '1. Results\nFirst.\n2. Discussion\nTalk.\n3. Results\nSecond.\n'
+
+        self.assertEqual(section(text, 'results'), 'First.\n')
+
+    def test_missing_section_is_empty(self):
+        self.assertEqual(section('Just a line of text.', 'abstract'), '')
+        self.assertEqual(SectionSegmenter.segment(''), {})
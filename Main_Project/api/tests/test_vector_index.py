@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from api import vector_index
+from api.models import ResearchPaper
+from api.vector_index import IDS_FILE, VECTORS_FILE, VectorIndex
+
+
+TOPICS = {
+    'folding': 'protein folding structure residues amino chains',
+    'graphs': 'graph nodes edges citation network ranking',
+    'vision': 'image pixels convolution camera vision segmentation',
+}
+
+
+def make_paper(title, full_text):
+    paper = ResearchPaper(title=title, processed=True)
+    paper.full_text = full_text
+    paper.save()
+    return paper
+
+
+class VectorIndexTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        settings = override_settings(VECTOR_INDEX_DIR=Path(directory), VECTOR_INDEX_DIMENSIONS=3)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(vector_index._loaded.clear)
+
+        self.papers = {topic: make_paper(topic.title(), text) for topic, text in TOPICS.items()}
+
+    def build(self):
+        return VectorIndex.build(ResearchPaper.objects.filter(processed=True))
+
+    def ids(self, query):
+        return [paper_id for paper_id, _ in VectorIndex.search(query)]
+
+    def rows(self):
+        directory = VectorIndex.directory()
+        return (directory / VECTORS_FILE).stat().st_size // (4 * 3), (directory / IDS_FILE).stat().st_size // 33
+
+    def test_search_before_build(self):
+        self.assertIsNone(VectorIndex.search('protein'))
+        self.assertFalse(VectorIndex.add_paper(self.papers['folding']))
+
+    def test_build_needs_two_papers(self):
+        with self.assertRaises(ValueError):
+            VectorIndex.build(ResearchPaper.objects.filter(pk=self.papers['folding'].pk))
+
+    def test_build_and_search(self):
+        self.assertEqual(self.build(), 3)
+
+        self.assertEqual(self.ids('protein residues')[0], str(self.papers['folding'].pk))
+        self.assertEqual(self.ids('citation graph')[0], str(self.papers['graphs'].pk))
+        self.assertEqual(self.ids('unknown words'), [])
+
+    def test_add_paper_folds_in_a_new_paper(self):
+        self.build()
+        paper = make_paper('Amino acid chains', 'protein structure')
+
+        self.assertTrue(VectorIndex.add_paper(paper))
+
+        self.assertIn(str(paper.pk), self.ids('protein folding'))
+        self.assertEqual(self.rows(), (4, 4))
+
+    def test_add_paper_replaces_an_existing_row(self):
+        self.build()
+        paper = self.papers['folding']
+
+        VectorIndex.add_paper(paper)
+        VectorIndex.add_paper(paper)
+
+        self.assertEqual(self.ids('protein residues').count(str(paper.pk)), 1)
+
+    def test_add_paper_uses_a_rebuilt_index(self):
+        self.build()
+        self.ids('protein')  # Caches the first build's state
+        make_paper('Camera calibration', 'camera image lens calibration')
+        self.build()
+        paper = make_paper('Lens design', 'camera lens image')
+
+        VectorIndex.add_paper(paper)
+
+        self.assertEqual(self.rows(), (5, 5))
+        self.assertIn(str(paper.pk), self.ids('camera lens'))
+
+    def test_deleted_papers_are_not_returned(self):
+        self.build()
+        deleted = self.papers['folding']
+
+        deleted.delete()
+
+        self.assertNotIn(str(deleted.pk), self.ids('protein residues'))
+        self.assertEqual(self.ids('graph')[0], str(self.papers['graphs'].pk))
+
+    def test_edits_through_push_reach_the_index(self):
+        self.build()
+        paper = self.papers['vision']
+
+        response = APIClient().post('/api/push/', {
+            'paper_id': str(paper.pk), 'updates': {'title': 'Protein residues'}
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(str(paper.pk), self.ids('protein residues'))
+        self.assertEqual(self.rows(), (4, 4))
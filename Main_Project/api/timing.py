@@ -0,0 +1,172 @@
+"""
+Per-request stage timings.
+
+Code marks the stages it wants measured:
+
+    with timing.stage('pdf_extract'):
+        ...
+
+    @timing.timed('summarize')
+    def generate_summary(...): ...
+
+ServerTimingMiddleware collects the stages of each request, returns them in
+a `Server-Timing` header (visible in the browser's network panel) and logs
+requests slower than SLOW_REQUEST_MS as one JSON line on the `api.timing`
+logger. Stages with the same name are summed. Outside a timed request (or
+with timing disabled) `stage` only does a context-variable lookup.
+
+This file is kept identical in Main_Project/api/timing.py and
+researchpapersummizer_backend/research_backend/api/timing.py. The two
+projects are deployed separately, each from its own directory and
+requirements, and share no installable package; change both together.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+
+logger = logging.getLogger('api.timing')
+
+_current: contextvars.ContextVar = contextvars.ContextVar('request_timings', default=None)
+
+
+class Timings:
+    """Stage durations (seconds) recorded during one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        # Stages can finish on worker threads
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        entries = [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.stages.items()]
+        entries.append(f'total;dur={self.total() * 1000:.1f}')
+        return ', '.join(entries)
+
+
+class stage:
+    """Context manager recording the duration of a stage on the current request."""
+
+    __slots__ = ('name', 'timings', 'started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.timings = _current.get()
+        if self.timings is not None:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.timings is not None:
+            self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator form of `stage`; the stage name defaults to the function name."""
+    def decorator(func):
+        label = name or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with stage(label):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current() -> Optional[Timings]:
+    return _current.get()
+
+
+def propagate(func: Callable) -> Callable:
+    """Bind `func` to the current request's timings, for work handed to another thread."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header to every response and logs slow requests.
+
+    Settings:
+        SERVER_TIMING    send the header (default True)
+        SLOW_REQUEST_MS  log requests slower than this; None disables (default 1000)
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.send_header = getattr(settings, 'SERVER_TIMING', True)
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 1000)
+        if not self.send_header and self.slow_ms is None:
+            raise MiddlewareNotUsed
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = Timings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def finish(self, request, response, timings: Timings):
+        if self.send_header:
+            response['Server-Timing'] = timings.header()
+        total_ms = timings.total() * 1000
+        if self.slow_ms is not None and total_ms >= self.slow_ms:
+            logger.warning('Slow request %s', json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total_ms, 1),
+                'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in timings.stages.items()},
+                'stage_counts': timings.counts,
+            }))
+        return response
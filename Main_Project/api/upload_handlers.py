@@ -0,0 +1,32 @@
+from django.core.files.uploadhandler import FileUploadHandler
+import hashlib
+
+
+def file_sha256(file) -> str:
+    """SHA-256 of an uploaded or stored file, read in chunks."""
+    hasher = hashlib.sha256()
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class SHA256UploadHandler(FileUploadHandler):
+    """
+    Hash uploaded files while they stream in.
+    Chunks are passed through unchanged to the next handler; the digests
+    are stored on the request as `upload_sha256` ({field name: hex digest}).
+    """
+    
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.hasher = hashlib.sha256()
+    
+    def receive_data_chunk(self, raw_data, start):
+        self.hasher.update(raw_data)
+        return raw_data
+    
+    def file_complete(self, file_size):
+        digests = getattr(self.request, 'upload_sha256', None) or {}
+        digests[self.field_name] = self.hasher.hexdigest()
+        self.request.upload_sha256 = digests
+        return None
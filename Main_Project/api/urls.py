@@ -3,6 +3,10 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_paper, name='upload_paper'),
+    path('upload/batch/', views.upload_batch, name='upload_batch'),
+    path('uploads/', views.upload_init, name='upload_init'),
+    path('uploads/<uuid:upload_id>/', views.upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', views.upload_finalize, name='upload_finalize'),
     path('papers/', views.get_papers, name='get_papers'),
     path('search/', views.semantic_search, name='semantic_search'),
     path('result/<uuid:paper_id>/', views.get_result, name='get_result'),
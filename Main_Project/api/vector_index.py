@@ -0,0 +1,310 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import json
+import math
+import os
+import uuid
+
+import numpy as np
+from django.conf import settings
+
+from .search_index import SearchIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+VOCABULARY_FILE = 'vocabulary.json'
+PROJECTION_FILE = 'projection.npy'
+VECTORS_FILE = 'vectors.f32'
+IDS_FILE = 'paper_ids.txt'
+LOCK_FILE = '.lock'
+
+# Paper ids are stored as fixed-width hex lines so the file can be memory-mapped
+ID_WIDTH = 33
+
+# Per-process cache of the memory-mapped index, keyed by the vocabulary file
+_loaded = {}
+
+
+class VectorIndex:
+    """
+    Latent semantic (TF-IDF + truncated SVD) vector search.
+
+    Paper vectors live in one contiguous float32 matrix on disk. Every worker
+    memory-maps the same file, so the pages are shared through the OS page
+    cache instead of each process holding its own copy.
+    """
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(getattr(settings, 'VECTOR_INDEX_DIR', settings.BASE_DIR / 'vector_index'))
+
+    @staticmethod
+    def document_terms(paper) -> Counter:
+        text = ' '.join([paper.title or '', paper.abstract or '', paper.full_text or ''])
+        return Counter(SearchIndex.tokenize(text))
+
+    @staticmethod
+    def build(papers, dimensions: Optional[int] = None, max_features: int = 50000) -> int:
+        """
+        Build the index from scratch and atomically replace the files on disk.
+        `papers` is a queryset streamed twice (document frequencies, then
+        term vectors). Returns the number of indexed papers.
+        """
+        from scipy import sparse
+        from scipy.sparse.linalg import svds
+
+        if dimensions is None:
+            dimensions = getattr(settings, 'VECTOR_INDEX_DIMENSIONS', 128)
+
+        doc_freq = Counter()
+        n_docs = 0
+        for paper in papers.iterator():
+            doc_freq.update(VectorIndex.document_terms(paper).keys())
+            n_docs += 1
+        if n_docs < 2:
+            raise ValueError('At least two processed papers are needed to build the vector index')
+
+        min_df = 2 if n_docs >= 10 else 1
+        vocabulary = [term for term, df in doc_freq.most_common(max_features) if df >= min_df]
+        columns = {term: i for i, term in enumerate(vocabulary)}
+        idf = np.array(
+            [math.log((1 + n_docs) / (1 + doc_freq[term])) + 1 for term in vocabulary],
+            dtype=np.float32
+        )
+
+        paper_ids, indptr, indices, data = [], [0], [], []
+        for paper in papers.iterator():
+            row = VectorIndex._tfidf(VectorIndex.document_terms(paper), columns, idf)
+            indices.extend(row[0])
+            data.extend(row[1])
+            indptr.append(len(indices))
+            paper_ids.append(paper.id)
+
+        matrix = sparse.csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), indptr),
+            shape=(len(paper_ids), len(vocabulary))
+        )
+
+        k = min(dimensions, min(matrix.shape) - 1)
+        if k >= 1 and min(matrix.shape) > dimensions + 1:
+            _, _, vt = svds(matrix, k=k)
+        else:
+            # Tiny corpus: a dense SVD is cheaper and svds needs k < min(shape)
+            _, _, vt = np.linalg.svd(matrix.toarray(), full_matrices=False)
+            vt = vt[:dimensions]
+        projection = np.ascontiguousarray(vt.T, dtype=np.float32)
+        vectors = VectorIndex._normalize(np.asarray(matrix @ projection, dtype=np.float32))
+
+        directory = VectorIndex.directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        with VectorIndex._lock(directory):
+            VectorIndex._write_atomic(directory / VECTORS_FILE, vectors.tobytes())
+            VectorIndex._write_atomic(
+                directory / IDS_FILE,
+                ''.join(VectorIndex._id_line(pid) for pid in paper_ids).encode('ascii')
+            )
+            tmp = directory / (PROJECTION_FILE + '.tmp.npy')
+            np.save(tmp, projection)
+            os.replace(tmp, directory / PROJECTION_FILE)
+            # Written last: readers reload everything when this file changes
+            VectorIndex._write_atomic(directory / VOCABULARY_FILE, json.dumps({
+                'terms': vocabulary,
+                'idf': idf.tolist(),
+                'dimensions': projection.shape[1],
+            }).encode('utf-8'))
+
+        return len(paper_ids)
+
+    @staticmethod
+    def add_paper(paper) -> bool:
+        """
+        Fold a newly ingested (or edited) paper into an existing index,
+        replacing any row it already has. Returns False when no index has
+        been built yet.
+        """
+        directory = VectorIndex.directory()
+        if not (directory / VOCABULARY_FILE).exists():
+            return False
+        terms = VectorIndex.document_terms(paper)
+
+        # Under the lock, so a concurrent build cannot swap the projection
+        # between projecting the paper and appending its row
+        with VectorIndex._lock(directory):
+            state = VectorIndex._load()
+            if state is None:
+                return False
+            VectorIndex._clear_rows(directory, state, paper.id)
+            vector = VectorIndex._project(terms, state)
+            if vector is None:
+                return False
+            with open(directory / VECTORS_FILE, 'ab') as f:
+                f.write(vector.astype(np.float32).tobytes())
+            with open(directory / IDS_FILE, 'ab') as f:
+                f.write(VectorIndex._id_line(paper.id).encode('ascii'))
+        return True
+
+    @staticmethod
+    def remove_paper(paper_id) -> None:
+        """Drop a paper from search results until the next build."""
+        directory = VectorIndex.directory()
+        if not (directory / VOCABULARY_FILE).exists():
+            return
+        with VectorIndex._lock(directory):
+            state = VectorIndex._load()
+            if state is not None:
+                VectorIndex._clear_rows(directory, state, paper_id)
+
+    @staticmethod
+    def search(query: str, top_k: int = 10) -> Optional[List[Tuple[str, float]]]:
+        """
+        Return (paper_id, cosine similarity) pairs, best first, or None when
+        the index has not been built.
+        """
+        state = VectorIndex._load()
+        if state is None:
+            return None
+
+        vectors, ids = VectorIndex._matrix(state)
+        query_vector = VectorIndex._project(Counter(SearchIndex.tokenize(query)), state)
+        if query_vector is None or len(vectors) == 0 or top_k <= 0:
+            return []
+
+        scores = vectors @ query_vector
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (str(uuid.UUID(ids[i].decode('ascii').strip())), float(scores[i]))
+            for i in top if scores[i] > 0
+        ]
+
+    @staticmethod
+    def _tfidf(counts: Counter, columns: Dict[str, int], idf: np.ndarray):
+        cols, values = [], []
+        for term, count in counts.items():
+            col = columns.get(term)
+            if col is not None:
+                cols.append(col)
+                values.append((1 + math.log(count)) * idf[col])
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return cols, [v / norm for v in values]
+
+    @staticmethod
+    def _project(counts: Counter, state) -> Optional[np.ndarray]:
+        cols, values = VectorIndex._tfidf(counts, state['columns'], state['idf'])
+        if not cols:
+            return None
+        vector = np.asarray(values, dtype=np.float32) @ state['projection'][cols]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @staticmethod
+    def _load():
+        directory = VectorIndex.directory()
+        try:
+            stat = os.stat(directory / VOCABULARY_FILE)
+        except FileNotFoundError:
+            return None
+
+        key = (str(directory), stat.st_ino, stat.st_mtime_ns)
+        state = _loaded.get(str(directory))
+        if state is None or state['key'] != key:
+            with open(directory / VOCABULARY_FILE, encoding='utf-8') as f:
+                vocabulary = json.load(f)
+            state = {
+                'key': key,
+                'columns': {term: i for i, term in enumerate(vocabulary['terms'])},
+                'idf': np.asarray(vocabulary['idf'], dtype=np.float32),
+                'dimensions': vocabulary['dimensions'],
+                'projection': np.load(directory / PROJECTION_FILE, mmap_mode='r'),
+                'rows': -1,
+            }
+            _loaded[str(directory)] = state
+        return state
+
+    @staticmethod
+    def _matrix(state):
+        """Memory-map the vectors and ids, remapping only when rows were appended."""
+        directory = VectorIndex.directory()
+        row_bytes = 4 * state['dimensions']
+        rows = min(
+            os.path.getsize(directory / VECTORS_FILE) // row_bytes,
+            os.path.getsize(directory / IDS_FILE) // ID_WIDTH
+        )
+        if rows != state['rows']:
+            if rows:
+                state['vectors'] = np.memmap(
+                    directory / VECTORS_FILE, dtype=np.float32, mode='r',
+                    shape=(rows, state['dimensions'])
+                )
+                state['ids'] = np.memmap(
+                    directory / IDS_FILE, dtype=f'S{ID_WIDTH}', mode='r', shape=(rows,)
+                )
+            else:
+                state['vectors'] = np.zeros((0, state['dimensions']), dtype=np.float32)
+                state['ids'] = np.zeros((0,), dtype=f'S{ID_WIDTH}')
+            state['rows'] = rows
+        return state['vectors'], state['ids']
+
+    @staticmethod
+    def _clear_rows(directory: Path, state, paper_id) -> None:
+        """
+        Zero a paper's vectors in place; caller holds the lock. A zero
+        vector scores 0, which search never returns, and the rows stay put
+        so memory-mapped readers need not remap.
+        """
+        ids = np.fromfile(directory / IDS_FILE, dtype=f'S{ID_WIDTH}')
+        rows = np.flatnonzero(ids == VectorIndex._id_line(paper_id).encode('ascii'))
+        if not len(rows):
+            return
+        row_bytes = 4 * state['dimensions']
+        with open(directory / VECTORS_FILE, 'r+b') as f:
+            for row in rows:
+                f.seek(int(row) * row_bytes)
+                f.write(bytes(row_bytes))
+
+    @staticmethod
+    def _id_line(paper_id) -> str:
+        return uuid.UUID(str(paper_id)).hex + '\n'
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _lock(directory: Path):
+        return _FileLock(directory / LOCK_FILE)
+
+
+class _FileLock:
+    """Exclusive advisory lock so concurrent workers append whole rows."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
@@ -3,10 +3,51 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
-from .models import ResearchPaper, SearchQuery
-from .pdf_processor import PDFProcessor
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import ResearchPaper, SearchQuery, UploadSession
 from .ai_processor import AIProcessor
+from .search_index import SearchIndex
+from .sections import SectionSegmenter
+from .vector_index import VectorIndex
+from .fulltext import get_backend as get_fulltext_backend
+from .upload_handlers import file_sha256
+from . import batch_ingest
+from . import chunked_upload
+from . import ingest
+from . import timing
+import base64
+import json
 import os
+import uuid
+import zipfile
+
+
+# Columns returned by the paper list; the large text and JSON columns are never read
+PAPER_LIST_FIELDS = ('id', 'title', 'uploaded_at', 'processed', 'page_count', 'word_count')
+PAPER_LIST_MAX_LIMIT = 500
+
+
+def encode_cursor(uploaded_at, paper_id) -> str:
+    """Opaque cursor for the position after a paper in the (uploaded_at, id) ordering."""
+    raw = json.dumps([uploaded_at.isoformat(), str(paper_id)]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    """(uploaded_at, id) from a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        uploaded_at, paper_id = json.loads(raw)
+        uploaded_at = parse_datetime(uploaded_at)
+        paper_id = uuid.UUID(paper_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if uploaded_at is None:
+        raise ValueError('Invalid cursor')
+    return uploaded_at, paper_id
 
 
 @api_view(['POST'])
@@ -30,33 +71,196 @@ def upload_paper(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    # Reuse the results of an identical file that was already uploaded
+    with timing.stage('hash'):
+        content_hash = getattr(request, 'upload_sha256', {}).get('file') or file_sha256(file)
+    existing = _find_existing(content_hash)
+    if existing is not None:
+        return _existing_response(existing)
+    
     # Create ResearchPaper instance
-    paper = ResearchPaper(file=file)
-    paper.save()
+    paper = ResearchPaper(file=file, content_hash=content_hash)
+    with timing.stage('file_save'):
+        paper.save()
+    
+    return _ingest_response(request, paper, file.name)
+
+
+@api_view(['POST'])
+def upload_batch(request):
+    """
+    API endpoint to upload many research paper PDFs at once.
+    POST /api/upload/batch/
+    Multipart: any number of `files` PDFs and/or an `archive` zip of PDFs;
+    `async=true` (or INGEST_ASYNC) returns 202 and processes them in the background.
+    
+    Papers are processed across a process pool and written in bulk; follow
+    each one with GET /api/result/{id}/.
+    """
+    files = request.FILES.getlist('files')
+    archive = request.FILES.get('archive')
+    if not files and archive is None:
+        return Response(
+            {'error': 'No files provided'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if any(not file.name.endswith('.pdf') for file in files):
+        return Response(
+            {'error': 'Only PDF files are allowed'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    members = []
+    if archive is not None:
+        try:
+            archive = zipfile.ZipFile(archive)
+        except zipfile.BadZipFile:
+            return Response(
+                {'error': 'archive must be a zip file'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        members = [info for info in archive.infolist() if not info.is_dir() and info.filename.endswith('.pdf')]
+    
+    max_files = getattr(settings, 'INGEST_BATCH_MAX_FILES', 500)
+    if len(files) + len(members) > max_files:
+        return Response(
+            {'error': f'A batch is limited to {max_files} files'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Archive members are checked by their uncompressed size, which zipfile
+    # also enforces while reading, so a small archive cannot expand past it
+    max_file_size = getattr(settings, 'INGEST_BATCH_MAX_FILE_SIZE', 100 * 1024 * 1024)
+    max_total_size = getattr(settings, 'INGEST_BATCH_MAX_TOTAL_SIZE', 1024 * 1024 * 1024)
+    sizes = [(file.name, file.size) for file in files] + [(info.filename, info.file_size) for info in members]
+    too_large = [name for name, size in sizes if size > max_file_size]
+    if too_large:
+        return Response(
+            {'error': f'Files are limited to {max_file_size} bytes: {", ".join(too_large[:10])}'}, 
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    if sum(size for _, size in sizes) > max_total_size:
+        return Response(
+            {'error': f'A batch is limited to {max_total_size} bytes in total'}, 
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    
+    def sources():
+        for file in files:
+            yield file.name, file
+        for info in members:
+            with archive.open(info) as member:
+                yield info.filename, member
+    
+    with timing.stage('file_save'):
+        entries = batch_ingest.create_papers(sources())
+    papers = [entry['paper'] for entry in entries if 'paper' in entry]
+    
+    run_async = request.data.get('async')
+    if run_async is None:
+        run_async = getattr(settings, 'INGEST_ASYNC', False)
+    else:
+        run_async = str(run_async).lower() in ('1', 'true', 'yes')
+    
+    errors = {}
+    if papers and run_async:
+        batch_ingest.submit(papers)
+    elif papers:
+        def progress(written):
+            errors.update((paper.pk, error) for paper, error in written if error)
+        try:
+            with timing.stage('batch_ingest'):
+                batch_ingest.ingest_batch(papers, progress=progress)
+        except Exception as e:
+            batch_ingest.fail_unfinished([paper.pk for paper in papers], e)
+            return Response(
+                {'error': f'Error processing batch: {str(e)}', 'ids': [str(paper.id) for paper in papers]}, 
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    results = []
+    for entry in entries:
+        if 'existing' in entry:
+            paper = entry['existing']
+            results.append({
+                'filename': entry['filename'],
+                'id': str(paper.id),
+                'status': 'duplicate',
+                'processed': paper.processed,
+            })
+            continue
+        paper = entry['paper']
+        result = {'filename': entry['filename'], 'id': str(paper.id)}
+        if run_async:
+            result['status'] = 'queued'
+        elif paper.pk in errors:
+            result.update(status='failed', error=errors[paper.pk])
+        else:
+            result.update(status='processed', title=paper.title, page_count=paper.page_count)
+        results.append(result)
+    
+    return Response({
+        'status': 'processing' if run_async else 'success',
+        'count': len(results),
+        'new': len(papers),
+        'failed': len(errors),
+        'papers': results,
+    }, status=status.HTTP_202_ACCEPTED if run_async else status.HTTP_201_CREATED)
+
+
+def _find_existing(content_hash: str):
+    """An earlier, not failed upload of the same file, if any."""
+    with timing.stage('dedup_lookup'):
+        # A copy whose job was lost must not absorb this upload
+        ingest.fail_stale(ResearchPaper.objects.filter(content_hash=content_hash))
+        return ResearchPaper.objects.filter(content_hash=content_hash).exclude(
+            processing_stage=ResearchPaper.STAGE_FAILED
+        ).order_by('uploaded_at').first()
+
+
+def _existing_response(existing: ResearchPaper) -> Response:
+    if not existing.processed:
+        return Response({
+            'id': str(existing.id),
+            'status': 'processing',
+            'message': 'An identical paper is already being processed',
+            'processed': False,
+            'deduplicated': True,
+            **ingest.stage_progress(existing.processing_stage),
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    return Response({
+        'id': str(existing.id),
+        'title': existing.title,
+        'status': 'success',
+        'message': 'Identical paper already uploaded; returning existing results',
+        'page_count': existing.page_count,
+        'word_count': existing.word_count,
+        'processed': existing.processed,
+        'deduplicated': True,
+    }, status=status.HTTP_200_OK)
+
+
+def _ingest_response(request, paper: ResearchPaper, filename: str) -> Response:
+    """Process a saved upload in the request, or queue it in background mode."""
+    run_async = request.data.get('async')
+    if run_async is None:
+        run_async = getattr(settings, 'INGEST_ASYNC', False)
+    else:
+        run_async = str(run_async).lower() in ('1', 'true', 'yes')
+    
+    if run_async:
+        ingest.submit(paper, filename)
+        return Response({
+            'id': str(paper.id),
+            'status': 'processing',
+            'message': 'Paper uploaded and queued for processing',
+            'processed': False,
+            **ingest.stage_progress(paper.processing_stage),
+        }, status=status.HTTP_202_ACCEPTED)
     
     try:
-        # Process PDF
-        pdf_path = paper.file.path
-        processor = PDFProcessor()
-        extracted_data = processor.extract_text(pdf_path)
-        
-        # Store extracted data
-        paper.full_text = extracted_data.get('full_text', '')
-        paper.title = extracted_data.get('title', file.name) or file.name
-        paper.abstract = extracted_data.get('abstract', '')
-        paper.keywords = extracted_data.get('keywords', [])
-        paper.authors = extracted_data.get('authors', [])
-        paper.references = extracted_data.get('references', [])
-        paper.page_count = extracted_data.get('page_count', 0)
-        paper.word_count = extracted_data.get('word_count', 0)
-        
-        # Generate AI summary
-        ai_processor = AIProcessor()
-        if paper.full_text:
-            paper.summary = ai_processor.generate_summary(paper.full_text)
-        
-        paper.processed = True
-        paper.save()
+        ingest.process_paper(paper, filename)
         
         return Response({
             'id': str(paper.id),
@@ -76,18 +280,236 @@ def upload_paper(request):
         )
 
 
+def _upload_status(session: UploadSession) -> dict:
+    return {
+        'upload_id': str(session.id),
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.received,
+        'status': session.status,
+        'paper_id': str(session.paper_id) if session.paper_id else None,
+    }
+
+
+@api_view(['POST'])
+def upload_init(request):
+    """
+    Start a chunked, resumable upload.
+    POST /api/uploads/
+    Body: {"filename": "paper.pdf", "size": 123456789, "sha256": "<optional hex digest>"}
+    
+    Then PUT the file in order to /api/uploads/{upload_id}/ and POST
+    /api/uploads/{upload_id}/finalize/ to process it.
+    """
+    filename = str(request.data.get('filename', ''))
+    expected_sha256 = str(request.data.get('sha256', '')).lower()
+    try:
+        size = int(request.data.get('size'))
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'size must be an integer'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not filename.endswith('.pdf'):
+        return Response(
+            {'error': 'Only PDF files are allowed'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    max_size = settings.CHUNKED_UPLOAD_MAX_SIZE
+    if not 0 < size <= max_size:
+        return Response(
+            {'error': f'size must be between 1 and {max_size} bytes'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if expected_sha256 and (len(expected_sha256) != 64 or set(expected_sha256) - set('0123456789abcdef')):
+        return Response(
+            {'error': 'sha256 must be a hex SHA-256 digest'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    with timing.stage('expire_uploads'):
+        chunked_upload.expire_stale()
+    session = UploadSession.objects.create(
+        filename=filename[:255], size=size, expected_sha256=expected_sha256
+    )
+    chunked_upload.create_partial(session)
+    return Response({
+        **_upload_status(session),
+        'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+def upload_chunk(request, upload_id):
+    """
+    API endpoint for the chunks of an upload started with upload_init.
+    GET /api/uploads/{upload_id}/ - status, including the offset to resume from
+    PUT /api/uploads/{upload_id}/?offset=N - the next chunk as the raw request body
+        (the offset can also be sent as an Upload-Offset header)
+    DELETE /api/uploads/{upload_id}/ - abandon the upload
+    """
+    session = get_object_or_404(UploadSession, id=upload_id)
+    
+    if request.method == 'GET':
+        return Response(_upload_status(session), status=status.HTTP_200_OK)
+    
+    if request.method == 'DELETE':
+        if session.status == UploadSession.STATUS_OPEN:
+            chunked_upload.discard(session)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    if session.status != UploadSession.STATUS_OPEN:
+        return Response(
+            {'error': 'Upload is already finalized', **_upload_status(session)}, 
+            status=status.HTTP_409_CONFLICT
+        )
+    try:
+        offset = int(request.GET.get('offset', request.META.get('HTTP_UPLOAD_OFFSET')))
+        length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except (TypeError, ValueError):
+        return Response(
+            {'error': 'offset and Content-Length must be integers'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Chunks must arrive in order; a client that lost track resumes from `offset`
+    if offset != session.received:
+        return Response(
+            {'error': f'Expected a chunk at offset {session.received}', **_upload_status(session)}, 
+            status=status.HTTP_409_CONFLICT
+        )
+    if length <= 0:
+        return Response(
+            {'error': 'Chunk is empty'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        return Response(
+            {'error': f'Chunks are limited to {settings.CHUNKED_UPLOAD_CHUNK_SIZE} bytes'}, 
+            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        )
+    if offset + length > session.size:
+        return Response(
+            {'error': f'Chunk ends past the declared size of {session.size} bytes'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    with chunked_upload.exclusive(session) as locked:
+        if not locked:
+            return Response(
+                {'error': 'Another request is writing to this upload', **_upload_status(session)}, 
+                status=status.HTTP_409_CONFLICT
+            )
+        # Another chunk may have landed before the lock was taken
+        session.refresh_from_db()
+        if session.status != UploadSession.STATUS_OPEN or offset != session.received:
+            return Response(
+                {'error': f'Expected a chunk at offset {session.received}', **_upload_status(session)}, 
+                status=status.HTTP_409_CONFLICT
+            )
+        try:
+            with timing.stage('chunk_write'):
+                hasher = chunked_upload.write_chunk(session, request.stream, offset, length)
+        except ValueError as e:
+            return Response(
+                {'error': str(e), **_upload_status(session)}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Without flock (Windows) only this conditional update picks a winner
+        advanced = UploadSession.objects.filter(
+            id=session.id, status=UploadSession.STATUS_OPEN, received=offset
+        ).update(received=offset + length, updated_at=timezone.now())
+        session.refresh_from_db()
+        if not advanced:
+            return Response(
+                {'error': 'Another request wrote this chunk first', **_upload_status(session)}, 
+                status=status.HTTP_409_CONFLICT
+            )
+        chunked_upload.acknowledge(session, session.received, hasher)
+    return Response(_upload_status(session), status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+def upload_finalize(request, upload_id):
+    """
+    API endpoint to finish a chunked upload and process the paper.
+    POST /api/uploads/{upload_id}/finalize/
+    Body: {"async": true} (optional, as for /api/upload/)
+    """
+    session = get_object_or_404(UploadSession, id=upload_id)
+    
+    if session.status == UploadSession.STATUS_COMPLETE:
+        # A retried finalize: report what the first one produced
+        if session.paper_id is not None:
+            return _existing_response(session.paper)
+        return Response(
+            {'error': 'Upload was finalized but its paper no longer exists', **_upload_status(session)}, 
+            status=status.HTTP_410_GONE
+        )
+    if session.received != session.size:
+        return Response(
+            {'error': f'Upload is incomplete: {session.received} of {session.size} bytes received', 
+             **_upload_status(session)}, 
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    with timing.stage('hash'):
+        content_hash = chunked_upload.digest(session)
+    if session.expected_sha256 and content_hash != session.expected_sha256:
+        chunked_upload.discard(session)
+        session.delete()
+        return Response(
+            {'error': f'SHA-256 mismatch: received {content_hash}; upload discarded'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # Claim the session so a concurrent finalize cannot process it twice
+    if not UploadSession.objects.filter(id=session.id, status=UploadSession.STATUS_OPEN).update(
+        status=UploadSession.STATUS_COMPLETE, updated_at=timezone.now()
+    ):
+        return Response(
+            {'error': 'Upload is already being finalized', **_upload_status(session)}, 
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    existing = _find_existing(content_hash)
+    if existing is not None:
+        chunked_upload.discard(session)
+        UploadSession.objects.filter(id=session.id).update(paper=existing)
+        return _existing_response(existing)
+    
+    paper = ResearchPaper(content_hash=content_hash)
+    with timing.stage('file_save'):
+        paper.file.name = chunked_upload.complete(session)
+        paper.save()
+    UploadSession.objects.filter(id=session.id).update(paper=paper)
+    
+    return _ingest_response(request, paper, session.filename)
+
+
 @api_view(['GET'])
 def get_papers(request):
     """
     API endpoint to get all research papers or a specific paper.
-    GET /api/papers/ - get all papers
-    GET /api/papers/{id}/ - get specific paper
+    GET /api/papers/ - newest papers first, `limit` (default 100) per page
+    GET /api/papers/?cursor=<next_cursor> - the next page
+    GET /api/papers/?processed=true|false - only (un)processed papers
+    GET /api/papers/?id={id} - get specific paper
     """
     paper_id = request.GET.get('id')
     
     if paper_id:
         try:
-            paper = get_object_or_404(ResearchPaper, id=paper_id)
+            paper = get_object_or_404(
+                ResearchPaper.objects.select_related('content').only(
+                    'id', 'title', 'uploaded_at', 'processed', 'page_count', 'word_count',
+                    'authors', 'keywords', 'content'
+                ),
+                id=paper_id
+            )
             return Response({
                 'id': str(paper.id),
                 'title': paper.title,
@@ -105,20 +527,62 @@ def get_papers(request):
                 status=status.HTTP_404_NOT_FOUND
             )
     else:
-        # Get all papers
-        papers = ResearchPaper.objects.all()[:100]  # Limit to 100 most recent
+        # Keyset pagination: each page starts after the last (uploaded_at, id)
+        # of the previous one, so deep pages cost the same as the first
+        try:
+            limit = min(PAPER_LIST_MAX_LIMIT, max(1, int(request.GET.get('limit', 100))))
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        papers = ResearchPaper.objects.order_by('-uploaded_at', '-id')
+        
+        processed = request.GET.get('processed')
+        if processed is not None:
+            if processed.lower() not in ('true', 'false', '1', '0'):
+                return Response(
+                    {'error': 'processed must be true or false'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            papers = papers.filter(processed=processed.lower() in ('true', '1'))
+        
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                uploaded_at, last_id = decode_cursor(cursor)
+            except ValueError as e:
+                return Response(
+                    {'error': str(e)}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            papers = papers.filter(
+                Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=last_id)
+            )
+        
+        # One extra row tells whether there is a next page
+        rows = list(papers.values(*PAPER_LIST_FIELDS)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
         papers_data = [{
-            'id': str(paper.id),
-            'title': paper.title,
-            'uploaded_at': paper.uploaded_at.isoformat(),
-            'processed': paper.processed,
-            'page_count': paper.page_count,
-            'word_count': paper.word_count,
-        } for paper in papers]
+            'id': str(row['id']),
+            'title': row['title'],
+            'uploaded_at': row['uploaded_at'].isoformat(),
+            'processed': row['processed'],
+            'page_count': row['page_count'],
+            'word_count': row['word_count'],
+        } for row in rows]
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(rows[-1]['uploaded_at'], rows[-1]['id'])
         
         return Response({
             'papers': papers_data,
-            'count': len(papers_data)
+            'count': len(papers_data),
+            'next_cursor': next_cursor,
         }, status=status.HTTP_200_OK)
 
 
@@ -127,10 +591,11 @@ def semantic_search(request):
     """
     API endpoint for semantic search across research papers.
     POST /api/search/
-    Body: {"query": "search term", "limit": 10}
+    Body: {"query": "search term", "limit": 10, "mode": "keyword" | "semantic" | "fulltext"}
     """
     query_text = request.data.get('query', '')
     limit = int(request.data.get('limit', 10))
+    mode = request.data.get('mode', 'keyword')
     
     if not query_text:
         return Response(
@@ -138,45 +603,74 @@ def semantic_search(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    if mode not in ('keyword', 'semantic', 'fulltext'):
+        return Response(
+            {'error': "mode must be 'keyword', 'semantic' or 'fulltext'"}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
     try:
-        # Get all processed papers
-        papers = ResearchPaper.objects.filter(processed=True)
-        
-        # Prepare documents for search
-        documents = []
-        for paper in papers:
-            documents.append({
-                'id': str(paper.id),
-                'title': paper.title,
-                'text': paper.full_text[:5000],  # Limit text for performance
-                'abstract': paper.abstract,
-                'keywords': paper.keywords,
-            })
+        if mode == 'semantic':
+            # Rank papers by LSA cosine similarity
+            with timing.stage('rank'):
+                ranked = VectorIndex.search(query_text, top_k=limit)
+            if ranked is None:
+                return Response(
+                    {'error': 'Vector index has not been built. Run manage.py build_vector_index.'}, 
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+        elif mode == 'fulltext':
+            # Rank papers inside the database (SQLite FTS5 / PostgreSQL tsvector)
+            backend = get_fulltext_backend()
+            if backend is None:
+                return Response(
+                    {'error': 'Full-text index is not available on this database. Run manage.py migrate.'}, 
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+            with timing.stage('rank'):
+                ranked = backend.search(query_text, top_k=limit)
+        else:
+            # Rank papers using the inverted index
+            with timing.stage('rank'):
+                ranked = SearchIndex.search(query_text, top_k=limit)
         
-        # Perform semantic search
-        ai_processor = AIProcessor()
-        search_results = ai_processor.semantic_search(query_text, documents, top_k=limit)
+        with timing.stage('db_fetch'):
+            papers = ResearchPaper.objects.filter(
+                id__in=[paper_id for paper_id, _ in ranked]
+            ).select_related('content').only('id', 'title', 'keywords', 'content')
+            papers_by_id = {str(paper.id): paper for paper in papers}
+        with timing.stage('locate_page'):
+            pages = SearchIndex.locate_pages(list(papers_by_id), query_text)
         
         # Format results
         results = []
-        for result in search_results:
-            doc = result['document']
+        for paper_id, score in ranked:
+            paper = papers_by_id.get(paper_id)
+            if paper is None:
+                continue
+            if mode == 'semantic':
+                relevance = max(0, int(score * 100))
+            else:
+                relevance = min(100, int(score * 10))
             results.append({
-                'id': doc['id'],
-                'title': doc['title'],
-                'abstract': doc.get('abstract', '')[:300],
-                'relevance_score': result['relevance'],
-                'keywords': doc.get('keywords', [])[:5],
+                'id': paper_id,
+                'title': paper.title,
+                'abstract': (paper.abstract or '')[:300],
+                'relevance_score': relevance,
+                'keywords': (paper.keywords or [])[:5],
+                'page': pages.get(paper_id),
             })
         
         # Save search query
-        search_query = SearchQuery.objects.create(
-            query=query_text,
-            results=results
-        )
+        with timing.stage('db_log'):
+            search_query = SearchQuery.objects.create(
+                query=query_text,
+                results=results
+            )
         
         return Response({
             'query': query_text,
+            'mode': mode,
             'results': results,
             'count': len(results),
             'search_id': str(search_query.id)
@@ -194,20 +688,63 @@ def get_result(request, paper_id):
     """
     API endpoint to get detailed results for a specific paper.
     GET /api/result/{paper_id}/
+    GET /api/result/{paper_id}/?page=1&page_size=5 - page through the text
     """
     try:
-        paper = get_object_or_404(ResearchPaper, id=paper_id)
+        # full_text is only inflated in full if insights must be recomputed
+        with timing.stage('db_fetch'):
+            paper = get_object_or_404(ResearchPaper.objects.select_related('content'), id=paper_id)
         
         if not paper.processed:
+            if ingest.fail_stale(ResearchPaper.objects.filter(pk=paper.pk)):
+                paper.refresh_from_db(fields=['processing_stage', 'processing_error'])
+            if paper.processing_stage == ResearchPaper.STAGE_FAILED:
+                return Response({
+                    'id': str(paper.id),
+                    'status': 'failed',
+                    'error': paper.processing_error,
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            
             return Response({
                 'id': str(paper.id),
                 'status': 'processing',
-                'message': 'Paper is still being processed'
+                'message': 'Paper is still being processed',
+                **ingest.stage_progress(paper.processing_stage),
             }, status=status.HTTP_202_ACCEPTED)
         
-        # Get AI insights
-        ai_processor = AIProcessor()
-        insights = ai_processor.extract_key_insights(paper.full_text)
+        # Insights are computed at ingest; recompute if the extractor changed
+        if paper.insights_version != AIProcessor.INSIGHTS_VERSION:
+            with timing.stage('insights_recompute'):
+                ai_processor = AIProcessor()
+                if not paper.sections:
+                    paper.sections = SectionSegmenter.segment(paper.full_text)
+                paper.insights = ai_processor.extract_key_insights(paper.full_text, paper.sections)
+                paper.insights_version = AIProcessor.INSIGHTS_VERSION
+                paper.save(update_fields=['sections', 'insights', 'insights_version'])
+        
+        text_data = {'full_text': paper.full_text_prefix(10000)}  # Limit for API response
+        if 'page' in request.GET:
+            try:
+                page = max(1, int(request.GET.get('page', 1)))
+                page_size = min(50, max(1, int(request.GET.get('page_size', 5))))
+            except ValueError:
+                return Response(
+                    {'error': 'page and page_size must be integers'}, 
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            first = (page - 1) * page_size + 1
+            pages = paper.pages.filter(
+                page_number__gte=first, page_number__lt=first + page_size
+            ).values('page_number', 'text', 'char_start', 'char_end')
+            with timing.stage('db_pages'):
+                pages = list(pages)
+            text_data = {
+                'pages': pages,
+                'page': page,
+                'page_size': page_size,
+                'has_more': first + page_size <= paper.page_count,
+            }
         
         return Response({
             'id': str(paper.id),
@@ -215,13 +752,13 @@ def get_result(request, paper_id):
             'uploaded_at': paper.uploaded_at.isoformat(),
             'summary': paper.summary,
             'abstract': paper.abstract,
-            'full_text': paper.full_text[:10000],  # Limit for API response
+            **text_data,
             'keywords': paper.keywords,
             'authors': paper.authors,
             'references': paper.references[:20],  # Limit references
             'page_count': paper.page_count,
             'word_count': paper.word_count,
-            'insights': insights,
+            'insights': paper.insights,
             'metadata': {
                 'processed': paper.processed,
             }
@@ -261,6 +798,14 @@ def push_results(request):
         
         paper.save()
         
+        # Re-index when searchable fields change
+        indexed_fields = ['title', 'keywords', 'abstract']
+        if paper.processed and any(field in updates for field in indexed_fields):
+            SearchIndex.index_paper(paper)
+        if paper.processed and any(field in updates for field in ('title', 'abstract')):
+            # Replaces the paper's vector, projected with the current model
+            VectorIndex.add_paper(paper)
+        
         return Response({
             'id': str(paper.id),
             'status': 'success',
@@ -0,0 +1,182 @@
+"""
+Ingest benchmark for PDFProcessor and AIProcessor over synthetic papers.
+
+Each stage is timed over a size sweep so its scaling curve shows:
+
+  extract     PDFProcessor.extract_text on PDFs of --pages pages
+  summary     AIProcessor.generate_summary on texts of --pages pages
+  insights    AIProcessor.extract_key_insights on texts of --pages pages
+  search      AIProcessor.semantic_search over --docs documents
+  pathological  summary, insights and section segmentation of 2MB
+              adversarial inputs (synthetic.PATHOLOGICAL)
+
+Every case runs in a fresh process, so the reported peak RSS belongs to
+that case alone. The JSON report has, per case, the best and median time
+over --repeats runs, peak RSS and the RSS the input itself took; per stage
+it fits a log-log slope (1.0 is linear) and flags super-linear stages.
+Inputs are derived from --seed, so runs are comparable across commits.
+
+    python ingest_bench.py --output ingest.json
+    python ingest_bench.py --stages summary,search --pages 1,10,100 --docs 100,10000
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import synthetic
+
+HERE = Path(__file__).resolve().parent
+PROJECT_DIR = HERE.parent
+
+STAGES = ('extract', 'summary', 'insights', 'search', 'pathological')
+
+# Log-log slope above which a stage is reported as super-linear
+SUPERLINEAR_SLOPE = 1.15
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _prepare(stage: str, size, seed: int, pdf_dir: str):
+    """Input for one case and the function that processes it."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    from api.ai_processor import AIProcessor
+    from api.pdf_processor import PDFProcessor
+    from api.sections import SectionSegmenter
+
+    if stage == 'extract':
+        path = os.path.join(pdf_dir, f'paper-{size}-{seed}.pdf')
+        return lambda: PDFProcessor.extract_text(path, workers=int(os.environ.get('BENCH_WORKERS', 1)))
+    if stage == 'summary':
+        text = synthetic.paper_text(size, seed=seed)
+        return lambda: AIProcessor.generate_summary(text)
+    if stage == 'insights':
+        text = synthetic.paper_text(size, seed=seed)
+        return lambda: AIProcessor.extract_key_insights(text)
+    if stage == 'search':
+        documents = synthetic.documents(size, seed=seed)
+        return lambda: AIProcessor.semantic_search('attention transformer benchmark', documents)
+    if stage == 'pathological':
+        kind, operation = size.split(':')
+        text = synthetic.pathological_text(kind, seed=seed)
+        return {
+            'summary': lambda: AIProcessor.generate_summary(text),
+            'insights': lambda: AIProcessor.extract_key_insights(text),
+            'segment': lambda: SectionSegmenter.segment(text),
+        }[operation]
+    raise ValueError(f'Unknown stage {stage!r}')
+
+
+def run_case(stage: str, size, seed: int, repeats: int, pdf_dir: str) -> dict:
+    """Runs in a fresh worker process."""
+    run = _prepare(stage, size, seed, pdf_dir)
+    input_rss = _rss_mb()
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return {
+        'size': size,
+        'best_s': round(min(timings), 4),
+        'median_s': round(statistics.median(timings), 4),
+        'peak_rss_mb': _rss_mb(),
+        'input_rss_mb': input_rss,
+    }
+
+
+def loglog_slope(points) -> float:
+    """Least-squares slope of log(time) against log(size)."""
+    points = [(math.log(size), math.log(seconds)) for size, seconds in points if size > 0 and seconds > 0]
+    if len(points) < 2:
+        return None
+    mean_x = statistics.mean(x for x, _ in points)
+    mean_y = statistics.mean(y for _, y in points)
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    if not spread:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in points) / spread, 2)
+
+
+def parse_sizes(value: str):
+    return [int(size) for size in value.split(',') if size.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--stages', default=','.join(STAGES), help='Comma-separated subset of ' + ', '.join(STAGES))
+    parser.add_argument('--pages', default='1,10,100,1000', help='Page counts for extract/summary/insights')
+    parser.add_argument('--docs', default='10,100,1000,10000,100000', help='Corpus sizes for search')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1, help='PDFProcessor extraction processes')
+    parser.add_argument('--budget', type=float, default=120.0,
+                        help='Skip larger sizes of a stage once one case takes longer than this many seconds')
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout')
+    args = parser.parse_args()
+
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f'Unknown stage(s): {", ".join(sorted(unknown))}')
+
+    sweeps = {
+        'extract': parse_sizes(args.pages),
+        'summary': parse_sizes(args.pages),
+        'insights': parse_sizes(args.pages),
+        'search': parse_sizes(args.docs),
+        'pathological': [f'{kind}:{operation}' for kind in synthetic.PATHOLOGICAL
+                         for operation in ('summary', 'insights', 'segment')],
+    }
+
+    os.environ['BENCH_WORKERS'] = str(args.workers)
+    report = {'config': vars(args), 'stages': {}}
+    with tempfile.TemporaryDirectory(prefix='ingest_bench_') as pdf_dir:
+        for stage in stages:
+            cases, over_budget = [], False
+            for size in sweeps[stage]:
+                if over_budget:
+                    cases.append({'size': size, 'skipped': f'a smaller case exceeded {args.budget:g}s'})
+                    continue
+                extra = {}
+                if stage == 'extract':
+                    text = synthetic.paper_text(size, seed=args.seed)
+                    path = os.path.join(pdf_dir, f'paper-{size}-{args.seed}.pdf')
+                    extra['pdf_pages'] = synthetic.write_pdf(path, text, title='Synthetic Paper', author='A, B')
+                    extra['pdf_mb'] = round(os.path.getsize(path) / 1024 / 1024, 2)
+                # A fresh process per case keeps peak RSS per case
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    result = pool.submit(run_case, stage, size, args.seed, args.repeats, pdf_dir).result()
+                result.update(extra)
+                cases.append(result)
+                print(f"{stage} {size}: {result['best_s']}s, peak RSS {result['peak_rss_mb']}MB", file=sys.stderr)
+                over_budget = stage != 'pathological' and result['best_s'] > args.budget
+
+            summary = {'cases': cases}
+            if stage != 'pathological':
+                slope = loglog_slope([(case['size'], case['best_s']) for case in cases if 'best_s' in case])
+                summary['loglog_slope'] = slope
+                summary['superlinear'] = slope is not None and slope > SUPERLINEAR_SLOPE
+            report['stages'][stage] = summary
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
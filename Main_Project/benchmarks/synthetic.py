@@ -0,0 +1,184 @@
+"""
+Synthetic research papers for the ingest benchmarks.
+
+Everything is generated from a seed, so the same arguments always give the
+same text and the same PDF bytes. PDFs are written with a minimal built-in
+writer (one Helvetica text stream per page), so no PDF library is needed
+beyond the ones the app already reads with.
+"""
+
+import random
+from typing import Dict, List
+
+# Roughly one printed page of body text
+PAGE_CHARS = 4000
+LINES_PER_PAGE = 52
+LINE_WIDTH = 95
+
+LAYOUTS = ('standard', 'numbered', 'no_headings', 'long_references')
+PATHOLOGICAL = ('single_paragraph', 'no_punctuation', 'numbers_only', 'headings_only')
+
+WORDS = (
+    'model network training data method approach results analysis learning sample '
+    'performance evaluation baseline accuracy feature representation layer attention '
+    'dataset experiment parameter optimization gradient loss function distribution '
+    'variance estimate inference signal protein cell gene expression patient cohort '
+    'treatment response measurement sensor frequency spectrum energy material surface '
+    'temperature pressure simulation algorithm complexity graph node edge cluster '
+    'embedding transformer regression classifier benchmark metric robustness error'
+).split()
+
+CLAIMS = ('significantly improves', 'demonstrates', 'shows that', 'indicates', 'suggests', 'found that')
+
+SECTIONS = ('Introduction', 'Related Work', 'Methodology', 'Experiments', 'Results', 'Discussion', 'Conclusion')
+
+# Share of the body given to each section
+SECTION_WEIGHTS = (0.12, 0.12, 0.2, 0.16, 0.2, 0.12, 0.08)
+
+
+def sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 24))
+    roll = rng.random()
+    if roll < 0.1:
+        words.insert(rng.randint(1, len(words) - 1), rng.choice(CLAIMS))
+    elif roll < 0.15:
+        words.append(f'by {rng.uniform(0.5, 40):.1f}% (p < 0.0{rng.randint(1, 5)})')
+    elif roll < 0.18:
+        words.append(f'with r = {rng.uniform(-1, 1):.2f}')
+    return ' '.join(words).capitalize() + '.'
+
+
+def paragraph(rng: random.Random, chars: int) -> str:
+    parts, size = [], 0
+    while size < chars:
+        parts.append(sentence(rng))
+        size += len(parts[-1]) + 1
+    return ' '.join(parts)
+
+
+def body(rng: random.Random, chars: int) -> str:
+    paragraphs, size = [], 0
+    while size < chars:
+        paragraphs.append(paragraph(rng, min(rng.randint(400, 1200), chars - size + 50)))
+        size += len(paragraphs[-1]) + 2
+    return '\n\n'.join(paragraphs)
+
+
+def references(rng: random.Random, count: int) -> str:
+    entries = []
+    for i in range(1, count + 1):
+        authors = ', '.join(f'{rng.choice("ABCDEFGHKLMNPRSTW")}. {rng.choice(WORDS).capitalize()}'
+                            for _ in range(rng.randint(1, 4)))
+        title = ' '.join(rng.choices(WORDS, k=rng.randint(4, 10))).capitalize()
+        entries.append(f'[{i}] {authors}. {title}. Journal of {rng.choice(WORDS).capitalize()}, {rng.randint(1990, 2025)}.')
+    return '\n'.join(entries)
+
+
+def paper_text(pages: int, layout: str = 'standard', seed: int = 0) -> str:
+    """Text of a paper about `pages` pages long in one of LAYOUTS."""
+    if layout not in LAYOUTS:
+        raise ValueError(f'Unknown layout {layout!r}; expected one of {", ".join(LAYOUTS)}')
+    rng = random.Random(f'{seed}:{layout}:{pages}')
+    chars = max(1, pages) * PAGE_CHARS
+    reference_count = min(40 + pages * 2, 400)
+    if layout == 'long_references':
+        reference_count = max(200, pages * 25)
+
+    title = ' '.join(rng.choices(WORDS, k=8)).title()
+    out = [title, 'A. Author, B. Author, C. Author', '']
+    if layout == 'no_headings':
+        out.append(body(rng, chars))
+        out.append(references(rng, reference_count))
+        return '\n'.join(out)
+
+    out += ['Abstract', paragraph(rng, 900), '',
+            'Keywords: ' + ', '.join(rng.sample(WORDS, 5)), '']
+    for number, (name, weight) in enumerate(zip(SECTIONS, SECTION_WEIGHTS), start=1):
+        out.append(f'{number}. {name}' if layout == 'numbered' else name)
+        out.append(body(rng, int(chars * weight)))
+        out.append('')
+    out.append('References')
+    out.append(references(rng, reference_count))
+    return '\n'.join(out)
+
+
+def pathological_text(kind: str, chars: int = 2 * 1024 * 1024, seed: int = 0) -> str:
+    """Adversarial inputs of about `chars` characters, one of PATHOLOGICAL."""
+    rng = random.Random(f'{seed}:{kind}:{chars}')
+    if kind == 'single_paragraph':
+        # Ordinary sentences, but no line breaks at all
+        return paragraph(rng, chars)
+    if kind == 'no_punctuation':
+        # One "sentence" with no terminator
+        return ' '.join(rng.choices(WORDS, k=chars // 7))[:chars]
+    if kind == 'numbers_only':
+        return ' '.join(f'{rng.uniform(0, 100):.2f}% p < 0.0{rng.randint(1, 9)}' for _ in range(chars // 20))
+    if kind == 'headings_only':
+        return '\n'.join(rng.choice(SECTIONS) for _ in range(chars // 10))
+    raise ValueError(f'Unknown pathological input {kind!r}; expected one of {", ".join(PATHOLOGICAL)}')
+
+
+def documents(count: int, seed: int = 0, words: int = 150) -> List[Dict]:
+    """Search corpus entries shaped like the documents views.py passes to semantic_search."""
+    rng = random.Random(f'{seed}:documents')
+    return [
+        {
+            'id': str(i),
+            'title': ' '.join(rng.choices(WORDS, k=8)).title(),
+            'text': ' '.join(rng.choices(WORDS, k=words)),
+        }
+        for i in range(count)
+    ]
+
+
+def _wrap(text: str, width: int) -> List[str]:
+    lines = []
+    for raw in text.split('\n'):
+        while len(raw) > width:
+            cut = raw.rfind(' ', 0, width)
+            cut = cut if cut > 0 else width
+            lines.append(raw[:cut])
+            raw = raw[cut:].lstrip(' ')
+        lines.append(raw)
+    return lines
+
+
+def _escape(line: str) -> bytes:
+    line = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return line.encode('latin-1', 'replace')
+
+
+def write_pdf(path: str, text: str, title: str = '', author: str = '') -> int:
+    """Write `text` as a paginated PDF; returns the page count."""
+    lines = _wrap(text, LINE_WIDTH)
+    pages = [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)] or [[]]
+
+    # Objects 1-4: catalog, page tree, font, info; then (page, content) per page
+    page_ids = [5 + 2 * i for i in range(len(pages))]
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % i for i in page_ids) + b'] /Count %d >>' % len(pages),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Title (' + _escape(title) + b') /Author (' + _escape(author) + b') >>',
+    ]
+    for page_id, page_lines in zip(page_ids, pages):
+        stream = b'BT /F1 9 Tf 13 TL 50 760 Td\n' + b''.join(
+            b'(' + _escape(line) + b') Tj T*\n' for line in page_lines
+        ) + b'ET'
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % (page_id + 1))
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % number + obj + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    out += b'trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+
+    with open(path, 'wb') as f:
+        f.write(out)
+    return len(pages)
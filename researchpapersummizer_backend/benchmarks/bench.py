@@ -0,0 +1,247 @@
+"""
+Load and latency benchmark for every research_backend API endpoint.
+
+Endpoints are read from research_backend/api/urls.py, so a new route fails
+the run until it has an entry in PAYLOADS below. By default the script
+starts the mock LLM (mock_llm.py), serves sync routes with gunicorn
+(gthread) and async/ routes with uvicorn, then drives each endpoint in turn
+and prints a JSON report: p50/p95/p99 latency, RPS, error rate, status
+counts and the number of upstream LLM calls per endpoint.
+
+    python bench.py --requests 200 --concurrency 50 --output results.json
+    python bench.py --endpoints summarize,async-summarize --stream
+    python bench.py --baseline baseline.json --tolerance 0.2    # exit 1 on regression
+    python bench.py --base-url http://127.0.0.1:8000             # an already running server
+
+Run from this directory.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import urllib.request
+import uuid
+from pathlib import Path
+
+from loadgen import drive, free_port, start, stop, summarize, wait_for_port
+
+HERE = Path(__file__).resolve().parent
+PROJECT_DIR = HERE.parent / 'research_backend'
+
+# Long enough for research-readiness (100 chars minimum); unique per request
+# unless --same-text, so the response cache does not answer
+SENTENCE = 'We evaluate a benchmark method on synthetic data and report the results. '
+
+
+def paper_text(tag: str, chars: int = 2000) -> str:
+    return f'Benchmark paper {tag}. ' + SENTENCE * (chars // len(SENTENCE))
+
+
+def long_paper_text(tag: str) -> str:
+    """Over the single-prompt cut-off, split into headed sections for chunked runs."""
+    sections = ['Introduction', 'Methods', 'Results', 'Discussion', 'Conclusion']
+    return '\n\n'.join(f'{i}. {name}\n\n{paper_text(tag, 9000)}' for i, name in enumerate(sections, start=1))
+
+
+# URL name (without the async- prefix) -> payload for one request
+PAYLOADS = {
+    'summarize': lambda tag: {'text': paper_text(tag)},
+    'insights': lambda tag: {'text': paper_text(tag)},
+    'search': lambda tag: {'query': f'benchmark query {tag}'},
+    'chat': lambda tag: {'messages': [{'role': 'user', 'content': f'Benchmark question {tag}?'}]},
+    'research-readiness': lambda tag: {'text': paper_text(tag)},
+    'analyze': lambda tag: {'text': paper_text(tag)},
+}
+
+# Endpoints accepting "stream": true and "chunked": true
+STREAMABLE = {'summarize', 'insights', 'chat'}
+CHUNKABLE = {'summarize', 'insights', 'research-readiness', 'analyze'}
+
+
+def endpoint_routes():
+    """[(url name, path)] for every route in api/urls.py."""
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'research_backend.settings')
+    import django
+    django.setup()
+    from api.urls import urlpatterns
+
+    return [(pattern.name, f'/api/{pattern.pattern}') for pattern in urlpatterns]
+
+
+def base_name(name: str) -> str:
+    return name[len('async-'):] if name.startswith('async-') else name
+
+
+def build_cases(args):
+    """[(case name, url name, path, payload factory, stream)] for the selected endpoints."""
+    routes = endpoint_routes()
+    missing = [name for name, _ in routes if base_name(name) not in PAYLOADS]
+    if missing:
+        raise SystemExit(f'No benchmark payload for endpoint(s) {", ".join(missing)}; add them to PAYLOADS')
+    if args.endpoints:
+        wanted = set(args.endpoints.split(','))
+        unknown = wanted - {name for name, _ in routes}
+        if unknown:
+            raise SystemExit(f'Unknown endpoint(s): {", ".join(sorted(unknown))}')
+        routes = [(name, path) for name, path in routes if name in wanted]
+
+    shared_tag = uuid.uuid4().hex
+
+    def factory(build, extra=None):
+        def make():
+            payload = build(shared_tag if args.same_text else uuid.uuid4().hex)
+            payload.update(extra or {})
+            return payload
+        return make
+
+    cases = []
+    for name, path in routes:
+        build = PAYLOADS[base_name(name)]
+        cases.append((name, name, path, factory(build), False))
+        if args.stream and base_name(name) in STREAMABLE:
+            cases.append((f'{name}+stream', name, path, factory(build, {'stream': True}), True))
+        if args.chunked and base_name(name) in CHUNKABLE:
+            chunked = lambda tag: {'text': long_paper_text(tag), 'chunked': True}
+            cases.append((f'{name}+chunked', name, path, factory(chunked), False))
+    return cases
+
+
+def mock_stats(port: int, reset: bool = False) -> dict:
+    request = urllib.request.Request(f'http://127.0.0.1:{port}/stats' + ('/reset' if reset else ''),
+                                     method='POST' if reset else 'GET')
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def compare(results: dict, baseline: dict, tolerance: float, error_tolerance: float):
+    """Regressions of `results` against a previous report, as readable strings."""
+    regressions = []
+    for name, result in results['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            continue
+        if before.get('p95_s') and result.get('p95_s') and result['p95_s'] > before['p95_s'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['p95_s']}s > baseline {before['p95_s']}s")
+        if before.get('rps') and result['rps'] < before['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['rps']} rps < baseline {before['rps']} rps")
+        if result['error_rate'] > before.get('error_rate', 0.0) + error_tolerance:
+            regressions.append(f"{name}: error rate {result['error_rate']} > baseline {before.get('error_rate', 0.0)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--endpoints', help='Comma-separated URL names (default: all)')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--timeout', type=float, default=120.0, help='Client timeout per request')
+    parser.add_argument('--stream', action='store_true', help='Also run "stream": true variants')
+    parser.add_argument('--chunked', action='store_true', help='Also run "chunked": true variants on long papers')
+    parser.add_argument('--same-text', action='store_true',
+                        help='Send identical payloads (measures the cache and request coalescing)')
+    parser.add_argument('--server', choices=['auto', 'uvicorn', 'gunicorn'], default='auto',
+                        help='auto: gunicorn for sync routes, uvicorn for async/ routes')
+    parser.add_argument('--sync-workers', type=int, default=1, help='gunicorn worker processes')
+    parser.add_argument('--sync-threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--base-url', help='Benchmark a running server instead of starting one (and the mock)')
+    parser.add_argument('--latency', type=float, default=1.0, help='Mock LLM seconds per completion')
+    parser.add_argument('--latency-dist', default='fixed', help='Mock LLM latency distribution')
+    parser.add_argument('--spread', type=float, default=0.0, help='Mock LLM latency spread')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Mock LLM fraction of 500s')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Mock LLM fraction of 429s')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the JSON report here as well as to stdout')
+    parser.add_argument('--baseline', help='Previous report to compare against; exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed relative p95 increase / RPS drop against the baseline')
+    parser.add_argument('--error-tolerance', type=float, default=0.01,
+                        help='Allowed absolute error-rate increase against the baseline')
+    args = parser.parse_args()
+
+    cases = build_cases(args)
+    report = {
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'baseline')},
+        'endpoints': {},
+    }
+
+    processes, servers = [], {}
+    cache_dir = tempfile.mkdtemp(prefix='llm_cache_bench_')
+    mock_port = None
+    try:
+        if not args.base_url:
+            mock_port = free_port()
+            processes.append(start([
+                sys.executable, str(HERE / 'mock_llm.py'), '--port', str(mock_port),
+                '--latency', str(args.latency), '--latency-dist', args.latency_dist,
+                '--spread', str(args.spread), '--error-rate', str(args.error_rate),
+                '--rate-limit-rate', str(args.rate_limit_rate), '--seed', str(args.seed),
+            ]))
+            wait_for_port(mock_port)
+        env = dict(os.environ,
+                   OPENROUTER_API_KEY='benchmark',
+                   OPENROUTER_BASE_URL=f'http://127.0.0.1:{mock_port}/api/v1',
+                   OPENROUTER_ASYNC_MAX_CONNECTIONS=str(max(args.concurrency, 100)),
+                   LLM_CACHE_DIR=cache_dir,
+                   DEBUG='False',
+                   PYTHONUNBUFFERED='1')
+
+        def base_url_for(url_name: str) -> str:
+            if args.base_url:
+                return args.base_url.rstrip('/')
+            server = args.server
+            if server == 'auto':
+                server = 'uvicorn' if url_name.startswith('async-') else 'gunicorn'
+            if server not in servers:
+                port = free_port()
+                if server == 'gunicorn':
+                    command = [sys.executable, '-m', 'gunicorn', 'research_backend.wsgi:application',
+                               '--worker-class', 'gthread', '--workers', str(args.sync_workers),
+                               '--threads', str(args.sync_threads), '--timeout', str(int(args.timeout)),
+                               '--backlog', '4096', '--bind', f'127.0.0.1:{port}']
+                else:
+                    command = [sys.executable, '-m', 'uvicorn', 'research_backend.asgi:application',
+                               '--no-access-log', '--backlog', '4096', '--host', '127.0.0.1',
+                               '--port', str(port)]
+                processes.append(start(command, env=env, cwd=PROJECT_DIR))
+                wait_for_port(port)
+                servers[server] = f'http://127.0.0.1:{port}'
+            return servers[server]
+
+        for case, url_name, path, make_payload, stream in cases:
+            url = base_url_for(url_name) + path
+            if mock_port:
+                mock_stats(mock_port, reset=True)
+            samples, elapsed = asyncio.run(drive(url, make_payload, args.requests, args.concurrency,
+                                                 args.timeout, stream=stream))
+            result = summarize(samples, elapsed, args.concurrency)
+            if mock_port:
+                result['upstream_calls'] = mock_stats(mock_port)['requests']
+            report['endpoints'][case] = result
+            print(f"{case}: {result['rps']} rps, p95 {result['p95_s']}s, "
+                  f"error rate {result['error_rate']}", file=sys.stderr)
+    finally:
+        for process in reversed(processes):
+            stop(process)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + '\n')
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()),
+                              args.tolerance, args.error_tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
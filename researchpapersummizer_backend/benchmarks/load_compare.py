@@ -0,0 +1,107 @@
+"""
+Sync vs async load comparison for the LLM endpoints.
+
+Starts the mock LLM (mock_llm.py), then serves the backend twice and drives
+the same concurrent load at both deployments:
+
+  sync   gunicorn (gthread) serving /api/summarize/
+  async  uvicorn, one process, serving /api/async/summarize/
+
+Every request carries unique text, so the response cache never answers and
+each request waits the full mock latency. Run from this directory:
+
+    python load_compare.py --requests 1000 --concurrency 500 --latency 1.0
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+from loadgen import drive, free_port, start, stop, summarize, wait_for_port
+
+HERE = Path(__file__).resolve().parent
+PROJECT_DIR = HERE.parent / 'research_backend'
+
+
+async def run_load(url: str, total: int, concurrency: int, timeout: float) -> dict:
+    # Unique text defeats the response cache
+    samples, elapsed = await drive(
+        url, lambda: {'text': f'Benchmark paper {uuid.uuid4().hex}. ' * 20}, total, concurrency, timeout
+    )
+    return summarize(samples, elapsed, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=1.0, help='Mock LLM seconds per completion')
+    parser.add_argument('--sync-workers', type=int, default=1, help='gunicorn worker processes')
+    parser.add_argument('--sync-threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--timeout', type=float, default=120.0, help='Client timeout per request')
+    parser.add_argument('--only', choices=['sync', 'async'], help='Run one deployment only')
+    args = parser.parse_args()
+
+    mock_port = free_port()
+    cache_dir = tempfile.mkdtemp(prefix='llm_cache_bench_')
+    env = dict(os.environ,
+               OPENROUTER_API_KEY='benchmark',
+               OPENROUTER_BASE_URL=f'http://127.0.0.1:{mock_port}/api/v1',
+               OPENROUTER_ASYNC_MAX_CONNECTIONS=str(max(args.concurrency, 100)),
+               LLM_CACHE_DIR=cache_dir,
+               DEBUG='False',
+               PYTHONUNBUFFERED='1')
+
+    deployments = {
+        'sync': (
+            [sys.executable, '-m', 'gunicorn', 'research_backend.wsgi:application',
+             '--worker-class', 'gthread', '--workers', str(args.sync_workers),
+             '--threads', str(args.sync_threads), '--timeout', str(int(args.timeout)),
+             '--backlog', '4096', '--bind'],
+            '/api/summarize/',
+        ),
+        'async': (
+            [sys.executable, '-m', 'uvicorn', 'research_backend.asgi:application',
+             '--no-access-log', '--backlog', '4096', '--workers', '1', '--host', '127.0.0.1', '--port'],
+            '/api/async/summarize/',
+        ),
+    }
+
+    mock = start([sys.executable, str(HERE / 'mock_llm.py'), '--port', str(mock_port),
+                  '--latency', str(args.latency)])
+    results = {}
+    try:
+        wait_for_port(mock_port)
+        for name, (command, path) in deployments.items():
+            if args.only and name != args.only:
+                continue
+            port = free_port()
+            bind = f'127.0.0.1:{port}' if name == 'sync' else str(port)
+            server = start(command + [bind], env=env, cwd=PROJECT_DIR)
+            try:
+                wait_for_port(port)
+                results[name] = asyncio.run(run_load(
+                    f'http://127.0.0.1:{port}{path}', args.requests, args.concurrency, args.timeout
+                ))
+            finally:
+                stop(server)
+    finally:
+        stop(mock)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(json.dumps({
+        'mock_latency_s': args.latency,
+        'sync_server': f'gunicorn gthread, {args.sync_workers} worker(s) x {args.sync_threads} threads',
+        'async_server': 'uvicorn, 1 process',
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Shared helpers for the benchmark scripts: process management and an aiohttp
+load generator that records per-request status, latency and (for SSE
+responses) time to first event.
+"""
+
+import asyncio
+import socket
+import statistics
+import subprocess
+import time
+from collections import Counter
+from typing import Callable, List, NamedTuple, Optional
+
+import aiohttp
+
+
+class Sample(NamedTuple):
+    status: int            # HTTP status, 0 for a client-side failure (timeout, reset)
+    ok: bool
+    latency: float         # seconds to the full response
+    ttfb: Optional[float]  # seconds to the first body bytes (streamed responses only)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30.0) -> None:
+    expires_at = time.monotonic() + timeout
+    while time.monotonic() < expires_at:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Nothing listening on port {port} after {timeout}s')
+
+
+def start(command, env=None, cwd=None) -> subprocess.Popen:
+    return subprocess.Popen(command, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def _send(client: aiohttp.ClientSession, url: str, payload: dict, stream: bool) -> Sample:
+    started = time.perf_counter()
+    ttfb = None
+    try:
+        async with client.post(url, json=payload) as response:
+            if stream:
+                body = b''
+                async for chunk in response.content.iter_any():
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - started
+                    body += chunk
+                # The stream itself is 200; failures arrive as an error event
+                ok = response.status == 200 and b'event: done' in body
+            else:
+                await response.read()
+                ok = response.status == 200
+            status = response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        status, ok = 0, False
+    return Sample(status, ok, time.perf_counter() - started, ttfb)
+
+
+async def drive(url: str, make_payload: Callable[[], dict], total: int, concurrency: int,
+                timeout: float, stream: bool = False):
+    """POST `total` payloads to `url`, `concurrency` at a time. Returns (samples, elapsed seconds)."""
+    samples: List[Sample] = []
+    remaining = total
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as client:
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                samples.append(await _send(client, url, make_payload(), stream))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def percentile(values: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of sorted `values`, rounded to milliseconds."""
+    if not values:
+        return None
+    return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 3)
+
+
+def summarize(samples: List[Sample], elapsed: float, concurrency: int) -> dict:
+    """Latency percentiles (successful requests), throughput and error counts."""
+    latencies = sorted(sample.latency for sample in samples if sample.ok)
+    ttfbs = sorted(sample.ttfb for sample in samples if sample.ok and sample.ttfb is not None)
+    errors = len(samples) - len(latencies)
+    summary = {
+        'requests': len(samples),
+        'concurrency': concurrency,
+        'ok': len(latencies),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'status_counts': {str(status): count for status, count in sorted(Counter(s.status for s in samples).items())},
+        'elapsed_s': round(elapsed, 2),
+        'rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_s': percentile(latencies, 50),
+        'p95_s': percentile(latencies, 95),
+        'p99_s': percentile(latencies, 99),
+        'max_s': round(latencies[-1], 3) if latencies else None,
+        'mean_s': round(statistics.mean(latencies), 3) if latencies else None,
+    }
+    if ttfbs:
+        summary['ttfb_p50_s'] = percentile(ttfbs, 50)
+        summary['ttfb_p95_s'] = percentile(ttfbs, 95)
+    return summary
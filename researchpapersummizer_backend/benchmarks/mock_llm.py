@@ -0,0 +1,262 @@
+"""
+Mock OpenRouter server for load tests.
+
+Answers POST .../chat/completions with a canned completion whose content is
+valid JSON, so every LLM endpoint (JSON or text) succeeds. Requests with
+"stream": true get the same completion as OpenRouter-style SSE chunks.
+Built on asyncio streams with HTTP/1.1 keep-alive so one process can hold
+thousands of concurrent requests.
+
+Latency is drawn per request from --latency-dist (fixed, uniform, normal,
+lognormal, exponential) around --latency. A fraction of requests can be
+answered with 429 (--rate-limit-rate, with Retry-After) or 500
+(--error-rate). GET /stats returns request counters; POST /stats/reset
+zeroes them.
+
+    python mock_llm.py --port 8090 --latency 1.0 --latency-dist lognormal --spread 0.5
+
+Point the backend at it with OPENROUTER_BASE_URL=http://127.0.0.1:8090/api/v1
+and any non-empty OPENROUTER_API_KEY.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+
+COMPLETION = json.dumps({
+    "abstract": "Mock abstract.",
+    "findings": ["Mock finding."],
+    "methodology": "Mock methodology.",
+    "limitations": "None.",
+    "keyConcepts": ["Mock concept"],
+    "objectives": ["Mock objective"],
+    "results": ["Mock result"],
+    "conclusions": ["Mock conclusion"],
+    "novelty_score": 70,
+    "technical_depth_score": 70,
+    "experimental_rigor_score": 70,
+    "literature_coverage_score": 70,
+    "publication_readiness_score": 70,
+    "strengths": ["Mock strength"],
+    "weaknesses": ["Mock weakness"],
+    "suggestions": ["Mock suggestion"],
+    "suitable_venues": ["Mock venue"],
+    "final_verdict": "Minor Revisions Needed",
+})
+
+# Rough OpenAI-style token estimate for the usage block
+CHARS_PER_TOKEN = 4
+
+LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'normal', 'lognormal', 'exponential')
+
+
+class Stats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = {
+            'requests': 0,
+            'completions': 0,
+            'streams': 0,
+            'rate_limited': 0,
+            'errors': 0,
+            'in_flight': 0,
+            'max_in_flight': 0,
+        }
+
+    def incr(self, name: str, by: int = 1) -> None:
+        self.counts[name] += by
+        if name == 'in_flight':
+            self.counts['max_in_flight'] = max(self.counts['max_in_flight'], self.counts['in_flight'])
+
+
+class MockLLM:
+    def __init__(self, args):
+        self.args = args
+        self.random = random.Random(args.seed)
+        self.stats = Stats()
+
+    def latency(self) -> float:
+        """One draw from the configured latency distribution, in seconds."""
+        mean, spread, dist = self.args.latency, self.args.spread, self.args.latency_dist
+        if dist == 'uniform':
+            value = self.random.uniform(mean - spread, mean + spread)
+        elif dist == 'normal':
+            value = self.random.gauss(mean, spread)
+        elif dist == 'lognormal':
+            # --latency is the median, --spread the sigma of the underlying normal
+            value = self.random.lognormvariate(math.log(max(mean, 1e-6)), spread)
+        elif dist == 'exponential':
+            value = self.random.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            value = mean
+        return max(0.0, value)
+
+    def fault(self):
+        """(status line, body, extra headers) for an injected failure, or None."""
+        roll = self.random.random()
+        if roll < self.args.rate_limit_rate:
+            self.stats.incr('rate_limited')
+            headers = f'Retry-After: {self.args.retry_after:g}\r\n' if self.args.retry_after >= 0 else ''
+            return '429 Too Many Requests', b'{"error": {"code": 429, "message": "Rate limited"}}', headers
+        if roll < self.args.rate_limit_rate + self.args.error_rate:
+            self.stats.incr('errors')
+            return '500 Internal Server Error', b'{"error": {"code": 500, "message": "Mock failure"}}', ''
+        return None
+
+    @staticmethod
+    def usage(prompt_chars: int) -> dict:
+        prompt_tokens = prompt_chars // CHARS_PER_TOKEN
+        completion_tokens = len(COMPLETION) // CHARS_PER_TOKEN
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+    def completion_body(self, prompt_chars: int) -> bytes:
+        return json.dumps({
+            "id": "mock",
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": COMPLETION},
+                         "finish_reason": "stop"}],
+            "usage": self.usage(prompt_chars),
+        }).encode('utf-8')
+
+    def stream_chunks(self, prompt_chars: int, size: int = 8):
+        for i in range(0, len(COMPLETION), size):
+            chunk = {"id": "mock", "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": COMPLETION[i:i + size]}}]}
+            yield f"data: {json.dumps(chunk)}\n\n".encode('utf-8')
+        final = {"id": "mock", "object": "chat.completion.chunk",
+                 "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                 "usage": self.usage(prompt_chars)}
+        yield f"data: {json.dumps(final)}\n\n".encode('utf-8')
+        yield b"data: [DONE]\n\n"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                lines = head.decode('latin-1').split('\r\n')
+                method, path, _ = lines[0].split(' ', 2)
+                headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        name, value = line.split(':', 1)
+                        headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+
+                if method == 'POST' and path.endswith('/chat/completions'):
+                    await self.complete(writer, body)
+                elif method == 'GET' and path == '/stats':
+                    write_response(writer, '200 OK', json.dumps(self.stats.counts).encode('utf-8'))
+                elif method == 'POST' and path == '/stats/reset':
+                    self.stats.reset()
+                    write_response(writer, '200 OK', b'{}')
+                else:
+                    write_response(writer, '404 Not Found', b'{"error": "not found"}')
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def complete(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        self.stats.incr('requests')
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            payload = {}
+        prompt_chars = sum(len(str(m.get('content', ''))) for m in payload.get('messages', []))
+
+        fault = self.fault()
+        if fault is not None:
+            status, fault_body, extra = fault
+            write_response(writer, status, fault_body, extra)
+            return
+
+        self.stats.incr('in_flight')
+        try:
+            if payload.get('stream'):
+                self.stats.incr('streams')
+                await self.stream(writer, prompt_chars)
+            else:
+                self.stats.incr('completions')
+                await asyncio.sleep(self.latency())
+                write_response(writer, '200 OK', self.completion_body(prompt_chars))
+        finally:
+            self.stats.incr('in_flight', -1)
+
+    async def stream(self, writer: asyncio.StreamWriter, prompt_chars: int) -> None:
+        writer.write((
+            'HTTP/1.1 200 OK\r\n'
+            'Content-Type: text/event-stream\r\n'
+            'Transfer-Encoding: chunked\r\n'
+            '\r\n'
+        ).encode('latin-1') + http_chunk(b": OPENROUTER PROCESSING\n\n"))
+        await writer.drain()
+        await asyncio.sleep(self.args.first_token)
+        for data in self.stream_chunks(prompt_chars):
+            writer.write(http_chunk(data))
+            await writer.drain()
+            await asyncio.sleep(self.args.token_delay)
+        writer.write(b"0\r\n\r\n")
+
+
+def http_chunk(data: bytes) -> bytes:
+    return f"{len(data):x}\r\n".encode('latin-1') + data + b"\r\n"
+
+
+def write_response(writer: asyncio.StreamWriter, status: str, body: bytes, extra_headers: str = '') -> None:
+    writer.write((
+        f'HTTP/1.1 {status}\r\n'
+        'Content-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f'{extra_headers}'
+        '\r\n'
+    ).encode('latin-1') + body)
+
+
+async def serve(args) -> None:
+    mock = MockLLM(args)
+    server = await asyncio.start_server(mock.handle, args.host, args.port, backlog=4096)
+    async with server:
+        await server.serve_forever()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency', type=float, default=1.0,
+                        help='Seconds per completion (mean; median for lognormal)')
+    parser.add_argument('--latency-dist', choices=LATENCY_DISTRIBUTIONS, default='fixed')
+    parser.add_argument('--spread', type=float, default=0.0,
+                        help='Half-width (uniform), stddev (normal) or sigma (lognormal)')
+    parser.add_argument('--first-token', type=float, default=0.2, help='Seconds to the first streamed token')
+    parser.add_argument('--token-delay', type=float, default=0.02, help='Seconds between streamed chunks')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--retry-after', type=float, default=1.0,
+                        help='Retry-After seconds sent with 429s (negative: omit the header)')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for latency and fault draws')
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
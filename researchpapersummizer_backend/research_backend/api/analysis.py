@@ -0,0 +1,106 @@
+"""
+Combined Analysis
+
+Runs the summary, insight and readiness analyses of one text concurrently
+for the analyze/ endpoints. The combined response carries every part that
+finished; parts that failed or ran past the deadline are reported under
+"errors" instead of failing the whole request.
+"""
+
+import asyncio
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from .prompts import DEMO_INSIGHTS, DEMO_READINESS, DEMO_SUMMARY
+from .timing import propagate
+
+ANALYSIS_PARTS = ('summary', 'insights', 'readiness')
+
+# Returned for a part when the API key is rejected, as the single endpoints do
+FALLBACKS = {
+    'summary': DEMO_SUMMARY,
+    'insights': DEMO_INSIGHTS,
+    'readiness': DEMO_READINESS,
+}
+
+# Readiness needs a complete paper, like research-readiness/
+MIN_READINESS_CHARS = 100
+
+
+def requested_parts(value) -> Optional[List[str]]:
+    """Parts named in the request ("parts" list or comma string); None if any is unknown."""
+    if not value:
+        return list(ANALYSIS_PARTS)
+    names = value.split(',') if isinstance(value, str) else list(value)
+    names = [str(name).strip() for name in names if str(name).strip()]
+    if not names or any(name not in ANALYSIS_PARTS for name in names):
+        return None
+    return [name for name in ANALYSIS_PARTS if name in names]
+
+
+def analysis_timeout() -> float:
+    return getattr(settings, 'ANALYZE_TIMEOUT', 90.0)
+
+
+def skipped_parts(text: str, parts: Iterable[str]) -> Dict[str, str]:
+    """Parts that cannot run on this text, with the reason."""
+    errors = {}
+    if 'readiness' in parts and len(text.strip()) < MIN_READINESS_CHARS:
+        errors['readiness'] = 'Text too short. Please provide a complete research paper for evaluation.'
+    return errors
+
+
+def combine(results: Dict[str, Any], errors: Dict[str, str]) -> Tuple[Dict[str, Any], int]:
+    """Response body and status: 200 if any part succeeded, else 500."""
+    body = {name: results[name] for name in ANALYSIS_PARTS if name in results}
+    body['errors'] = errors
+    return body, 200 if results else 500
+
+
+def run_parts(jobs: Dict[str, Callable[[], Any]], timeout: float) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run the jobs on a thread each; returns (results, errors) once all finish or the deadline passes."""
+    results, errors = {}, {}
+    if not jobs:
+        return results, errors
+
+    executor = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix='analyze')
+    try:
+        futures = {executor.submit(propagate(job)): name for name, job in jobs.items()}
+        done, pending = concurrent.futures.wait(futures, timeout=timeout)
+        for future in done:
+            _collect(futures[future], future, results, errors)
+        for future in pending:
+            errors[futures[future]] = f'Timed out after {timeout:g} seconds'
+    finally:
+        # Don't hold the request for parts that already timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, errors
+
+
+async def arun_parts(jobs: Dict[str, Callable[[], Awaitable[Any]]],
+                     timeout: float) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Async version of run_parts; unfinished parts are cancelled at the deadline."""
+    results, errors = {}, {}
+    if not jobs:
+        return results, errors
+
+    tasks = {asyncio.ensure_future(job()): name for name, job in jobs.items()}
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in done:
+        _collect(tasks[task], task, results, errors)
+    for task in pending:
+        task.cancel()
+        errors[tasks[task]] = f'Timed out after {timeout:g} seconds'
+    return results, errors
+
+
+def _collect(name: str, future, results: Dict[str, Any], errors: Dict[str, str]) -> None:
+    try:
+        result = future.result()
+    except Exception as e:
+        errors[name] = str(e)
+        return
+    results[name] = FALLBACKS[name] if result is None else result
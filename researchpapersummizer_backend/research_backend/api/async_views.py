@@ -0,0 +1,278 @@
+"""
+Async LLM Views
+
+Native async counterparts of the views in views.py. Under an ASGI server
+(uvicorn) a request waiting on OpenRouter holds no worker thread, so one
+process can keep hundreds of completions in flight. Prompts, cache entries,
+fallbacks and response bodies are the same as the sync endpoints.
+
+DRF's APIView is sync-only, so these are plain Django views that accept
+the same JSON (or form) bodies.
+"""
+
+import asyncio
+import json
+import time
+from abc import ABCMeta, abstractmethod
+
+import aiohttp
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from .llm_cache import llm_cache
+from .singleflight import allm_flight
+from .openrouter_client import (
+    OPENROUTER_API_KEY, DEFAULT_MODEL as OPENROUTER_MODEL, get_async_client, parse_content
+)
+from .prompts import (
+    DEMO_CHAT, DEMO_INSIGHTS, DEMO_READINESS, DEMO_SUMMARY,
+    demo_search_answer, insight_prompt, search_prompt, summary_prompt
+)
+from .readiness_service import aevaluate_research_readiness
+from .analysis import analysis_timeout, arun_parts, combine, requested_parts, skipped_parts
+from .chunking import aanalyze_chunked
+from .params import last_message_content, request_flag
+from . import metrics, timing
+from .streaming import astream_completion, event_stream_response
+
+
+async def acall_openrouter_api(prompt, json_response=False):
+    if not OPENROUTER_API_KEY:
+        raise Exception("OpenRouter API key not configured")
+
+    cache_key = llm_cache.make_key(OPENROUTER_MODEL, prompt, 'json' if json_response else 'text')
+    with timing.stage('llm_cache'):
+        content = await llm_cache.aget(cache_key)
+    metrics.observe_cache(OPENROUTER_MODEL, hit=content is not None)
+    if content is not None:
+        return parse_content(content, json_response)[1]
+
+    # Identical prompts already in flight share that one upstream call
+    with timing.stage('llm'):
+        return await allm_flight.do(cache_key, lambda: _afetch_and_cache(prompt, cache_key, json_response))
+
+
+async def _afetch_and_cache(prompt, cache_key, json_response):
+    content = await _afetch_completion(prompt)
+    if content is None:
+        return None
+
+    try:
+        content, result = parse_content(content, json_response)
+    except ValueError:
+        metrics.observe_parse_failure(OPENROUTER_MODEL)
+        raise
+
+    # Only responses that parsed are cached
+    await llm_cache.aset(cache_key, content)
+    return result
+
+
+async def acall_openrouter_json(prompt):
+    return await acall_openrouter_api(prompt, json_response=True)
+
+
+async def _afetch_completion(prompt):
+    started = time.perf_counter()
+    try:
+        response = await get_async_client().chat_completion(prompt, model=OPENROUTER_MODEL)
+    except asyncio.TimeoutError as e:
+        metrics.observe_llm(OPENROUTER_MODEL, 'error', time.perf_counter() - started)
+        raise Exception(f"OpenRouter API request timed out: {e}")
+    except aiohttp.ClientError as e:
+        metrics.observe_llm(OPENROUTER_MODEL, 'error', time.perf_counter() - started)
+        raise Exception(f"OpenRouter API request failed: {e}")
+    elapsed = time.perf_counter() - started
+
+    if response.status != 200:
+        if response.status == 401:
+            metrics.observe_llm(OPENROUTER_MODEL, 'fallback', elapsed)
+            print("OpenRouter API 401 Error: Invalid Key. returning None to trigger fallback.")
+            return None
+        metrics.observe_llm(OPENROUTER_MODEL, 'error', elapsed)
+        raise Exception(f"OpenRouter API failed: {await response.text()}")
+
+    data = await response.json(content_type=None)
+    metrics.observe_llm(OPENROUTER_MODEL, 'ok', elapsed, data.get('usage'))
+    return data['choices'][0]['message']['content']
+
+
+def request_data(request):
+    """JSON body, falling back to form fields, like DRF's request.data."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST
+
+
+def error_response(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLLMView(View, metaclass=ABCMeta):
+    """Base for the async endpoints: parses the body and passes it to `handle`."""
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        data = request_data(request)
+        if data is None:
+            return error_response('Malformed JSON body', 400)
+        return await self.handle(data)
+
+    @abstractmethod
+    async def handle(self, data):
+        """Response for a parsed request body."""
+
+
+class AsyncSummaryView(AsyncLLMView):
+    async def handle(self, data):
+        text = data.get('text', '')
+        if not text:
+            return error_response('No text provided', 400)
+
+        if request_flag(data, 'stream'):
+            return event_stream_response(
+                astream_completion(summary_prompt(text), True, lambda result: result, DEMO_SUMMARY)
+            )
+
+        try:
+            if request_flag(data, 'chunked'):
+                result = await aanalyze_chunked('summary', text, acall_openrouter_json)
+            else:
+                result = await acall_openrouter_api(summary_prompt(text), json_response=True)
+            if result is None:
+                result = DEMO_SUMMARY
+            return JsonResponse(result)
+        except Exception as e:
+            return error_response(str(e), 500)
+
+
+class AsyncInsightView(AsyncLLMView):
+    async def handle(self, data):
+        text = data.get('text', '')
+        if not text:
+            return error_response('No text provided', 400)
+
+        if request_flag(data, 'stream'):
+            return event_stream_response(
+                astream_completion(insight_prompt(text), True, lambda result: result, DEMO_INSIGHTS)
+            )
+
+        try:
+            if request_flag(data, 'chunked'):
+                result = await aanalyze_chunked('insights', text, acall_openrouter_json)
+            else:
+                result = await acall_openrouter_api(insight_prompt(text), json_response=True)
+            if result is None:
+                result = DEMO_INSIGHTS
+            return JsonResponse(result)
+        except Exception as e:
+            return error_response(str(e), 500)
+
+
+class AsyncSearchView(AsyncLLMView):
+    async def handle(self, data):
+        query = data.get('query', '')
+        if not query:
+            return error_response('No query provided', 400)
+
+        try:
+            result = await acall_openrouter_api(search_prompt(query), json_response=False)
+            if result is None:
+                result = demo_search_answer(query)
+            return JsonResponse({'answer': result})
+        except Exception as e:
+            return error_response(str(e), 500)
+
+
+class AsyncChatView(AsyncLLMView):
+    async def handle(self, data):
+        messages = data.get('messages', [])
+        if not messages:
+            return error_response('No messages provided', 400)
+        last_message = last_message_content(messages)
+        if last_message is None:
+            return error_response('messages must be a list of objects with a string "content"', 400)
+
+        if request_flag(data, 'stream'):
+            return event_stream_response(astream_completion(
+                last_message, False,
+                lambda result: {'response': result}, {'response': DEMO_CHAT}
+            ))
+
+        try:
+            result = await acall_openrouter_api(last_message, json_response=False)
+            if result is None:
+                result = DEMO_CHAT
+            return JsonResponse({'response': result})
+        except Exception as e:
+            return error_response(str(e), 500)
+
+
+class AsyncResearchReadinessView(AsyncLLMView):
+    """
+    POST /api/async/research-readiness/
+
+    Async version of ResearchReadinessView.
+    """
+    async def handle(self, data):
+        text = data.get('text', '')
+        if not text:
+            return error_response('No text provided. Please include research paper text in the request.', 400)
+        if len(text.strip()) < 100:
+            return error_response('Text too short. Please provide a complete research paper for evaluation.', 400)
+
+        try:
+            result = await aevaluate_research_readiness(text, chunked=request_flag(data, 'chunked'))
+            if result is None:
+                result = DEMO_READINESS
+            return JsonResponse(result, status=200)
+        except Exception as e:
+            return error_response(f'Evaluation failed: {str(e)}', 500)
+
+
+class AsyncAnalyzeView(AsyncLLMView):
+    """
+    POST /api/async/analyze/
+
+    Async version of AnalyzeView.
+    """
+    async def handle(self, data):
+        text = data.get('text', '')
+        if not text:
+            return error_response('No text provided', 400)
+
+        parts = requested_parts(data.get('parts'))
+        if parts is None:
+            return error_response('Unknown analysis part. Choose from summary, insights, readiness.', 400)
+
+        chunked = request_flag(data, 'chunked')
+
+        async def summary():
+            if chunked:
+                return await aanalyze_chunked('summary', text, acall_openrouter_json)
+            return await acall_openrouter_json(summary_prompt(text))
+
+        async def insights():
+            if chunked:
+                return await aanalyze_chunked('insights', text, acall_openrouter_json)
+            return await acall_openrouter_json(insight_prompt(text))
+
+        async def readiness():
+            return await aevaluate_research_readiness(text, chunked=chunked)
+
+        jobs = {'summary': summary, 'insights': insights, 'readiness': readiness}
+        errors = skipped_parts(text, parts)
+        results, failures = await arun_parts(
+            {name: jobs[name] for name in parts if name not in errors}, analysis_timeout()
+        )
+        errors.update(failures)
+
+        body, code = combine(results, errors)
+        return JsonResponse(body, status=code)
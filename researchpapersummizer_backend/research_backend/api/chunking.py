@@ -0,0 +1,186 @@
+"""
+Chunked (Map-Reduce) Analysis
+
+Papers longer than a single prompt's budget are split on section
+boundaries into chunks of at most LLM_CHUNK_CHARS characters. Each chunk
+is analysed concurrently (map, with a bounded fan-out), then reduce calls
+merge the partial JSON results into the endpoint's normal response
+schema. A reduce call merges at most LLM_MAX_CHUNKS results, so very long
+papers are reduced in rounds; no prompt grows past its budget and the
+whole text is read.
+"""
+
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, NamedTuple, Optional
+
+from django.conf import settings
+
+from .prompts import (
+    MAX_TEXT_CHARS, chunk_prompt, insight_prompt, merge_prompt, readiness_prompt, reduce_prompt,
+    summary_prompt
+)
+from .timing import propagate
+
+FULL_PROMPTS = {
+    'summary': summary_prompt,
+    'insights': insight_prompt,
+    'readiness': readiness_prompt,
+}
+
+# Numbered headings ("3.2 Results", "IV. DISCUSSION") or well-known section
+# names on a line of their own
+HEADING_RE = re.compile(
+    r'^[ \t]*(?:'
+    r'(?:\d+(?:\.\d+)*|[IVX]+)[.)]?[ \t]+[A-Z][^\n]{0,80}'
+    r'|(?i:abstract|introduction|related work|background|methods?|methodology|materials and methods'
+    r'|experiments?|experimental setup|results|evaluation|discussion|conclusions?|limitations'
+    r'|future work|acknowledge?ments?|references|bibliography|appendix)[ \t]*:?'
+    r')[ \t]*$',
+    re.MULTILINE
+)
+
+
+class Chunk(NamedTuple):
+    text: str
+    sections: List[str]
+
+
+def chunk_chars() -> int:
+    return getattr(settings, 'LLM_CHUNK_CHARS', 24000)
+
+
+def needs_chunking(text: str) -> bool:
+    return len(text) > MAX_TEXT_CHARS
+
+
+def split_sections(text: str):
+    """[(heading, body)] in document order; text before the first heading is 'Front matter'."""
+    sections = []
+    previous_title, previous_start = 'Front matter', 0
+    for match in HEADING_RE.finditer(text):
+        sections.append((previous_title, text[previous_start:match.start()]))
+        previous_title, previous_start = match.group(0).strip(), match.start()
+    sections.append((previous_title, text[previous_start:]))
+    return [(title, body) for title, body in sections if body.strip()]
+
+
+def _split_long(body: str, limit: int) -> List[str]:
+    """Split an oversized section at paragraph breaks, else whitespace."""
+    pieces = []
+    while len(body) > limit:
+        cut = body.rfind('\n\n', limit // 2, limit)
+        if cut == -1:
+            cut = body.rfind(' ', limit // 2, limit)
+        if cut == -1:
+            cut = limit
+        pieces.append(body[:cut])
+        body = body[cut:]
+    pieces.append(body)
+    return pieces
+
+
+def make_chunks(text: str, limit: Optional[int] = None) -> List[Chunk]:
+    """Pack whole sections greedily into chunks of at most `limit` characters."""
+    limit = limit or chunk_chars()
+
+    chunks: List[Chunk] = []
+    parts: List[str] = []
+    names: List[str] = []
+    size = 0
+    for title, body in split_sections(text):
+        for piece in _split_long(body, limit):
+            if parts and size + len(piece) > limit:
+                chunks.append(Chunk(''.join(parts), names))
+                parts, names, size = [], [], 0
+            parts.append(piece)
+            if title not in names:
+                names.append(title)
+            size += len(piece)
+    if parts:
+        chunks.append(Chunk(''.join(parts), names))
+    return chunks
+
+
+def _map_prompts(kind: str, chunks: List[Chunk]) -> List[str]:
+    return [
+        chunk_prompt(kind, chunk.text, i, len(chunks), ', '.join(chunk.sections)[:300])
+        for i, chunk in enumerate(chunks, start=1)
+    ]
+
+
+def _dumps(partials: List[dict]) -> str:
+    return json.dumps(partials, ensure_ascii=False)
+
+
+def reduce_groups(partials: List[dict], limit: Optional[int] = None) -> List[List[dict]]:
+    """
+    Split partial results into consecutive groups for one reduce call each:
+    at most LLM_MAX_CHUNKS results and about `limit` characters of JSON per
+    group. Groups hold at least two results, so every round shrinks the list.
+    """
+    limit = limit or chunk_chars()
+    fan_in = max(getattr(settings, 'LLM_MAX_CHUNKS', 16), 2)
+    groups: List[List[dict]] = []
+    group: List[dict] = []
+    size = 0
+    for partial in partials:
+        length = len(_dumps([partial]))
+        if len(group) >= fan_in or (len(group) >= 2 and size + length > limit):
+            groups.append(group)
+            group, size = [], 0
+        group.append(partial)
+        size += length
+    groups.append(group)
+    return groups
+
+
+def analyze_chunked(kind: str, text: str, call: Callable[[str], Optional[dict]]) -> Optional[dict]:
+    """
+    Map-reduce analysis of `text` for `kind` ('summary', 'insights' or
+    'readiness'). `call(prompt)` returns parsed JSON, or None when the API
+    key is rejected (and then so does this). Short texts take one call.
+    """
+    if not needs_chunking(text):
+        return call(FULL_PROMPTS[kind](text))
+
+    prompts = _map_prompts(kind, make_chunks(text))
+    workers = min(getattr(settings, 'LLM_CHUNK_CONCURRENCY', 6), len(prompts))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='llm-map') as executor:
+        def run(batch):
+            futures = [executor.submit(propagate(call), prompt) for prompt in batch]
+            return [future.result() for future in futures]
+
+        partials = run(prompts)
+        while None not in partials and len(groups := reduce_groups(partials)) > 1:
+            partials = run([merge_prompt(kind, _dumps(group)) for group in groups])
+
+    if any(partial is None for partial in partials):
+        return None
+    return call(reduce_prompt(kind, _dumps(partials)))
+
+
+async def aanalyze_chunked(kind: str, text: str,
+                           call: Callable[[str], Awaitable[Optional[dict]]]) -> Optional[dict]:
+    """Async version of analyze_chunked."""
+    if not needs_chunking(text):
+        return await call(FULL_PROMPTS[kind](text))
+
+    slots = asyncio.Semaphore(getattr(settings, 'LLM_CHUNK_CONCURRENCY', 6))
+
+    async def bounded(prompt):
+        async with slots:
+            return await call(prompt)
+
+    async def run(batch):
+        return await asyncio.gather(*(bounded(prompt) for prompt in batch))
+
+    partials = await run(_map_prompts(kind, make_chunks(text)))
+    while None not in partials and len(groups := reduce_groups(partials)) > 1:
+        partials = await run([merge_prompt(kind, _dumps(group)) for group in groups])
+
+    if any(partial is None for partial in partials):
+        return None
+    return await call(reduce_prompt(kind, _dumps(partials)))
@@ -0,0 +1,144 @@
+"""
+LLM Response Cache
+
+Two-tier cache for OpenRouter completions: an in-process LRU in front of a
+persistent Django cache (the "llm" alias), keyed on model, prompt hash and
+response mode.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+
+
+class LLMCache:
+    """
+    Cache of raw completion text.
+
+    The in-process tier evicts least-recently-used entries once it holds more
+    than `max_entries` items or `max_bytes` characters; the persistent tier is
+    bounded by its own MAX_ENTRIES culling. Both tiers expire entries after
+    `ttl` seconds.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: int = 7 * 24 * 3600, alias: str = 'llm'):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.alias = alias
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'persistent_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+        }
+
+    @staticmethod
+    def make_key(model: str, prompt: str, mode: str) -> str:
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        return f"llm:{model}:{mode}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return entry[1]
+                self._remove(key)
+
+        value = None
+        backend = self._backend()
+        if backend is not None:
+            try:
+                value = backend.get(key)
+            except Exception as e:
+                print(f"LLM cache read failed: {e}")
+
+        with self._lock:
+            if value is None:
+                self._counters['misses'] += 1
+                return None
+            self._counters['persistent_hits'] += 1
+            self._store(key, value, now)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._counters['sets'] += 1
+            self._store(key, value, time.monotonic())
+
+        backend = self._backend()
+        if backend is not None:
+            try:
+                backend.set(key, value, timeout=self.ttl)
+            except Exception as e:
+                print(f"LLM cache write failed: {e}")
+
+    async def aget(self, key: str) -> Optional[str]:
+        # The persistent tier does blocking file IO; keep it off the event loop
+        return await sync_to_async(self.get, thread_sensitive=False)(key)
+
+    async def aset(self, key: str, value: str) -> None:
+        await sync_to_async(self.set, thread_sensitive=False)(key, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        backend = self._backend()
+        if backend is not None:
+            backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._size
+        lookups = stats['memory_hits'] + stats['persistent_hits'] + stats['misses']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['persistent_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def _store(self, key: str, value: str, now: float) -> None:
+        # Caller holds the lock
+        if key in self._entries:
+            self._remove(key)
+        if len(value) > self.max_bytes:
+            return
+        self._entries[key] = (now + self.ttl, value)
+        self._size += len(value)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counters['evictions'] += 1
+
+    def _remove(self, key: str) -> None:
+        _, value = self._entries.pop(key)
+        self._size -= len(value)
+
+    def _backend(self):
+        try:
+            return caches[self.alias]
+        except InvalidCacheBackendError:
+            return None
+
+
+llm_cache = LLMCache(
+    max_entries=getattr(settings, 'LLM_CACHE_MAX_ENTRIES', 512),
+    max_bytes=getattr(settings, 'LLM_CACHE_MAX_BYTES', 32 * 1024 * 1024),
+    ttl=getattr(settings, 'LLM_CACHE_TTL', 7 * 24 * 3600),
+)
@@ -0,0 +1,413 @@
+"""
+Metrics
+
+In-process counters and histograms for the LLM calls, exposed in the
+Prometheus text format at /metrics.
+
+Each worker process keeps its own registry and writes a snapshot to
+METRICS_DIR/<pid>.json (from a background thread, at most every
+METRICS_FLUSH_INTERVAL seconds, and at exit). /metrics sums the snapshots
+of every live worker, so it reports the whole deployment whichever worker
+answers. Snapshots of exited workers are dropped; Prometheus treats the
+drop as a counter reset.
+
+Metrics are labelled with the endpoint (the URL name of the request that
+made the call, set by MetricsMiddleware) and the model:
+
+    llm_requests_total{endpoint,model,outcome}     upstream calls: ok, fallback (401), error
+    llm_request_duration_seconds{endpoint,model}    upstream call latency
+    llm_tokens_total{endpoint,model,type}           prompt / completion tokens from `usage`
+    llm_cache_lookups_total{endpoint,model,result}  response cache hit / miss
+    llm_json_parse_failures_total{endpoint,model}
+    http_request_duration_seconds{endpoint,method,status}
+
+plus the response cache and single-flight counters of each process.
+
+/metrics is internal: with METRICS_TOKEN set it requires that bearer token,
+otherwise it only answers clients on the loopback interface.
+"""
+
+import atexit
+import contextvars
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+# Calls made outside a request (management commands, shells)
+NO_ENDPOINT = 'none'
+
+_endpoint: contextvars.ContextVar = contextvars.ContextVar('metrics_endpoint', default=NO_ENDPOINT)
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, registry: 'Registry', name: str, help_text: str, labels: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            self.registry.changed()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help_text, labels, buckets: Sequence[float]):
+        super().__init__(registry, name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                # Per-bucket (not cumulative) counts, the last one for +Inf
+                entry = self.values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    break
+            else:
+                i = len(self.buckets)
+            entry['counts'][i] += 1
+            entry['sum'] += value
+            self.registry.changed()
+
+
+class Registry:
+    """Metrics of this process, flushed to a per-process file for aggregation."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, Metric] = {}
+        self._pid = None
+        self._dirty = False
+        self._flusher = None
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(self, name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LLM_BUCKETS) -> Histogram:
+        return self._add(Histogram(self, name, help_text, labels, buckets))
+
+    def _add(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def changed(self) -> None:
+        # Caller holds the lock
+        pid = os.getpid()
+        if pid != self._pid:
+            # Forked worker: drop what was inherited from the parent
+            if self._pid is not None:
+                for metric in self.metrics.values():
+                    metric.values.clear()
+            self._pid = pid
+            self._flusher = None
+        self._dirty = True
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def snapshot(self) -> dict:
+        from .llm_cache import llm_cache
+        from . import singleflight
+
+        with self.lock:
+            metrics = {
+                name: {
+                    'kind': metric.kind,
+                    'help': metric.help,
+                    'labels': list(metric.labels),
+                    'buckets': list(getattr(metric, 'buckets', ())),
+                    'values': [[list(key), _copy(value)] for key, value in metric.values.items()],
+                }
+                for name, metric in self.metrics.items()
+            }
+            self._dirty = False
+        return {
+            'pid': os.getpid(),
+            'metrics': metrics,
+            'cache': llm_cache.stats(),
+            'singleflight': singleflight.stats(),
+        }
+
+    def flush(self) -> None:
+        directory = metrics_dir()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f'{os.getpid()}.json')
+            temp = f'{path}.tmp'
+            with open(temp, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(temp, path)
+        except OSError as e:
+            print(f"Metrics flush failed: {e}")
+
+    def _flush_loop(self) -> None:
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        while True:
+            time.sleep(interval)
+            if self._dirty:
+                self.flush()
+
+
+def _copy(value):
+    # Histogram entries keep changing after the lock is released
+    return dict(value, counts=list(value['counts'])) if isinstance(value, dict) else value
+
+
+registry = Registry()
+atexit.register(lambda: registry._pid == os.getpid() and registry.flush())
+
+LLM_REQUESTS = registry.counter(
+    'llm_requests_total', 'Upstream LLM calls by outcome (ok, fallback, error).',
+    ('endpoint', 'model', 'outcome'))
+LLM_LATENCY = registry.histogram(
+    'llm_request_duration_seconds', 'Upstream LLM call latency.', ('endpoint', 'model'))
+LLM_TOKENS = registry.counter(
+    'llm_tokens_total', 'Tokens reported in the upstream usage block.', ('endpoint', 'model', 'type'))
+LLM_CACHE_LOOKUPS = registry.counter(
+    'llm_cache_lookups_total', 'Response cache lookups by result (hit, miss).', ('endpoint', 'model', 'result'))
+LLM_PARSE_FAILURES = registry.counter(
+    'llm_json_parse_failures_total', 'Completions that were not valid JSON.', ('endpoint', 'model'))
+HTTP_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Request latency by endpoint.', ('endpoint', 'method', 'status'),
+    buckets=HTTP_BUCKETS)
+
+
+def metrics_dir() -> str:
+    return str(getattr(settings, 'METRICS_DIR', os.path.join(settings.BASE_DIR, '.metrics')))
+
+
+def endpoint() -> str:
+    return _endpoint.get()
+
+
+def observe_llm(model: str, outcome: str, seconds: float, usage: Optional[dict] = None) -> None:
+    """Record one upstream call for the current endpoint."""
+    name = endpoint()
+    LLM_REQUESTS.inc(endpoint=name, model=model, outcome=outcome)
+    LLM_LATENCY.observe(seconds, endpoint=name, model=model)
+    for kind in ('prompt', 'completion'):
+        tokens = (usage or {}).get(f'{kind}_tokens')
+        if isinstance(tokens, (int, float)):
+            LLM_TOKENS.inc(tokens, endpoint=name, model=model, type=kind)
+
+
+def observe_cache(model: str, hit: bool) -> None:
+    LLM_CACHE_LOOKUPS.inc(endpoint=endpoint(), model=model, result='hit' if hit else 'miss')
+
+
+def observe_parse_failure(model: str) -> None:
+    LLM_PARSE_FAILURES.inc(endpoint=endpoint(), model=model)
+
+
+class MetricsMiddleware:
+    """Labels LLM calls with the request's endpoint and records request latency."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        name, started = self.start(request)
+        token = _endpoint.set(name)
+        try:
+            response = self.get_response(request)
+        finally:
+            _endpoint.reset(token)
+        return self.finish(request, response, name, started)
+
+    async def __acall__(self, request):
+        name, started = self.start(request)
+        token = _endpoint.set(name)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _endpoint.reset(token)
+        return self.finish(request, response, name, started)
+
+    @staticmethod
+    def start(request):
+        try:
+            match = resolve(request.path_info)
+            name = match.url_name or match.route
+        except Resolver404:
+            name = 'unmatched'
+        return name, time.perf_counter()
+
+    @staticmethod
+    def finish(request, response, name: str, started: float):
+        HTTP_LATENCY.observe(time.perf_counter() - started,
+                             endpoint=name, method=request.method, status=response.status_code)
+        return response
+
+
+# Exposition
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect() -> List[dict]:
+    """Snapshots of every live worker, this process's taken fresh."""
+    registry.flush()
+    directory = metrics_dir()
+    snapshots = []
+    try:
+        filenames = os.listdir(directory)
+    except OSError:
+        return snapshots
+    for filename in filenames:
+        if not filename.endswith('.json'):
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            pid = int(filename[:-len('.json')])
+        except ValueError:
+            continue
+        if not _alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return snapshots
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """All metrics, summed over workers, in the Prometheus text format."""
+    snapshots = collect()
+    lines = []
+
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot['metrics'].items():
+            target = merged.setdefault(name, dict(metric, values={}))
+            for key, value in metric['values']:
+                key = tuple(key)
+                if metric['kind'] == 'counter':
+                    target['values'][key] = target['values'].get(key, 0) + value
+                else:
+                    entry = target['values'].setdefault(key, {'counts': [0] * len(value['counts']), 'sum': 0.0})
+                    entry['counts'] = [a + b for a, b in zip(entry['counts'], value['counts'])]
+                    entry['sum'] += value['sum']
+
+    for name, metric in merged.items():
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key, value in sorted(metric['values'].items()):
+            if metric['kind'] == 'counter':
+                lines.append(f"{name}{_labels(metric['labels'], key)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(list(metric['buckets']) + [math.inf], value['counts']):
+                cumulative += count
+                le = f'le="{_number(float(bound))}"'
+                lines.append(f"{name}_bucket{_labels(metric['labels'], key, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(metric['labels'], key)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(metric['labels'], key)} {cumulative}")
+
+    # Response cache and single-flight counters of each worker, summed
+    cache_events = {}
+    cache_sizes = {'entries': 0, 'bytes': 0}
+    flights = {}
+    for snapshot in snapshots:
+        for event in ('memory_hits', 'persistent_hits', 'misses', 'sets', 'evictions'):
+            cache_events[event] = cache_events.get(event, 0) + snapshot['cache'].get(event, 0)
+        for size in cache_sizes:
+            cache_sizes[size] += snapshot['cache'].get(size, 0)
+        for mode, counts in snapshot['singleflight'].items():
+            for role, count in counts.items():
+                flights[(mode, role)] = flights.get((mode, role), 0) + count
+
+    lines.append('# HELP llm_cache_events_total Response cache events of all workers.')
+    lines.append('# TYPE llm_cache_events_total counter')
+    for event, count in sorted(cache_events.items()):
+        lines.append(f'llm_cache_events_total{_labels(["event"], [event])} {count}')
+    lines.append('# HELP llm_cache_entries In-process response cache entries of all workers.')
+    lines.append('# TYPE llm_cache_entries gauge')
+    lines.append(f"llm_cache_entries {cache_sizes['entries']}")
+    lines.append('# HELP llm_cache_bytes In-process response cache size of all workers.')
+    lines.append('# TYPE llm_cache_bytes gauge')
+    lines.append(f"llm_cache_bytes {cache_sizes['bytes']}")
+    lines.append('# HELP llm_singleflight_calls_total Coalesced LLM calls by role (leaders made the upstream call).')
+    lines.append('# TYPE llm_singleflight_calls_total counter')
+    for (mode, role), count in sorted(flights.items()):
+        if role != 'in_flight':
+            lines.append(f'llm_singleflight_calls_total{_labels(["mode", "role"], [mode, role])} {count}')
+    lines.append('# HELP llm_singleflight_in_flight LLM calls currently in flight.')
+    lines.append('# TYPE llm_singleflight_in_flight gauge')
+    for (mode, role), count in sorted(flights.items()):
+        if role == 'in_flight':
+            lines.append(f'llm_singleflight_in_flight{_labels(["mode"], [mode])} {count}')
+    lines.append(f'# Aggregated from {len(snapshots)} worker(s)')
+    return '\n'.join(lines) + '\n'
+
+
+def authorized(request) -> bool:
+    """Whether a request may read /metrics (see the module docstring)."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        return hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}')
+    return request.META.get('REMOTE_ADDR') in ('127.0.0.1', '::1')
@@ -0,0 +1,361 @@
+"""
+OpenRouter Client
+
+Shared HTTP clients for OpenRouter chat completions. Connections are pooled
+and kept alive across calls, every call has an overall deadline, and
+rate-limited or failed attempts are retried with jittered exponential
+backoff (honouring Retry-After). `OpenRouterClient` serves the sync views;
+`AsyncOpenRouterClient` serves the async views without blocking a thread.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import aiohttp
+import dotenv
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+# Load environment variables
+dotenv.load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
+
+OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+DEFAULT_MODEL = "google/gemini-2.0-flash-001"
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def chat_payload(prompt: str, model: str, stream: bool = False) -> dict:
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def parse_content(content: str, json_response: bool):
+    """Returns (content to cache, result)."""
+    if not json_response:
+        return content, content
+    # Clean up potential markdown code blocks
+    content = content.replace('```json', '').replace('```', '').strip()
+    return content, json.loads(content)
+
+
+def request_headers(api_key: Optional[str], title: str = "Research Insight Hub") -> dict:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "HTTP-Referer": "http://localhost:8000",
+        "X-Title": title,
+        "Content-Type": "application/json"
+    }
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float], base: float, cap: float) -> float:
+    # Full jitter: a random delay up to the exponential cap
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def retry_after_seconds(headers) -> Optional[float]:
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenRouterClient:
+    """
+    Thread-safe client for the OpenRouter chat completions API.
+
+    At most `max_connections` requests are in flight at once; callers beyond
+    that wait for a free slot, but never past their deadline. A streamed
+    response keeps its slot until the caller closes it.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = 'https://openrouter.ai/api/v1',
+                 max_connections: int = 20, max_retries: int = 3, deadline: float = 60.0,
+                 connect_timeout: float = 5.0, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    def headers(self, title: str = "Research Insight Hub") -> dict:
+        return request_headers(self.api_key, title)
+
+    def chat_completion(self, prompt: str, model: str = DEFAULT_MODEL,
+                        title: str = "Research Insight Hub", deadline: Optional[float] = None,
+                        stream: bool = False) -> requests.Response:
+        """
+        POST a single-message chat completion and return the final response.
+
+        429 and 5xx responses and connection errors are retried until the
+        deadline (seconds, default: the client's) runs out; the last
+        response is returned as-is so callers can inspect its status.
+
+        Raises:
+            requests.exceptions.Timeout: If the deadline passes first
+            requests.exceptions.RequestException: If every attempt failed to connect
+        """
+        return self.post("/chat/completions", chat_payload(prompt, model, stream),
+                         title=title, deadline=deadline, stream=stream)
+
+    def post(self, path: str, payload: dict, title: str = "Research Insight Hub",
+             deadline: Optional[float] = None, stream: bool = False) -> requests.Response:
+        budget = self.deadline if deadline is None else deadline
+        expires_at = time.monotonic() + budget
+        url = self.base_url + path
+        headers = self.headers(title)
+
+        attempt = 0
+        while True:
+            remaining = expires_at - time.monotonic()
+            if remaining <= 0 or not self._slots.acquire(timeout=remaining):
+                raise requests.exceptions.Timeout(f"Deadline of {budget} seconds exceeded")
+
+            retry_after = None
+            error = None
+            held = False
+            try:
+                remaining = max(expires_at - time.monotonic(), 0.001)
+                response = self.session.post(
+                    url,
+                    headers=headers,
+                    json=payload,
+                    timeout=(min(self.connect_timeout, remaining), remaining),
+                    stream=stream
+                )
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    if stream:
+                        # The body is still being read off the connection
+                        self._release_on_close(response)
+                        held = True
+                    return response
+                retry_after = retry_after_seconds(response.headers)
+                response.close()
+            except requests.exceptions.Timeout:
+                raise
+            except requests.exceptions.ConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+            finally:
+                if not held:
+                    self._slots.release()
+
+            delay = backoff_delay(attempt, retry_after, self.backoff_base, self.backoff_max)
+            if time.monotonic() + delay >= expires_at:
+                if error is not None:
+                    raise error
+                raise requests.exceptions.Timeout(
+                    f"Deadline of {budget} seconds exceeded while backing off after HTTP {response.status_code}"
+                )
+            time.sleep(delay)
+            attempt += 1
+
+    def _release_on_close(self, response: requests.Response) -> None:
+        close = response.close
+        released = threading.Lock()
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                # close() may be called more than once; the slot is freed once
+                if released.acquire(blocking=False):
+                    self._slots.release()
+
+        response.close = close_and_release
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class AsyncOpenRouterClient:
+    """
+    asyncio counterpart of `OpenRouterClient`, built on aiohttp.
+
+    Waiting for a reply holds no thread, so one process can keep hundreds of
+    completions in flight. At most `max_connections` requests use the
+    network at once; the rest queue for a pooled connection until their
+    deadline. A client belongs to the event loop it was created on;
+    `get_async_client` closes it when that loop shuts down.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = 'https://openrouter.ai/api/v1',
+                 max_connections: int = 500, max_retries: int = 3, deadline: float = 60.0,
+                 connect_timeout: float = 5.0, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.connect_timeout = connect_timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=max_connections, limit_per_host=max_connections)
+        )
+
+    async def chat_completion(self, prompt: str, model: str = DEFAULT_MODEL,
+                              title: str = "Research Insight Hub", deadline: Optional[float] = None,
+                              stream: bool = False) -> aiohttp.ClientResponse:
+        """
+        POST a single-message chat completion and return the final response.
+
+        The body has already been read unless `stream` is set, in which case
+        the caller iterates `response.content` and must release the response.
+
+        Raises:
+            asyncio.TimeoutError: If the deadline passes first
+            aiohttp.ClientError: If every attempt failed to connect
+        """
+        return await self.post("/chat/completions", chat_payload(prompt, model, stream),
+                               title=title, deadline=deadline, stream=stream)
+
+    async def post(self, path: str, payload: dict, title: str = "Research Insight Hub",
+                   deadline: Optional[float] = None, stream: bool = False) -> aiohttp.ClientResponse:
+        budget = self.deadline if deadline is None else deadline
+        loop = asyncio.get_running_loop()
+        expires_at = loop.time() + budget
+        url = self.base_url + path
+        headers = request_headers(self.api_key, title)
+
+        attempt = 0
+        while True:
+            remaining = expires_at - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError(f"Deadline of {budget} seconds exceeded")
+
+            retry_after = None
+            error = None
+            response = None
+            try:
+                # Streams are only bounded until the headers arrive
+                timeout = aiohttp.ClientTimeout(
+                    total=None if stream else remaining,
+                    connect=min(self.connect_timeout, remaining),
+                    sock_read=remaining if stream else None
+                )
+                response = await self.session.post(url, headers=headers, json=payload, timeout=timeout)
+                if response.status not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    if not stream:
+                        await response.read()
+                    return response
+                retry_after = retry_after_seconds(response.headers)
+                response.release()
+            except asyncio.TimeoutError:
+                raise asyncio.TimeoutError(f"Deadline of {budget} seconds exceeded")
+            except aiohttp.ClientConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                error = e
+
+            delay = backoff_delay(attempt, retry_after, self.backoff_base, self.backoff_max)
+            if loop.time() + delay >= expires_at:
+                if error is not None:
+                    raise error
+                raise asyncio.TimeoutError(
+                    f"Deadline of {budget} seconds exceeded while backing off after HTTP {response.status}"
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def close(self) -> None:
+        await self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_client() -> OpenRouterClient:
+    """Process-wide client configured from settings."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenRouterClient(
+                api_key=OPENROUTER_API_KEY,
+                base_url=getattr(settings, 'OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
+                max_connections=getattr(settings, 'OPENROUTER_MAX_CONNECTIONS', 20),
+                max_retries=getattr(settings, 'OPENROUTER_MAX_RETRIES', 3),
+                deadline=getattr(settings, 'OPENROUTER_DEADLINE', 60.0),
+            )
+    return _client
+
+
+def get_async_client() -> AsyncOpenRouterClient:
+    """Client for the running event loop, configured from settings."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncOpenRouterClient(
+            api_key=OPENROUTER_API_KEY,
+            base_url=getattr(settings, 'OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1'),
+            max_connections=getattr(settings, 'OPENROUTER_ASYNC_MAX_CONNECTIONS', 500),
+            max_retries=getattr(settings, 'OPENROUTER_MAX_RETRIES', 3),
+            deadline=getattr(settings, 'OPENROUTER_DEADLINE', 60.0),
+        )
+        _async_clients[loop] = client
+        _close_on_shutdown(client)
+    return client
+
+
+def _close_on_shutdown(client: AsyncOpenRouterClient) -> None:
+    """
+    Close the client's session when its event loop shuts down.
+
+    asyncio.run, which ASGI servers and asgiref (for async views under WSGI,
+    one loop per request) use, finalizes suspended async generators in
+    loop.shutdown_asyncgens() before closing the loop. A generator parked at
+    its first yield therefore runs its cleanup on the loop, at shutdown.
+    """
+    async def until_shutdown():
+        try:
+            yield
+        finally:
+            await client.close()
+
+    hook = until_shutdown()
+    # Advance to the yield now; this also registers it with the running loop
+    try:
+        hook.__anext__().send(None)
+    except StopIteration:
+        pass
+    # The loop only holds a weak reference
+    client._shutdown_hook = hook
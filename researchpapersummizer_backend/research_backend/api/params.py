@@ -0,0 +1,27 @@
+"""
+Request Parameters
+
+Helpers for reading optional request fields shared by the sync and async views.
+"""
+
+from typing import Optional
+
+
+def request_flag(data, name: str) -> bool:
+    """Boolean request field; accepts JSON booleans and form-style strings."""
+    value = data.get(name, False)
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes')
+    return bool(value)
+
+
+def last_message_content(messages) -> Optional[str]:
+    """
+    Content of the last chat message, or None unless `messages` is a list
+    of objects that each have a string "content".
+    """
+    if not isinstance(messages, list) or not all(
+        isinstance(message, dict) and isinstance(message.get('content'), str) for message in messages
+    ):
+        return None
+    return messages[-1]['content'] if messages else None
@@ -0,0 +1,215 @@
+"""
+Prompt Builders
+
+Prompts and demo-mode fallback payloads shared by the sync and async views,
+so both code paths send identical requests (and share cache entries).
+"""
+
+from typing import Optional
+
+# Characters of paper text sent to the model
+MAX_TEXT_CHARS = 30000
+
+SUMMARY_KEYS = """- abstract: (string) The abstract of the paper.
+- findings: (array of strings) Key findings.
+- methodology: (string) The methodology used.
+- limitations: (string) Any limitations mentioned."""
+
+INSIGHT_KEYS = """- keyConcepts: (array of strings) Not just keywords, but actual concepts.
+- objectives: (array of strings) The goals of the paper.
+- results: (array of strings) The direct results.
+- conclusions: (array of strings) The conclusions drawn."""
+
+# Per-part notes that the readiness reduce step evaluates
+READINESS_NOTE_KEYS = """- contributions: (array of strings) Claimed contributions and what is new about them.
+- methodology: (array of strings) Methods, models and technical details.
+- experiments: (array of strings) Datasets, baselines, metrics and results.
+- literature: (array of strings) Related work discussed and citations used.
+- strengths: (array of strings) Strengths visible in this part.
+- weaknesses: (array of strings) Weaknesses or gaps visible in this part."""
+
+
+def summary_prompt(text: str) -> str:
+    return f"""Analyze the following research paper text and provide a structured summary.
+Return JSON format only. The JSON must have the following keys:
+{SUMMARY_KEYS}
+
+Do not hallucinate. Use academic tone.
+
+Text: {text[:MAX_TEXT_CHARS]}"""
+
+
+def insight_prompt(text: str) -> str:
+    return f"""Extract deep technical insights from this research paper.
+Focus on specific objectives, key concepts, results, and ultimate conclusions.
+Return JSON format only. The JSON must have the following keys:
+{INSIGHT_KEYS}
+
+Text: {text[:MAX_TEXT_CHARS]}"""
+
+
+CHUNK_KEYS = {
+    'summary': SUMMARY_KEYS,
+    'insights': INSIGHT_KEYS,
+    'readiness': READINESS_NOTE_KEYS,
+}
+
+
+def chunk_prompt(kind: str, text: str, part: int, parts: int, sections: str) -> str:
+    """Map step: analyse one part of a paper too long for a single prompt."""
+    return f"""You are reading part {part} of {parts} of a research paper (sections: {sections}).
+Analyze only this part. Return JSON format only. The JSON must have the following keys:
+{CHUNK_KEYS[kind]}
+
+Use an empty string or empty array for anything this part does not cover.
+Do not hallucinate. Use academic tone.
+
+Text: {text}"""
+
+
+def merge_prompt(kind: str, partials: str) -> str:
+    """Intermediate reduce step: merge some per-part results into one, keeping the per-part schema."""
+    return f"""The following JSON objects are partial analyses of consecutive parts of one research paper.
+Merge them into a single analysis of all these parts: combine and deduplicate list items,
+keep the most important ones, and write string fields as one coherent text.
+Return JSON format only. The JSON must have the following keys:
+{CHUNK_KEYS[kind]}
+
+Do not hallucinate. Use academic tone.
+
+Partial analyses: {partials}"""
+
+
+def reduce_prompt(kind: str, partials: str) -> str:
+    """Reduce step: merge the per-part results into the endpoint's schema."""
+    if kind == 'readiness':
+        return readiness_prompt(
+            f"(Review notes extracted from each part of the paper, in order, as JSON)\n{partials}",
+            max_chars=None
+        )
+    keys = SUMMARY_KEYS if kind == 'summary' else INSIGHT_KEYS
+    return f"""The following JSON objects are partial analyses of consecutive parts of one research paper.
+Merge them into a single analysis of the whole paper: combine and deduplicate list items,
+keep the most important ones, and write string fields as one coherent text.
+Return JSON format only. The JSON must have the following keys:
+{keys}
+
+Do not hallucinate. Use academic tone.
+
+Partial analyses: {partials}"""
+
+
+def search_prompt(query: str) -> str:
+    return f"""Based on the user query "{query}", generate a simulated search response
+that looks like it came from a semantic search of research papers.
+Provide a direct answer based on general knowledge about the potential topic.
+"""
+
+
+def readiness_prompt(text: str, max_chars: Optional[int] = MAX_TEXT_CHARS) -> str:
+    return f"""You are an expert research paper reviewer evaluating publication readiness for top-tier academic conferences and journals.
+
+Analyze the following research paper and provide a comprehensive evaluation.
+
+CRITICAL: You MUST return valid JSON with ALL of these fields:
+
+1. novelty_score (integer 0-100): How novel and original is the research?
+2. technical_depth_score (integer 0-100): Technical rigor and depth of methodology
+3. experimental_rigor_score (integer 0-100): Quality of experiments, data, and validation
+4. literature_coverage_score (integer 0-100): Comprehensiveness of related work and citations
+5. publication_readiness_score (integer 0-100): Overall readiness for publication
+6. strengths (array of strings): 3-5 key strengths of the paper
+7. weaknesses (array of strings): 3-5 key weaknesses or areas for improvement
+8. suggestions (array of strings): 3-5 specific actionable suggestions for improvement
+9. suitable_venues (array of strings): 3-5 appropriate conferences or journals (e.g., "NeurIPS", "ICML", "ICLR", "ACL", "CVPR", "Nature", "Science", etc.)
+10. final_verdict (string): One of: "Ready for Publication", "Minor Revisions Needed", "Major Revisions Needed", or "Not Ready"
+
+RESPONSE FORMAT - Return ONLY valid JSON, no markdown, no code blocks:
+
+{{
+  "novelty_score": 85,
+  "technical_depth_score": 78,
+  "experimental_rigor_score": 82,
+  "literature_coverage_score": 88,
+  "publication_readiness_score": 80,
+  "strengths": [
+    "Novel approach to problem X",
+    "Comprehensive experimental evaluation",
+    "Strong theoretical foundation"
+  ],
+  "weaknesses": [
+    "Limited dataset size",
+    "Baseline comparisons could be expanded",
+    "Some edge cases not addressed"
+  ],
+  "suggestions": [
+    "Expand experiments to additional datasets",
+    "Include more recent baseline methods",
+    "Add ablation studies for component Y"
+  ],
+  "suitable_venues": [
+    "NeurIPS",
+    "ICML",
+    "ICLR",
+    "JMLR"
+  ],
+  "final_verdict": "Minor Revisions Needed"
+}}
+
+RESEARCH PAPER TEXT:
+
+{text[:max_chars]}
+
+Remember: Return ONLY the JSON object above with actual analysis. Do NOT include markdown formatting or code blocks."""
+
+
+# Fallback Mock Data, returned when the API key is rejected (401)
+DEMO_SUMMARY = {
+    "abstract": "⚠️ DEMO MODE: The API key provided is invalid (401 Unauthorized). This is a simulated summary to demonstrate the UI layout. The actual paper content was not processed by AI.",
+    "findings": [
+        "Finding 1: The application handles API errors gracefully.",
+        "Finding 2: UI components render correctly even with mock data.",
+        "Finding 3: User needs to update the OpenRouter API key in .env file."
+    ],
+    "methodology": "Simulated response generation for testing purposes.",
+    "limitations": "No actual AI analysis performed."
+}
+
+DEMO_INSIGHTS = {
+    "keyConcepts": ["Error Handling", "UI Testing", "API Configuration"],
+    "objectives": ["Demonstrate system resilience", "Guide user to fix configuration"],
+    "results": ["System is operational in demo mode", "Layout verification successful"],
+    "conclusions": ["The application is functioning, but requires a valid API key for real AI insights."]
+}
+
+DEMO_CHAT = "I'm sorry, but I cannot process your request right now because the OpenRouter API Key is invalid. I am running in Demo Mode. Please update the key in your .env file."
+
+DEMO_READINESS = {
+    "novelty_score": 75,
+    "technical_depth_score": 70,
+    "experimental_rigor_score": 65,
+    "literature_coverage_score": 68,
+    "publication_readiness_score": 72,
+    "strengths": [
+        "⚠️ DEMO MODE: API key is invalid (401 Unauthorized)",
+        "This is a simulated evaluation to demonstrate the response structure",
+        "Please update OPENROUTER_API_KEY in your .env file"
+    ],
+    "weaknesses": [
+        "No actual AI analysis performed",
+        "Scores are placeholder values"
+    ],
+    "suggestions": [
+        "Configure valid OpenRouter API key",
+        "Retry the request after updating credentials"
+    ],
+    "suitable_venues": [
+        "Demo Venue 1",
+        "Demo Venue 2"
+    ],
+    "final_verdict": "Not Ready"
+}
+
+
+def demo_search_answer(query: str) -> str:
+    return f"⚠️ DEMO SEARCH: We couldn't reach the AI to answer '{query}' because the API key is invalid. Please check your .env file."
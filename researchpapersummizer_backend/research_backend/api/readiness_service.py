@@ -5,25 +5,33 @@ Handles AI-powered research paper evaluation using OpenRouter API.
 Provides comprehensive academic assessment across multiple criteria.
 """
 
-import os
+import asyncio
 import json
+import time
+import aiohttp
 import requests
 from typing import Dict, Any, Optional
-import dotenv
+from .llm_cache import llm_cache
+from .openrouter_client import (
+    OPENROUTER_API_KEY, DEFAULT_MODEL as READINESS_MODEL, get_async_client, get_client
+)
+from .chunking import aanalyze_chunked, analyze_chunked, needs_chunking
+from .prompts import readiness_prompt
+from .singleflight import allm_flight, llm_flight
+from . import metrics, timing
 
-# Load environment variables
-dotenv.load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
+READINESS_TITLE = "Research Insight Hub - Readiness Evaluation"
 
-OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
 
-
-def evaluate_research_readiness(text: str, timeout: int = 30) -> Optional[Dict[str, Any]]:
+def evaluate_research_readiness(text: str, timeout: int = 30, chunked: bool = False) -> Optional[Dict[str, Any]]:
     """
     Evaluate research paper readiness using OpenRouter LLM API.
     
     Args:
         text: Full research paper text to evaluate
         timeout: Request timeout in seconds (default: 30)
+        chunked: Read the whole paper with map-reduce calls instead of
+            truncating it to a single prompt
         
     Returns:
         Dictionary containing evaluation scores and feedback, or None if API fails
@@ -35,113 +43,141 @@ def evaluate_research_readiness(text: str, timeout: int = 30) -> Optional[Dict[s
         print("Warning: OPENROUTER_API_KEY not configured. Returning None for fallback mode.")
         return None
     
+    if chunked and needs_chunking(text):
+        return analyze_chunked('readiness', text, lambda prompt: _complete(prompt, timeout))
+    
     # Construct the evaluation prompt
-    prompt = f"""You are an expert research paper reviewer evaluating publication readiness for top-tier academic conferences and journals.
-
-Analyze the following research paper and provide a comprehensive evaluation.
-
-CRITICAL: You MUST return valid JSON with ALL of these fields:
-
-1. novelty_score (integer 0-100): How novel and original is the research?
-2. technical_depth_score (integer 0-100): Technical rigor and depth of methodology
-3. experimental_rigor_score (integer 0-100): Quality of experiments, data, and validation
-4. literature_coverage_score (integer 0-100): Comprehensiveness of related work and citations
-5. publication_readiness_score (integer 0-100): Overall readiness for publication
-6. strengths (array of strings): 3-5 key strengths of the paper
-7. weaknesses (array of strings): 3-5 key weaknesses or areas for improvement
-8. suggestions (array of strings): 3-5 specific actionable suggestions for improvement
-9. suitable_venues (array of strings): 3-5 appropriate conferences or journals (e.g., "NeurIPS", "ICML", "ICLR", "ACL", "CVPR", "Nature", "Science", etc.)
-10. final_verdict (string): One of: "Ready for Publication", "Minor Revisions Needed", "Major Revisions Needed", or "Not Ready"
+    return _complete(readiness_prompt(text), timeout)
 
-RESPONSE FORMAT - Return ONLY valid JSON, no markdown, no code blocks:
 
-{{
-  "novelty_score": 85,
-  "technical_depth_score": 78,
-  "experimental_rigor_score": 82,
-  "literature_coverage_score": 88,
-  "publication_readiness_score": 80,
-  "strengths": [
-    "Novel approach to problem X",
-    "Comprehensive experimental evaluation",
-    "Strong theoretical foundation"
-  ],
-  "weaknesses": [
-    "Limited dataset size",
-    "Baseline comparisons could be expanded",
-    "Some edge cases not addressed"
-  ],
-  "suggestions": [
-    "Expand experiments to additional datasets",
-    "Include more recent baseline methods",
-    "Add ablation studies for component Y"
-  ],
-  "suitable_venues": [
-    "NeurIPS",
-    "ICML",
-    "ICLR",
-    "JMLR"
-  ],
-  "final_verdict": "Minor Revisions Needed"
-}}
-
-RESEARCH PAPER TEXT:
+def _complete(prompt: str, timeout: int) -> Optional[Dict[str, Any]]:
+    # Repeat evaluations of the same text are answered from the response cache
+    cache_key = llm_cache.make_key(READINESS_MODEL, prompt, 'readiness')
+    with timing.stage('llm_cache'):
+        cached = llm_cache.get(cache_key)
+    metrics.observe_cache(READINESS_MODEL, hit=cached is not None)
+    if cached is not None:
+        return json.loads(cached)
+    
+    # Concurrent evaluations of the same text share one upstream call
+    with timing.stage('llm'):
+        return llm_flight.do(cache_key, lambda: _request(prompt, cache_key, timeout))
 
-{text[:30000]}
 
-Remember: Return ONLY the JSON object above with actual analysis. Do NOT include markdown formatting or code blocks."""
-    
-    # Configure API request
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "http://localhost:8000",
-        "X-Title": "Research Insight Hub - Readiness Evaluation",
-        "Content-Type": "application/json"
-    }
-    
-    payload = {
-        "model": "google/gemini-2.0-flash-001",
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    }
-    
+def _request(prompt: str, cache_key: str, timeout: int) -> Optional[Dict[str, Any]]:
+    started = time.perf_counter()
     try:
-        # Make API request with timeout
-        response = requests.post(
-            "https://openrouter.ai/api/v1/chat/completions",
-            headers=headers,
-            json=payload,
-            timeout=timeout
+        # Make API request; the shared client retries transient failures within the deadline
+        response = get_client().chat_completion(
+            prompt,
+            model=READINESS_MODEL,
+            title=READINESS_TITLE,
+            deadline=timeout
         )
+        elapsed = time.perf_counter() - started
         
         # Handle 401 Unauthorized (invalid API key)
         if response.status_code == 401:
+            metrics.observe_llm(READINESS_MODEL, 'fallback', elapsed)
             print("OpenRouter API 401 Error: Invalid Key. Returning None for fallback.")
             return None
         
         # Handle other error status codes
         if response.status_code != 200:
+            metrics.observe_llm(READINESS_MODEL, 'error', elapsed)
             raise Exception(f"OpenRouter API failed with status {response.status_code}: {response.text}")
         
         # Parse response
         data = response.json()
+        metrics.observe_llm(READINESS_MODEL, 'ok', elapsed, data.get('usage'))
         content = data['choices'][0]['message']['content']
         
         # Clean markdown code blocks if present
         content = content.replace('```json', '').replace('```', '').strip()
         
-        # Parse and return JSON
-        return json.loads(content)
+        # Parse and return JSON; only parsable responses are cached
+        result = json.loads(content)
+        llm_cache.set(cache_key, content)
+        return result
         
     except requests.exceptions.Timeout:
+        metrics.observe_llm(READINESS_MODEL, 'error', time.perf_counter() - started)
         raise Exception(f"Request timeout after {timeout} seconds. The research paper may be too long or the API is slow.")
     
     except requests.exceptions.RequestException as e:
+        metrics.observe_llm(READINESS_MODEL, 'error', time.perf_counter() - started)
+        raise Exception(f"Network error while calling OpenRouter API: {str(e)}")
+    
+    except json.JSONDecodeError as e:
+        metrics.observe_parse_failure(READINESS_MODEL)
+        raise Exception(f"Failed to parse API response as JSON: {str(e)}")
+
+
+async def aevaluate_research_readiness(text: str, timeout: int = 30,
+                                       chunked: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Async version of evaluate_research_readiness for the async views; same
+    prompt, cache entries, fallback and errors.
+    """
+    if not OPENROUTER_API_KEY:
+        print("Warning: OPENROUTER_API_KEY not configured. Returning None for fallback mode.")
+        return None
+    
+    if chunked and needs_chunking(text):
+        return await aanalyze_chunked('readiness', text, lambda prompt: _acomplete(prompt, timeout))
+    return await _acomplete(readiness_prompt(text), timeout)
+
+
+async def _acomplete(prompt: str, timeout: int) -> Optional[Dict[str, Any]]:
+    cache_key = llm_cache.make_key(READINESS_MODEL, prompt, 'readiness')
+    with timing.stage('llm_cache'):
+        cached = await llm_cache.aget(cache_key)
+    metrics.observe_cache(READINESS_MODEL, hit=cached is not None)
+    if cached is not None:
+        return json.loads(cached)
+    
+    with timing.stage('llm'):
+        return await allm_flight.do(cache_key, lambda: _arequest(prompt, cache_key, timeout))
+
+
+async def _arequest(prompt: str, cache_key: str, timeout: int) -> Optional[Dict[str, Any]]:
+    started = time.perf_counter()
+    try:
+        client = get_async_client()
+        response = await client.chat_completion(
+            prompt,
+            model=READINESS_MODEL,
+            title=READINESS_TITLE,
+            deadline=timeout
+        )
+        elapsed = time.perf_counter() - started
+        
+        if response.status == 401:
+            metrics.observe_llm(READINESS_MODEL, 'fallback', elapsed)
+            print("OpenRouter API 401 Error: Invalid Key. Returning None for fallback.")
+            return None
+        
+        if response.status != 200:
+            metrics.observe_llm(READINESS_MODEL, 'error', elapsed)
+            raise Exception(f"OpenRouter API failed with status {response.status}: {await response.text()}")
+        
+        data = await response.json(content_type=None)
+        metrics.observe_llm(READINESS_MODEL, 'ok', elapsed, data.get('usage'))
+        content = data['choices'][0]['message']['content']
+        content = content.replace('```json', '').replace('```', '').strip()
+        
+        result = json.loads(content)
+        await llm_cache.aset(cache_key, content)
+        return result
+        
+    except asyncio.TimeoutError:
+        metrics.observe_llm(READINESS_MODEL, 'error', time.perf_counter() - started)
+        raise Exception(f"Request timeout after {timeout} seconds. The research paper may be too long or the API is slow.")
+    
+    except aiohttp.ClientError as e:
+        metrics.observe_llm(READINESS_MODEL, 'error', time.perf_counter() - started)
         raise Exception(f"Network error while calling OpenRouter API: {str(e)}")
     
     except json.JSONDecodeError as e:
+        metrics.observe_parse_failure(READINESS_MODEL)
         raise Exception(f"Failed to parse API response as JSON: {str(e)}")
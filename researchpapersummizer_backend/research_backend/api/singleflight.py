@@ -0,0 +1,127 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent callers asking for the same key share one in-flight call: the
+first caller (the leader) runs it, the rest (followers) wait for its result
+or exception. Once the call finishes the key is forgotten, so later callers
+go through the response cache the leader has just filled.
+
+`SingleFlight` serves the threaded sync views; `AsyncSingleFlight` serves
+the async views, one group of in-flight calls per event loop.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _Counters:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {'leaders': 0, 'followers': 0}
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread-based coalescing of identical concurrent calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._counters = _Counters()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            self._counters.incr('followers')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._counters.incr('leaders')
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._counters.snapshot()
+        with self._lock:
+            stats['in_flight'] = len(self._calls)
+        return stats
+
+
+class AsyncSingleFlight:
+    """
+    asyncio coalescing of identical concurrent calls.
+
+    The shared call runs as its own task, so a leader whose request is
+    cancelled (e.g. the client disconnected) does not cancel it for the
+    followers.
+    """
+
+    def __init__(self):
+        self._tasks = weakref.WeakKeyDictionary()  # event loop -> {key: task}
+        self._counters = _Counters()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        tasks = self._tasks.setdefault(loop, {})
+        task = tasks.get(key)
+        if task is None:
+            self._counters.incr('leaders')
+            task = tasks[key] = loop.create_task(fn())
+            task.add_done_callback(lambda done: self._forget(tasks, key, done))
+        else:
+            self._counters.incr('followers')
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _forget(tasks, key: str, task: asyncio.Task) -> None:
+        tasks.pop(key, None)
+        # Mark the exception retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        stats = self._counters.snapshot()
+        stats['in_flight'] = sum(len(tasks) for tasks in list(self._tasks.values()))
+        return stats
+
+
+# Shared by every LLM call site, keyed by the response cache key
+llm_flight = SingleFlight()
+allm_flight = AsyncSingleFlight()
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    return {'sync': llm_flight.stats(), 'async': allm_flight.stats()}
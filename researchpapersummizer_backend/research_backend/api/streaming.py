@@ -0,0 +1,303 @@
+"""
+LLM Streaming
+
+Server-Sent Events relay for OpenRouter completions requested with
+`stream: true`. Events sent to the client:
+
+    event: token    data: {"text": "<delta>"}
+    event: partial  data: <best-effort parse of the JSON so far>   (JSON endpoints, throttled)
+    event: done     data: <same body as the non-streaming endpoint>
+    event: error    data: {"error": "<message>"}
+
+Completed responses go through the same cache as the non-streaming calls,
+so a cached prompt is answered with a single token event and `done`.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, Callable, Iterable, List, Optional
+
+import aiohttp
+import requests
+from django.http import StreamingHttpResponse
+
+from .llm_cache import llm_cache
+from .openrouter_client import (
+    OPENROUTER_API_KEY, DEFAULT_MODEL as OPENROUTER_MODEL, get_async_client, get_client, parse_content
+)
+
+# Only the last few commas are tried as cut points when repairing partial JSON
+MAX_REPAIR_CUTS = 4
+
+# A partial object is re-parsed once the text has grown by this many
+# characters or by 1/PARTIAL_GROWTH, whichever is more, so the parses of
+# a response add up to a constant multiple of its length
+PARTIAL_MIN_CHARS = 64
+PARTIAL_GROWTH = 8
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def event_stream_response(events) -> StreamingHttpResponse:
+    """Wrap a (sync or async) iterator of SSE strings in an unbuffered response."""
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx-style proxies from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def delta_from_line(line: str) -> Optional[str]:
+    """
+    Text delta carried by one upstream SSE line, '' for lines without text
+    (comments, role-only chunks) and None for the [DONE] sentinel.
+    """
+    if not line.startswith('data:'):
+        return ''
+    payload = line[5:].strip()
+    if payload == '[DONE]':
+        return None
+    if not payload:
+        return ''
+    chunk = json.loads(payload)
+    if 'error' in chunk:
+        error = chunk['error']
+        raise Exception(f"OpenRouter stream failed: {error.get('message', error) if isinstance(error, dict) else error}")
+    choices = chunk.get('choices') or [{}]
+    return (choices[0].get('delta') or {}).get('content') or ''
+
+
+def parse_partial_json(text: str) -> Optional[dict]:
+    """
+    Best-effort parse of a JSON object that is still being generated.
+
+    Open strings, arrays and objects are closed; if that is not valid JSON
+    (e.g. the text ends inside a key), the text is cut back to one of the
+    last few top-level-or-nested commas and closed there instead.
+    """
+    parser = PartialJsonParser()
+    parser.feed(text)
+    return parser.value()
+
+
+class PartialJsonParser:
+    """
+    Incremental `parse_partial_json`: each fed delta is scanned once, and
+    the scanner state (open brackets, string state, recent commas) carries
+    over, so only `value` looks at the whole text.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.size = 0
+        self.stack: List[str] = []
+        # (index of a comma, closers needed before it)
+        self.cuts = deque(maxlen=MAX_REPAIR_CUTS)
+        self.in_string = False
+        self.escape = False
+        self.started = False
+        self.complete = False
+
+    def feed(self, text: str) -> None:
+        if self.complete:
+            return
+        if not self.started:
+            start = text.find('{')
+            if start == -1:
+                return
+            text = text[start:]
+            self.started = True
+
+        stack = self.stack
+        for i, ch in enumerate(text):
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == '\\':
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                stack.append('}')
+            elif ch == '[':
+                stack.append(']')
+            elif ch in '}]':
+                if stack:
+                    stack.pop()
+                if not stack:
+                    # Anything after the object is ignored
+                    text = text[:i + 1]
+                    self.complete = True
+                    break
+            elif ch == ',':
+                self.cuts.append((self.size + i, ''.join(reversed(stack))))
+        self.parts.append(text)
+        self.size += len(text)
+
+    def value(self) -> Optional[dict]:
+        """The object so far, or None if no repair of it parses."""
+        if not self.started:
+            return None
+        text = ''.join(self.parts)
+        self.parts = [text]
+
+        closers = ''.join(reversed(self.stack))
+        candidates = []
+        if self.in_string:
+            body = text[:-1] if self.escape else text
+            candidates.append(body + '"' + closers)
+        else:
+            candidates.append(text + closers)
+        candidates.extend(text[:i] + c for i, c in reversed(self.cuts))
+
+        for candidate in candidates:
+            try:
+                value = json.loads(candidate)
+            except ValueError:
+                continue
+            if isinstance(value, dict):
+                return value
+        return None
+
+
+class CompletionRelay:
+    """
+    Turns completion text deltas into SSE events and the final `done` body.
+
+    `wrap` maps the completed result onto the endpoint's response body (e.g.
+    chat wraps plain text as {"response": text}); `fallback` is the demo
+    body used when the API key is rejected.
+    """
+
+    def __init__(self, prompt: str, json_response: bool, wrap: Callable[[Any], Any], fallback: Any):
+        self.prompt = prompt
+        self.json_response = json_response
+        self.wrap = wrap
+        self.fallback = fallback
+        self.cache_key = llm_cache.make_key(OPENROUTER_MODEL, prompt, 'json' if json_response else 'text')
+        self.parts = []
+        self.partial_json = PartialJsonParser()
+        self.next_partial_at = 0
+        self.last_partial = None
+
+    def token(self, delta: str) -> Iterable[str]:
+        self.parts.append(delta)
+        yield sse_event('token', {'text': delta})
+        if not self.json_response:
+            return
+        parser = self.partial_json
+        parser.feed(delta)
+        if parser.size < self.next_partial_at:
+            return
+        self.next_partial_at = parser.size + max(PARTIAL_MIN_CHARS, parser.size // PARTIAL_GROWTH)
+        partial = parser.value()
+        if partial is not None and partial != self.last_partial:
+            self.last_partial = partial
+            yield sse_event('partial', partial)
+
+    def finish(self, content: Optional[str] = None) -> Iterable[str]:
+        """Final events; `content` is a cached completion, else the streamed text."""
+        cached = content is not None
+        if not cached:
+            content = ''.join(self.parts)
+        try:
+            content, result = parse_content(content, self.json_response)
+        except ValueError as e:
+            yield sse_event('error', {'error': f'Failed to parse API response as JSON: {e}'})
+            return
+        if not cached:
+            llm_cache.set(self.cache_key, content)
+        yield sse_event('done', self.wrap(result))
+
+    def cached_events(self, content: str) -> Iterable[str]:
+        yield sse_event('token', {'text': content})
+        yield from self.finish(content)
+
+    def demo_events(self) -> Iterable[str]:
+        print("OpenRouter API 401 Error: Invalid Key. Streaming fallback response.")
+        yield sse_event('done', self.fallback)
+
+
+def stream_completion(prompt: str, json_response: bool, wrap: Callable[[Any], Any], fallback: Any):
+    """Sync generator of SSE events for one streamed completion."""
+    relay = CompletionRelay(prompt, json_response, wrap, fallback)
+    response = None
+    try:
+        if not OPENROUTER_API_KEY:
+            raise Exception("OpenRouter API key not configured")
+
+        content = llm_cache.get(relay.cache_key)
+        if content is not None:
+            yield from relay.cached_events(content)
+            return
+
+        response = get_client().chat_completion(prompt, model=OPENROUTER_MODEL, stream=True)
+        if response.status_code == 401:
+            yield from relay.demo_events()
+            return
+        if response.status_code != 200:
+            raise Exception(f"OpenRouter API failed: {response.text}")
+
+        for raw in response.iter_lines():
+            delta = delta_from_line(raw.decode('utf-8'))
+            if delta is None:
+                break
+            if delta:
+                yield from relay.token(delta)
+        yield from relay.finish()
+    except requests.exceptions.Timeout:
+        yield sse_event('error', {'error': 'OpenRouter API request timed out'})
+    except Exception as e:
+        yield sse_event('error', {'error': str(e)})
+    finally:
+        if response is not None:
+            response.close()
+
+
+async def astream_completion(prompt: str, json_response: bool, wrap: Callable[[Any], Any], fallback: Any):
+    """Async generator of SSE events for one streamed completion."""
+    relay = CompletionRelay(prompt, json_response, wrap, fallback)
+    response = None
+    try:
+        if not OPENROUTER_API_KEY:
+            raise Exception("OpenRouter API key not configured")
+
+        content = await llm_cache.aget(relay.cache_key)
+        if content is not None:
+            for event in relay.cached_events(content):
+                yield event
+            return
+
+        response = await get_async_client().chat_completion(prompt, model=OPENROUTER_MODEL, stream=True)
+        if response.status == 401:
+            for event in relay.demo_events():
+                yield event
+            return
+        if response.status != 200:
+            raise Exception(f"OpenRouter API failed: {await response.text()}")
+
+        async for raw in response.content:
+            delta = delta_from_line(raw.decode('utf-8').rstrip('\r\n'))
+            if delta is None:
+                break
+            if delta:
+                for event in relay.token(delta):
+                    yield event
+        # finish() writes the persistent cache tier; keep that file IO off the loop
+        for event in await asyncio.to_thread(lambda: list(relay.finish())):
+            yield event
+    except asyncio.TimeoutError:
+        yield sse_event('error', {'error': 'OpenRouter API request timed out'})
+    except aiohttp.ClientError as e:
+        yield sse_event('error', {'error': f'OpenRouter API request failed: {e}'})
+    except Exception as e:
+        yield sse_event('error', {'error': str(e)})
+    finally:
+        if response is not None:
+            response.release()
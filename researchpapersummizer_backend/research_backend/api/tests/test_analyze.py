@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+
+from django.test import override_settings
+
+from api.prompts import MAX_TEXT_CHARS
+from api.tests.test_async_views import LATENCY, MockLLMTestCase
+
+
+PAPER = 'We rank the nodes of citation graphs with a neural network. ' * 5
+
+LONG_PAPER = ''.join(
+    f'{number}. {name}\n' + 'The graph model ranks citation nodes well. ' * 250 + '\n\n'
+    for number, name in enumerate(['Introduction', 'Methods', 'Results', 'Discussion'], start=1)
+)
+
+
+class AnalyzeViewTests(MockLLMTestCase):
+    def analyze(self, body, path='/api/analyze/'):
+        return self.client.post(path, body, content_type='application/json')
+
+    def test_parts_run_concurrently(self):
+        started = time.perf_counter()
+        response = self.analyze({'text': PAPER})
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['errors'], {})
+        self.assertEqual(body['summary']['abstract'], 'Mock abstract.')
+        self.assertEqual(body['insights']['keyConcepts'], ['Mock concept'])
+        self.assertEqual(body['readiness']['final_verdict'], 'Minor Revisions Needed')
+        self.assertEqual(self.completions(), 3)
+        self.assertLess(elapsed, 2.5 * LATENCY)
+
+    def test_requested_parts_only(self):
+        body = self.analyze({'text': PAPER, 'parts': 'insights,summary'}).json()
+
+        self.assertEqual(list(body), ['summary', 'insights', 'errors'])
+        self.assertEqual(self.completions(), 2)
+
+    def test_short_text_skips_readiness(self):
+        body = self.analyze({'text': 'Too short for a review.'}).json()
+
+        self.assertEqual(list(body['errors']), ['readiness'])
+        self.assertIn('summary', body)
+
+    def test_unknown_part_is_rejected(self):
+        response = self.analyze({'text': PAPER, 'parts': ['summary', 'abstract']})
+
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(ANALYZE_TIMEOUT=LATENCY / 4)
+    def test_slow_parts_are_reported_as_errors(self):
+        # Its own text: the abandoned calls still finish and fill the cache later
+        response = self.analyze({'text': PAPER + 'Slowly.'})
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(sorted(response.json()['errors']), ['insights', 'readiness', 'summary'])
+
+    def test_chunked_parts_are_mapped_then_reduced(self):
+        self.assertGreater(len(LONG_PAPER), MAX_TEXT_CHARS)
+
+        response = self.analyze({'text': LONG_PAPER, 'chunked': True})
+
+        body = response.json()
+        self.assertEqual(body['errors'], {})
+        self.assertEqual(body['summary']['abstract'], 'Mock abstract.')
+        self.assertEqual(body['readiness']['publication_readiness_score'], 70)
+        # Two map calls and one reduce call per part
+        self.assertEqual(self.completions(), 9)
+
+    def test_async_matches_sync(self):
+        for body in [{'text': PAPER}, {'text': LONG_PAPER, 'chunked': True, 'parts': ['summary']}]:
+            with self.subTest(chunked='chunked' in body):
+                expected = self.analyze(body).json()
+                response = asyncio.run(self.async_client.post(
+                    '/api/async/analyze/', json.dumps(body), content_type='application/json'
+                ))
+
+                self.assertEqual(response.json(), expected)
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import requests
+from django.conf import settings
+from django.test import SimpleTestCase, override_settings
+
+from api.llm_cache import llm_cache
+from api.prompts import DEMO_SUMMARY
+from api.tests.test_llm_cache import LOCMEM_CACHES
+
+
+MOCK_LLM = Path(settings.BASE_DIR).parent / 'benchmarks' / 'mock_llm.py'
+
+# Seconds the mock LLM takes per completion
+LATENCY = 0.2
+
+# Modules that read the API key at import time
+API_KEY_MODULES = (
+    'api.openrouter_client', 'api.views', 'api.async_views', 'api.readiness_service', 'api.streaming',
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class MockLLMTestCase(SimpleTestCase):
+    """Runs the benchmarks' mock OpenRouter server and points the API client at it."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        port = free_port()
+        cls.mock_url = f'http://127.0.0.1:{port}'
+        process = subprocess.Popen([
+            sys.executable, str(MOCK_LLM), '--port', str(port), '--latency', str(LATENCY),
+            '--first-token', '0', '--token-delay', '0',
+        ])
+        cls.addClassCleanup(process.wait)
+        cls.addClassCleanup(process.terminate)
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise
+                time.sleep(0.05)
+
+    def setUp(self):
+        metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, metrics_dir, ignore_errors=True)
+        overrides = override_settings(
+            OPENROUTER_BASE_URL=f'{self.mock_url}/api/v1', CACHES=LOCMEM_CACHES, METRICS_DIR=metrics_dir,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for module in API_KEY_MODULES:
+            patcher = mock.patch(f'{module}.OPENROUTER_API_KEY', 'test-key')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        # A fresh sync client, built from the settings above
+        patcher = mock.patch('api.openrouter_client._client', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        llm_cache.clear()
+        requests.post(f'{self.mock_url}/stats/reset', timeout=5)
+
+    def completions(self) -> int:
+        """Completions the mock LLM has answered in this test."""
+        return requests.get(f'{self.mock_url}/stats', timeout=5).json().get('completions', 0)
+
+
+class AsyncViewTests(MockLLMTestCase):
+    async def post(self, path, body):
+        return await self.async_client.post(path, json.dumps(body), content_type='application/json')
+
+    async def test_summary_comes_from_the_llm(self):
+        response = await self.post('/api/async/summarize/', {'text': 'A short paper about graphs.'})
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['abstract'], 'Mock abstract.')
+        self.assertNotEqual(body, DEMO_SUMMARY)
+
+    async def test_endpoints_match_their_sync_versions(self):
+        text = 'A paper about graphs. ' * 10
+        for path, body in [
+            ('insights/', {'text': text}),
+            ('search/', {'query': 'graph ranking'}),
+            ('chat/', {'messages': [{'role': 'user', 'content': 'What is PageRank?'}]}),
+            ('research-readiness/', {'text': text}),
+        ]:
+            with self.subTest(path=path):
+                response = await self.post(f'/api/async/{path}', body)
+                expected = await asyncio.to_thread(self.client.post, f'/api/{path}', body, content_type='application/json')
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_requests_wait_concurrently(self):
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            self.post('/api/async/summarize/', {'text': f'Paper number {i} about graphs.'}) for i in range(8)
+        ))
+
+        self.assertEqual([response.status_code for response in responses], [200] * 8)
+        self.assertLess(time.perf_counter() - started, 4 * LATENCY)
+        self.assertEqual(await asyncio.to_thread(self.completions), 8)
+
+    async def test_repeat_prompt_is_served_from_the_cache(self):
+        for _ in range(2):
+            response = await self.post('/api/async/summarize/', {'text': 'The same paper twice.'})
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(await asyncio.to_thread(self.completions), 1)
+
+    async def test_malformed_body_is_rejected(self):
+        response = await self.async_client.post('/api/async/summarize/', '{', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Malformed JSON body'})
+
+    async def test_stream_ends_with_the_parsed_result(self):
+        response = await self.post('/api/async/summarize/', {'text': 'A streamed paper.', 'stream': True})
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertIn('event: token', content)
+        done = content.split('event: done\ndata: ', 1)[1].split('\n', 1)[0]
+        self.assertEqual(json.loads(done)['abstract'], 'Mock abstract.')
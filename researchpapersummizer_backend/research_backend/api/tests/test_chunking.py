@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from api.chunking import _split_long, aanalyze_chunked, analyze_chunked, make_chunks, reduce_groups, split_sections
+from api.prompts import MAX_TEXT_CHARS
+
+
+def paper(sections, words=40):
+    """Plain text with one numbered heading per section name."""
+    return ''.join(
+        f'{i}. {name}\n' + ' '.join(f'{name.lower()}{j}' for j in range(words)) + '\n\n'
+        for i, name in enumerate(sections, start=1)
+    )
+
+
+class FakeLLM:
+    """Answers map prompts with their part number and merge/reduce prompts with the parts they cover."""
+
+    def __init__(self):
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+        if prompt.startswith('You are reading part'):
+            return {'parts': [int(prompt.split()[4])]}
+        partials = json.loads(prompt[prompt.index('['):])
+        return {'parts': [part for partial in partials for part in partial['parts']]}
+
+    def reduce_calls(self):
+        return [prompt for prompt in self.prompts if not prompt.startswith('You are reading part')]
+
+
+class ChunkingTests(SimpleTestCase):
+    def test_split_sections_keeps_front_matter_and_order(self):
+        text = 'A Paper Title\n\n' + paper(['Introduction', 'Results'])
+
+        sections = split_sections(text)
+
+        self.assertEqual([title for title, _ in sections], ['Front matter', '1. Introduction', '2. Results'])
+        self.assertEqual(''.join(body for _, body in sections), text)
+
+    def test_sections_are_packed_whole(self):
+        text = paper(['Introduction', 'Methods', 'Results', 'Discussion'])
+        section = len(split_sections(text)[0][1])
+
+        chunks = make_chunks(text, limit=2 * section + 10)
+
+        self.assertEqual([chunk.sections for chunk in chunks],
+                         [['1. Introduction', '2. Methods'], ['3. Results', '4. Discussion']])
+        self.assertEqual(''.join(chunk.text for chunk in chunks), text)
+
+    def test_split_long_prefers_paragraph_breaks_then_spaces(self):
+        body = 'a' * 60 + '\n\n' + 'b ' * 30 + 'c' * 100
+
+        pieces = _split_long(body, 100)
+
+        self.assertEqual(pieces[0], 'a' * 60)
+        self.assertTrue(pieces[1].startswith('\n\nb b'))
+        self.assertTrue(all(len(piece) <= 100 for piece in pieces))
+        self.assertEqual(''.join(pieces), body)
+
+    def test_split_long_cuts_unbroken_text_at_the_limit(self):
+        self.assertEqual(_split_long('x' * 250, 100), ['x' * 100, 'x' * 100, 'x' * 50])
+
+    def test_chunks_never_exceed_the_limit(self):
+        text = paper([f'Part {i}' for i in range(200)], words=400)
+
+        chunks = make_chunks(text, limit=5000)
+
+        self.assertGreater(len(chunks), 16)
+        self.assertTrue(all(len(chunk.text) <= 5000 for chunk in chunks))
+        self.assertEqual(''.join(chunk.text for chunk in chunks), text)
+
+    @override_settings(LLM_MAX_CHUNKS=3)
+    def test_reduce_groups_cap_results_per_call(self):
+        partials = [{'parts': [i]} for i in range(7)]
+
+        self.assertEqual([len(group) for group in reduce_groups(partials)], [3, 3, 1])
+        self.assertEqual([len(group) for group in reduce_groups(partials, limit=1)], [2, 2, 2, 1])
+
+
+@override_settings(LLM_CHUNK_CHARS=2000, LLM_MAX_CHUNKS=4, LLM_CHUNK_CONCURRENCY=3)
+class ChunkedAnalysisTests(SimpleTestCase):
+    text = paper([f'Part {i}' for i in range(120)], words=60)
+
+    def test_short_text_takes_one_call(self):
+        prompts = []
+
+        analyze_chunked('summary', 'short paper', lambda prompt: prompts.append(prompt) or {})
+
+        self.assertEqual(len(prompts), 1)
+        self.assertIn('Text: short paper', prompts[0])
+
+    def test_long_text_is_reduced_in_rounds(self):
+        self.assertGreater(len(self.text), MAX_TEXT_CHARS)
+        parts = len(make_chunks(self.text))
+        llm = FakeLLM()
+
+        result = analyze_chunked('summary', self.text, llm)
+
+        self.assertEqual(result, {'parts': list(range(1, parts + 1))})
+        reduce_calls = llm.reduce_calls()
+        self.assertGreater(len(reduce_calls), 2)
+        self.assertTrue(all(len(json.loads(prompt[prompt.index('['):])) <= 4 for prompt in reduce_calls))
+        self.assertTrue(reduce_calls[-1].startswith('The following JSON objects'))
+        self.assertIn('whole paper', reduce_calls[-1])
+        self.assertNotIn('whole paper', reduce_calls[0])
+
+    def test_async_matches_sync(self):
+        llm = FakeLLM()
+
+        async def call(prompt):
+            return llm(prompt)
+
+        result = asyncio.run(aanalyze_chunked('insights', self.text, call))
+
+        self.assertEqual(result, analyze_chunked('insights', self.text, FakeLLM()))
+
+    def test_rejected_key_stops_before_reducing(self):
+        llm = FakeLLM()
+
+        def call(prompt):
+            return None if 'part 2 of' in prompt else llm(prompt)
+
+        self.assertIsNone(analyze_chunked('summary', self.text, call))
+        self.assertEqual(llm.reduce_calls(), [])
@@ -0,0 +1,83 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from api.llm_cache import LLMCache
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'llm': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'llm-cache-tests'},
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class LLMCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['llm'].clear()
+
+    def test_keys_depend_on_model_prompt_and_mode(self):
+        key = LLMCache.make_key('model', 'prompt', 'json')
+
+        self.assertEqual(key, LLMCache.make_key('model', 'prompt', 'json'))
+        self.assertEqual(len({
+            key,
+            LLMCache.make_key('other', 'prompt', 'json'),
+            LLMCache.make_key('model', 'prompt!', 'json'),
+            LLMCache.make_key('model', 'prompt', 'text'),
+        }), 4)
+
+    def test_miss_then_memory_hit(self):
+        cache = LLMCache()
+
+        self.assertIsNone(cache.get('key'))
+        cache.set('key', 'completion')
+
+        self.assertEqual(cache.get('key'), 'completion')
+        stats = cache.stats()
+        self.assertEqual((stats['misses'], stats['memory_hits'], stats['sets']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_persistent_tier_survives_a_new_process(self):
+        LLMCache().set('key', 'completion')
+        cache = LLMCache()
+
+        self.assertEqual(cache.get('key'), 'completion')
+        self.assertEqual(cache.get('key'), 'completion')
+        stats = cache.stats()
+        self.assertEqual((stats['persistent_hits'], stats['memory_hits']), (1, 1))
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = LLMCache(max_entries=2, alias='missing')
+        cache.set('a', 'A')
+        cache.set('b', 'B')
+        cache.get('a')
+
+        cache.set('c', 'C')
+
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), ('A', None, 'C'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_memory_tier_is_bounded_by_size(self):
+        cache = LLMCache(max_bytes=10, alias='missing')
+        cache.set('a', 'x' * 6)
+        cache.set('b', 'y' * 6)
+        cache.set('huge', 'z' * 11)
+
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('huge')), (None, 'y' * 6, None))
+        self.assertEqual(cache.stats()['bytes'], 6)
+
+    def test_expired_entries_are_misses(self):
+        cache = LLMCache(ttl=-1)
+        cache.set('key', 'completion')
+
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_clear_empties_both_tiers(self):
+        cache = LLMCache()
+        cache.set('key', 'completion')
+
+        cache.clear()
+
+        self.assertIsNone(cache.get('key'))
+        self.assertIsNone(LLMCache().get('key'))
@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.test import override_settings
+
+from api import metrics
+from api.openrouter_client import DEFAULT_MODEL
+from api.tests.test_async_views import MockLLMTestCase
+
+
+# Records a few metrics in a separate process, then waits for stdin to close
+WORKER = """
+import sys
+import django
+django.setup()
+from api import metrics
+metrics.LLM_REQUESTS.inc(3, endpoint='metrics-test', model='m', outcome='ok')
+metrics.LLM_LATENCY.observe(1.5, endpoint='metrics-test', model='m')
+metrics.registry.flush()
+print('ready', flush=True)
+sys.stdin.read()
+"""
+
+
+def sample(text: str, series: str) -> float:
+    """Value of one series in a Prometheus text exposition; 0 if absent."""
+    for line in text.splitlines():
+        if line.startswith(series + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+class MetricsTests(MockLLMTestCase):
+    def scrape(self, **extra):
+        response = self.client.get('/metrics', **extra)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_llm_calls_are_counted_per_endpoint(self):
+        ok = f'llm_requests_total{{endpoint="summarize",model="{DEFAULT_MODEL}",outcome="ok"}}'
+        tokens = f'llm_tokens_total{{endpoint="summarize",model="{DEFAULT_MODEL}",type="completion"}}'
+        hits = f'llm_cache_lookups_total{{endpoint="summarize",model="{DEFAULT_MODEL}",result="hit"}}'
+        before = self.scrape()
+
+        for _ in range(2):
+            self.client.post('/api/summarize/', {'text': 'A paper worth measuring.'}, content_type='application/json')
+        after = self.scrape()
+
+        self.assertEqual(sample(after, ok) - sample(before, ok), 1)
+        self.assertEqual(sample(after, hits) - sample(before, hits), 1)
+        self.assertGreater(sample(after, tokens), sample(before, tokens))
+
+    def test_worker_snapshots_are_summed(self):
+        requests_ok = 'llm_requests_total{endpoint="metrics-test",model="m",outcome="ok"}'
+        latency_sum = 'llm_request_duration_seconds_sum{endpoint="metrics-test",model="m"}'
+        worker = subprocess.Popen(
+            [sys.executable, '-c', WORKER], cwd=settings.BASE_DIR, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            env=dict(os.environ, DJANGO_SETTINGS_MODULE='research_backend.settings',
+                     METRICS_DIR=settings.METRICS_DIR),
+        )
+        self.addCleanup(worker.kill)
+        self.assertEqual(worker.stdout.readline().strip(), 'ready')
+        before = self.scrape()
+        self.assertGreaterEqual(sample(before, requests_ok), 3)
+
+        metrics.LLM_REQUESTS.inc(2, endpoint='metrics-test', model='m', outcome='ok')
+        metrics.LLM_LATENCY.observe(0.5, endpoint='metrics-test', model='m')
+        after = self.scrape()
+
+        self.assertEqual(sample(after, requests_ok), sample(before, requests_ok) + 2)
+        self.assertAlmostEqual(sample(after, latency_sum), sample(before, latency_sum) + 0.5)
+        self.assertIn('# Aggregated from 2 worker(s)', after)
+
+        # An exited worker's snapshot is dropped
+        worker.stdin.close()
+        worker.wait(timeout=10)
+        self.assertEqual(sample(self.scrape(), requests_ok), sample(after, requests_ok) - 3)
+        self.assertEqual(os.listdir(settings.METRICS_DIR), [f'{os.getpid()}.json'])
+
+    def test_without_a_token_only_loopback_clients_are_served(self):
+        self.scrape()
+        self.scrape(REMOTE_ADDR='::1')
+
+        response = self.client.get('/metrics', REMOTE_ADDR='10.0.0.5')
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN='s3cret')
+    def test_token_is_required_when_set(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+        self.scrape(HTTP_AUTHORIZATION='Bearer s3cret', REMOTE_ADDR='10.0.0.5')
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.test import SimpleTestCase
+
+from api.openrouter_client import (
+    AsyncOpenRouterClient, OpenRouterClient, backoff_delay, retry_after_seconds
+)
+
+
+COMPLETION = {'choices': [{'message': {'content': 'ok'}}]}
+
+
+class StubServer:
+    """
+    Local HTTP server answering POSTs from a script of
+    (status, headers, delay) replies; the last reply repeats.
+    """
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = 0
+        self.release = threading.Event()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                with lock:
+                    status, headers, delay = stub.replies[min(stub.requests, len(stub.replies) - 1)]
+                    stub.requests += 1
+                if delay:
+                    # Hang until the delay passes or the test finishes
+                    stub.release.wait(delay)
+                body = json.dumps(COMPLETION if status == 200 else {'error': status}).encode()
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # The client gave up
+
+            def log_message(self, *args):
+                pass
+
+        lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+
+    def stop(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def reply(status=200, headers=None, delay=0):
+    return status, headers or {}, delay
+
+
+class StubServerTestCase(SimpleTestCase):
+    api_client_class = OpenRouterClient
+
+    def serve(self, *replies):
+        stub = StubServer(*replies)
+        self.addCleanup(stub.stop)
+        return stub
+
+    def make_client(self, stub, **options):
+        options = {'max_retries': 3, 'deadline': 5.0, 'backoff_base': 0.001, 'backoff_max': 0.01, **options}
+        return self.api_client_class(api_key='test-key', base_url=stub.url, **options)
+
+
+class OpenRouterClientTests(StubServerTestCase):
+    def make_client(self, stub, **options):
+        client = super().make_client(stub, **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_rate_limit_is_retried_after_retry_after(self):
+        stub = self.serve(reply(429, {'Retry-After': '0.3'}), reply(200))
+
+        started = time.monotonic()
+        response = self.make_client(stub).chat_completion('prompt')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), COMPLETION)
+        self.assertEqual(stub.requests, 2)
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+
+    def test_server_errors_are_retried(self):
+        stub = self.serve(reply(503), reply(502), reply(200))
+
+        self.assertEqual(self.make_client(stub).chat_completion('prompt').status_code, 200)
+        self.assertEqual(stub.requests, 3)
+
+    def test_last_response_is_returned_once_retries_run_out(self):
+        stub = self.serve(reply(500))
+
+        response = self.make_client(stub, max_retries=2).chat_completion('prompt')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(stub.requests, 3)
+
+    def test_client_errors_are_not_retried(self):
+        stub = self.serve(reply(400), reply(200))
+
+        self.assertEqual(self.make_client(stub).chat_completion('prompt').status_code, 400)
+        self.assertEqual(stub.requests, 1)
+
+    def test_hanging_server_hits_the_deadline(self):
+        stub = self.serve(reply(200, delay=10))
+
+        started = time.monotonic()
+        with self.assertRaises(requests.exceptions.Timeout):
+            self.make_client(stub).chat_completion('prompt', deadline=0.3)
+
+        self.assertLess(time.monotonic() - started, 2)
+
+    def test_retry_after_past_the_deadline_fails_without_waiting(self):
+        stub = self.serve(reply(429, {'Retry-After': '30'}), reply(200))
+
+        started = time.monotonic()
+        with self.assertRaisesMessage(requests.exceptions.Timeout, 'after HTTP 429'):
+            self.make_client(stub).chat_completion('prompt', deadline=1)
+
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(stub.requests, 1)
+
+    def test_stream_holds_its_slot_until_closed(self):
+        stub = self.serve(reply(200))
+        client = self.make_client(stub, max_connections=1)
+
+        stream = client.chat_completion('prompt', stream=True)
+        with self.assertRaises(requests.exceptions.Timeout):
+            client.chat_completion('prompt', deadline=0.2)
+        stream.close()
+        stream.close()
+
+        self.assertEqual(client.chat_completion('prompt').status_code, 200)
+        # Closing twice released the slot only once
+        self.assertTrue(client._slots.acquire(blocking=False))
+        self.assertFalse(client._slots.acquire(blocking=False))
+
+    def test_plain_responses_release_their_slot(self):
+        stub = self.serve(reply(503), reply(200))
+        client = self.make_client(stub, max_connections=1)
+
+        for _ in range(3):
+            self.assertEqual(client.chat_completion('prompt', deadline=1).status_code, 200)
+
+
+class AsyncOpenRouterClientTests(StubServerTestCase):
+    api_client_class = AsyncOpenRouterClient
+
+    def call(self, stub, deadline=None, **options):
+        async def main():
+            client = self.make_client(stub, **options)
+            try:
+                response = await client.chat_completion('prompt', deadline=deadline)
+                return response.status, await response.json()
+            finally:
+                await client.close()
+        return asyncio.run(main())
+
+    def test_rate_limit_is_retried_after_retry_after(self):
+        stub = self.serve(reply(429, {'Retry-After': '0.3'}), reply(503), reply(200))
+
+        started = time.monotonic()
+        self.assertEqual(self.call(stub), (200, COMPLETION))
+
+        self.assertEqual(stub.requests, 3)
+        self.assertGreaterEqual(time.monotonic() - started, 0.3)
+
+    def test_last_response_is_returned_once_retries_run_out(self):
+        stub = self.serve(reply(429))
+
+        self.assertEqual(self.call(stub, max_retries=1)[0], 429)
+        self.assertEqual(stub.requests, 2)
+
+    def test_hanging_server_hits_the_deadline(self):
+        stub = self.serve(reply(200, delay=10))
+
+        started = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            self.call(stub, deadline=0.3)
+
+        self.assertLess(time.monotonic() - started, 2)
+
+
+class RetryPolicyTests(SimpleTestCase):
+    def test_retry_after_seconds(self):
+        self.assertEqual(retry_after_seconds({'Retry-After': '2.5'}), 2.5)
+        self.assertEqual(retry_after_seconds({'Retry-After': '-1'}), 0.0)
+        self.assertAlmostEqual(retry_after_seconds({'Retry-After': formatdate(time.time() + 30, usegmt=True)}),
+                               30, delta=2)
+        self.assertIsNone(retry_after_seconds({'Retry-After': 'soon'}))
+        self.assertIsNone(retry_after_seconds({}))
+
+    def test_backoff_delay(self):
+        for attempt in range(6):
+            self.assertLessEqual(backoff_delay(attempt, None, base=0.5, cap=2), min(2, 0.5 * 2 ** attempt))
+        # Retry-After is a floor, even above the cap
+        self.assertEqual(backoff_delay(0, 5, base=0.5, cap=2), 5)
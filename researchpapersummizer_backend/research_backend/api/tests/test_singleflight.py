@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from api.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('Timed out waiting for callers')
+        time.sleep(0.001)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def slow_call(self, result='completion'):
+        def call():
+            self.calls += 1
+            self.release.wait(5)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return call
+
+    def run_concurrently(self, callers, fn):
+        with ThreadPoolExecutor(callers) as pool:
+            futures = [pool.submit(self.flight.do, 'key', fn) for _ in range(callers)]
+            wait_for(lambda: self.flight.stats()['followers'] == callers - 1)
+            self.release.set()
+            return [future.exception() or future.result() for future in futures]
+
+    def test_concurrent_callers_share_one_call(self):
+        results = self.run_concurrently(5, self.slow_call())
+
+        self.assertEqual(results, ['completion'] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.stats(), {'leaders': 1, 'followers': 4, 'in_flight': 0})
+
+    def test_followers_get_the_leaders_exception(self):
+        error = ValueError('upstream failed')
+
+        results = self.run_concurrently(3, self.slow_call(error))
+
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.calls, 1)
+
+    def test_finished_calls_are_forgotten(self):
+        self.release.set()
+
+        self.flight.do('key', self.slow_call('first'))
+
+        self.assertEqual(self.flight.do('key', self.slow_call('second')), 'second')
+        self.assertEqual(self.calls, 2)
+
+    def test_different_keys_do_not_coalesce(self):
+        self.release.set()
+
+        self.assertEqual(self.flight.do('a', lambda: 'A'), 'A')
+        self.assertEqual(self.flight.do('b', lambda: 'B'), 'B')
+        self.assertEqual(self.flight.stats()['leaders'], 2)
+
+
+class AsyncSingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        self.flight = AsyncSingleFlight()
+        self.calls = 0
+
+    async def slow_call(self, release, result='completion'):
+        self.calls += 1
+        await release.wait()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def test_concurrent_callers_share_one_call(self):
+        async def main():
+            release = asyncio.Event()
+            waiters = [asyncio.ensure_future(self.flight.do('key', lambda: self.slow_call(release)))
+                       for _ in range(5)]
+            await asyncio.sleep(0)
+            release.set()
+            return await asyncio.gather(*waiters)
+
+        self.assertEqual(asyncio.run(main()), ['completion'] * 5)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.flight.stats(), {'leaders': 1, 'followers': 4, 'in_flight': 0})
+
+    def test_followers_get_the_leaders_exception(self):
+        async def main():
+            release = asyncio.Event()
+            error = ValueError('upstream failed')
+            waiters = [asyncio.ensure_future(self.flight.do('key', lambda: self.slow_call(release, error)))
+                       for _ in range(3)]
+            await asyncio.sleep(0)
+            release.set()
+            return error, await asyncio.gather(*waiters, return_exceptions=True)
+
+        error, results = asyncio.run(main())
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.calls, 1)
+
+    def test_cancelled_leader_does_not_cancel_followers(self):
+        async def main():
+            release = asyncio.Event()
+            leader = asyncio.ensure_future(self.flight.do('key', lambda: self.slow_call(release)))
+            follower = asyncio.ensure_future(self.flight.do('key', lambda: self.slow_call(release)))
+            await asyncio.sleep(0)
+            leader.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            return leader.cancelled(), await follower
+
+        self.assertEqual(asyncio.run(main()), (True, 'completion'))
+        self.assertEqual(self.calls, 1)
+
+    def test_event_loops_do_not_share_calls(self):
+        async def call():
+            release = asyncio.Event()
+            release.set()
+            return await self.flight.do('key', lambda: self.slow_call(release))
+
+        self.assertEqual([asyncio.run(call()), asyncio.run(call())], ['completion'] * 2)
+        self.assertEqual(self.calls, 2)
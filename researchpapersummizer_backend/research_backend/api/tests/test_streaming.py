@@ -0,0 +1,174 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from api import streaming
+from api.llm_cache import LLMCache
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'llm': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'llm-tests'},
+}
+
+
+def upstream_lines(*deltas):
+    """Raw OpenRouter SSE lines streaming `deltas`."""
+    lines = [b': OPENROUTER PROCESSING', b'data: {"choices": [{"delta": {"role": "assistant"}}]}']
+    for delta in deltas:
+        lines.append(f'data: {json.dumps({"choices": [{"delta": {"content": delta}}]})}'.encode())
+        lines.append(b'')
+    lines.append(b'data: [DONE]')
+    return lines
+
+
+def parse_events(events):
+    """[(event, data)] from SSE strings."""
+    parsed = []
+    for event in events:
+        name, data = event.rstrip('\n').split('\n')
+        parsed.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return parsed
+
+
+class ParsePartialJsonTests(SimpleTestCase):
+    def test_complete_object(self):
+        self.assertEqual(streaming.parse_partial_json('```json\n{"a": 1} trailing'), {'a': 1})
+
+    def test_closes_open_strings_arrays_and_objects(self):
+        self.assertEqual(
+            streaming.parse_partial_json('{"summary": "Folding is", "keywords": ["protein", "fol'),
+            {'summary': 'Folding is', 'keywords': ['protein', 'fol']}
+        )
+        self.assertEqual(streaming.parse_partial_json('{"a": {"b": [1, {"c": "x'), {'a': {'b': [1, {'c': 'x'}]}})
+
+    def test_cuts_back_to_a_comma_inside_a_key(self):
+        self.assertEqual(streaming.parse_partial_json('{"summary": "done", "keyw'), {'summary': 'done'})
+        self.assertEqual(streaming.parse_partial_json('{"summary": "done", "keywords":'), {'summary': 'done'})
+
+    def test_escapes_and_brackets_inside_strings(self):
+        self.assertEqual(streaming.parse_partial_json('{"a": "say \\"{[\\"'), {'a': 'say "{["'})
+        self.assertEqual(streaming.parse_partial_json('{"a": "ends in \\'), {'a': 'ends in '})
+
+    def test_nothing_to_parse(self):
+        for text in ('', 'Sure, here is', '{"', '{"a'):
+            self.assertIsNone(streaming.parse_partial_json(text))
+
+
+class PartialJsonParserTests(SimpleTestCase):
+    TEXT = 'Sure: {"summary": "A \\"quoted\\" [claim], {x}", "keywords": ["protein", "folding"], "n": {"a": [1, 2]}} done'
+
+    def test_any_split_matches_a_whole_parse(self):
+        for size in (1, 3, 7, 40):
+            parser = streaming.PartialJsonParser()
+            for start in range(0, len(self.TEXT), size):
+                parser.feed(self.TEXT[start:start + size])
+                self.assertEqual(parser.value(), streaming.parse_partial_json(self.TEXT[:start + size]))
+
+    def test_each_delta_is_scanned_once(self):
+        parser = streaming.PartialJsonParser()
+        parser.feed('{"a": "x')
+
+        parser.feed('yz", "b": [1')
+
+        self.assertEqual((parser.size, parser.stack, parser.in_string), (20, ['}', ']'], False))
+        self.assertEqual(parser.value(), {'a': 'xyz', 'b': [1]})
+
+
+class DeltaFromLineTests(SimpleTestCase):
+    def test_lines(self):
+        self.assertEqual(streaming.delta_from_line('data: {"choices": [{"delta": {"content": "Hi"}}]}'), 'Hi')
+        self.assertEqual(streaming.delta_from_line(': keep-alive'), '')
+        self.assertEqual(streaming.delta_from_line('data: {"choices": [{"delta": {}}]}'), '')
+        self.assertIsNone(streaming.delta_from_line('data: [DONE]'))
+
+    def test_upstream_error(self):
+        with self.assertRaisesMessage(Exception, 'Rate limited'):
+            streaming.delta_from_line('data: {"error": {"message": "Rate limited"}}')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StreamCompletionTests(SimpleTestCase):
+    def setUp(self):
+        cache = LLMCache()
+        cache.clear()
+        for target, value in (('llm_cache', cache), ('OPENROUTER_API_KEY', 'test-key')):
+            patcher = mock.patch.object(streaming, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = cache
+
+    def stream(self, *deltas, status_code=200, json_response=True):
+        response = mock.Mock(status_code=status_code, text='upstream error')
+        response.iter_lines.return_value = upstream_lines(*deltas)
+        with mock.patch.object(streaming, 'get_client') as get_client:
+            get_client.return_value.chat_completion.return_value = response
+            events = parse_events(streaming.stream_completion(
+                'prompt', json_response, lambda result: {'result': result}, {'demo': True}
+            ))
+        return events, get_client, response
+
+    def test_relays_tokens_partials_and_done(self):
+        with mock.patch.object(streaming, 'PARTIAL_MIN_CHARS', 0):
+            events, _, response = self.stream('{"summary": "Fol', 'ding", "keywords": ["a"', ']}')
+
+        self.assertEqual(events, [
+            ('token', {'text': '{"summary": "Fol'}),
+            ('partial', {'summary': 'Fol'}),
+            ('token', {'text': 'ding", "keywords": ["a"'}),
+            ('partial', {'summary': 'Folding', 'keywords': ['a']}),
+            ('token', {'text': ']}'}),
+            ('done', {'result': {'summary': 'Folding', 'keywords': ['a']}}),
+        ])
+        response.close.assert_called_once()
+
+    def test_partials_are_throttled(self):
+        deltas = ['{"summary": "'] + ['word '] * 2000 + ['"}']
+        parsed = []
+        value = streaming.PartialJsonParser.value
+
+        def record(parser):
+            parsed.append(parser.size)
+            return value(parser)
+
+        with mock.patch.object(streaming.PartialJsonParser, 'value', record):
+            events, _, _ = self.stream(*deltas)
+
+        # Parses happen at geometrically spaced lengths, not on every token
+        self.assertLess(len(parsed), 40)
+        self.assertLess(sum(parsed), 10 * len(''.join(deltas)))
+        partials = [data for name, data in events if name == 'partial']
+        self.assertTrue(partials[-1]['summary'].startswith('word word'))
+        self.assertEqual(events[-1], ('done', {'result': {'summary': 'word ' * 2000}}))
+
+    def test_text_responses_have_no_partials(self):
+        events, _, _ = self.stream('Hello', ' there', json_response=False)
+
+        self.assertEqual([name for name, _ in events], ['token', 'token', 'done'])
+        self.assertEqual(events[-1], ('done', {'result': 'Hello there'}))
+
+    def test_completed_stream_is_cached(self):
+        self.stream('{"a": 1}')
+
+        events, get_client, _ = self.stream('{"a": 2}')
+
+        get_client.assert_not_called()
+        self.assertEqual(events, [('token', {'text': '{"a": 1}'}), ('done', {'result': {'a': 1}})])
+
+    def test_invalid_json_is_an_error_and_not_cached(self):
+        events, _, _ = self.stream('{"a": ')
+
+        self.assertEqual(events[-1][0], 'error')
+        self.assertEqual(self.cache.stats()['sets'], 0)
+
+    def test_rejected_key_falls_back_to_the_demo_body(self):
+        events, _, _ = self.stream(status_code=401)
+
+        self.assertEqual(events, [('done', {'demo': True})])
+
+    def test_upstream_failure_is_an_error_event(self):
+        events, _, response = self.stream(status_code=500)
+
+        self.assertEqual(events, [('error', {'error': 'OpenRouter API failed: upstream error'})])
+        response.close.assert_called_once()
@@ -1,6 +1,9 @@
-
 from django.urls import path
-from .views import SummaryView, InsightView, SearchView, ChatView, ResearchReadinessView
+from .views import SummaryView, InsightView, SearchView, ChatView, ResearchReadinessView, AnalyzeView
+from .async_views import (
+    AsyncSummaryView, AsyncInsightView, AsyncSearchView, AsyncChatView, AsyncResearchReadinessView,
+    AsyncAnalyzeView
+)
 
 urlpatterns = [
     path('summarize/', SummaryView.as_view(), name='summarize'),
@@ -8,4 +11,13 @@ urlpatterns = [
     path('search/', SearchView.as_view(), name='search'),
     path('chat/', ChatView.as_view(), name='chat'),
     path('research-readiness/', ResearchReadinessView.as_view(), name='research-readiness'),
+    path('analyze/', AnalyzeView.as_view(), name='analyze'),
+
+    # Async variants; serve with an ASGI server (uvicorn research_backend.asgi:application)
+    path('async/summarize/', AsyncSummaryView.as_view(), name='async-summarize'),
+    path('async/insights/', AsyncInsightView.as_view(), name='async-insights'),
+    path('async/search/', AsyncSearchView.as_view(), name='async-search'),
+    path('async/chat/', AsyncChatView.as_view(), name='async-chat'),
+    path('async/research-readiness/', AsyncResearchReadinessView.as_view(), name='async-research-readiness'),
+    path('async/analyze/', AsyncAnalyzeView.as_view(), name='async-analyze'),
 ]
@@ -1,16 +1,22 @@
 
-import os
-import json
-import requests
+import time
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-import dotenv
 from .readiness_service import evaluate_research_readiness
-
-dotenv.load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
-
-OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+from .llm_cache import llm_cache
+from .singleflight import llm_flight
+from .openrouter_client import OPENROUTER_API_KEY, DEFAULT_MODEL as OPENROUTER_MODEL, get_client, parse_content
+from .analysis import analysis_timeout, combine, requested_parts, run_parts, skipped_parts
+from .chunking import analyze_chunked
+from .params import last_message_content, request_flag
+from . import metrics, timing
+from .streaming import event_stream_response, stream_completion
+from .prompts import (
+    DEMO_CHAT, DEMO_INSIGHTS, DEMO_READINESS, DEMO_SUMMARY,
+    demo_search_answer, insight_prompt, search_prompt, summary_prompt
+)
 
 if not OPENROUTER_API_KEY:
     print("Warning: OPENROUTER_API_KEY not found in environment variables.")
@@ -19,41 +25,57 @@ def call_openrouter_api(prompt, json_response=False):
     if not OPENROUTER_API_KEY:
          raise Exception("OpenRouter API key not configured")
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "HTTP-Referer": "http://localhost:8000",
-        "X-Title": "Research Insight Hub",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "model": "google/gemini-2.0-flash-001",
-        "messages": [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    }
-
-    response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=payload)
+    # Repeat prompts are answered from the response cache
+    cache_key = llm_cache.make_key(OPENROUTER_MODEL, prompt, 'json' if json_response else 'text')
+    with timing.stage('llm_cache'):
+        content = llm_cache.get(cache_key)
+    metrics.observe_cache(OPENROUTER_MODEL, hit=content is not None)
+    if content is not None:
+        return parse_content(content, json_response)[1]
+
+    # Identical prompts already in flight share that one upstream call
+    with timing.stage('llm'):
+        return llm_flight.do(cache_key, lambda: _fetch_and_cache(prompt, cache_key, json_response))
+
+def _fetch_and_cache(prompt, cache_key, json_response):
+    content = _fetch_completion(prompt)
+    if content is None:
+        return None
+
+    try:
+        content, result = parse_content(content, json_response)
+    except ValueError:
+        metrics.observe_parse_failure(OPENROUTER_MODEL)
+        raise
+
+    # Only responses that parsed are cached
+    llm_cache.set(cache_key, content)
+    return result
+
+def call_openrouter_json(prompt):
+    return call_openrouter_api(prompt, json_response=True)
+
+def _fetch_completion(prompt):
+    started = time.perf_counter()
+    try:
+        response = get_client().chat_completion(prompt, model=OPENROUTER_MODEL)
+    except Exception:
+        metrics.observe_llm(OPENROUTER_MODEL, 'error', time.perf_counter() - started)
+        raise
+    elapsed = time.perf_counter() - started
 
     if response.status_code != 200:
         # Check for 401 specifically to enable fallback/demo mode if needed
         if response.status_code == 401:
+             metrics.observe_llm(OPENROUTER_MODEL, 'fallback', elapsed)
              print("OpenRouter API 401 Error: Invalid Key. returning None to trigger fallback.")
              return None
+        metrics.observe_llm(OPENROUTER_MODEL, 'error', elapsed)
         raise Exception(f"OpenRouter API failed: {response.text}")
 
     data = response.json()
-    content = data['choices'][0]['message']['content']
-
-    if json_response:
-        # Clean up potential markdown code blocks
-        content = content.replace('```json', '').replace('```', '').strip()
-        return json.loads(content)
-    
-    return content
+    metrics.observe_llm(OPENROUTER_MODEL, 'ok', elapsed, data.get('usage'))
+    return data['choices'][0]['message']['content']
 
 class SummaryView(APIView):
     def post(self, request):
@@ -61,32 +83,22 @@ class SummaryView(APIView):
         if not text:
             return Response({'error': 'No text provided'}, status=status.HTTP_400_BAD_REQUEST)
         
+        if request_flag(request.data, 'stream'):
+            return event_stream_response(
+                stream_completion(summary_prompt(text), True, lambda result: result, DEMO_SUMMARY)
+            )
+        
         try:
-            prompt = f"""Analyze the following research paper text and provide a structured summary.
-            Return JSON format only. The JSON must have the following keys:
-            - abstract: (string) The abstract of the paper.
-            - findings: (array of strings) Key findings.
-            - methodology: (string) The methodology used.
-            - limitations: (string) Any limitations mentioned.
-
-            Do not hallucinate. Use academic tone.
-            
-            Text: {text[:30000]}"""
-            
-            result = call_openrouter_api(prompt, json_response=True)
+            if request_flag(request.data, 'chunked'):
+                # Long papers are read in full with map-reduce calls
+                result = analyze_chunked('summary', text, call_openrouter_json)
+            else:
+                prompt = summary_prompt(text)
+                result = call_openrouter_api(prompt, json_response=True)
             
             if result is None:
                 # Fallback Mock Data
-                result = {
-                    "abstract": "⚠️ DEMO MODE: The API key provided is invalid (401 Unauthorized). This is a simulated summary to demonstrate the UI layout. The actual paper content was not processed by AI.",
-                    "findings": [
-                        "Finding 1: The application handles API errors gracefully.",
-                        "Finding 2: UI components render correctly even with mock data.",
-                        "Finding 3: User needs to update the OpenRouter API key in .env file."
-                    ],
-                    "methodology": "Simulated response generation for testing purposes.",
-                    "limitations": "No actual AI analysis performed."
-                }
+                result = DEMO_SUMMARY
                 
             return Response(result)
         except Exception as e:
@@ -98,27 +110,21 @@ class InsightView(APIView):
         if not text:
             return Response({'error': 'No text provided'}, status=status.HTTP_400_BAD_REQUEST)
         
+        if request_flag(request.data, 'stream'):
+            return event_stream_response(
+                stream_completion(insight_prompt(text), True, lambda result: result, DEMO_INSIGHTS)
+            )
+        
         try:
-            prompt = f"""Extract deep technical insights from this research paper. 
-            Focus on specific objectives, key concepts, results, and ultimate conclusions.
-            Return JSON format only. The JSON must have the following keys:
-            - keyConcepts: (array of strings) Not just keywords, but actual concepts.
-            - objectives: (array of strings) The goals of the paper.
-            - results: (array of strings) The direct results.
-            - conclusions: (array of strings) The conclusions drawn.
-            
-            Text: {text[:30000]}"""
-            
-            result = call_openrouter_api(prompt, json_response=True)
+            if request_flag(request.data, 'chunked'):
+                result = analyze_chunked('insights', text, call_openrouter_json)
+            else:
+                prompt = insight_prompt(text)
+                result = call_openrouter_api(prompt, json_response=True)
             
             if result is None:
                 # Fallback Mock Data
-                result = {
-                    "keyConcepts": ["Error Handling", "UI Testing", "API Configuration"],
-                    "objectives": ["Demonstrate system resilience", "Guide user to fix configuration"],
-                    "results": ["System is operational in demo mode", "Layout verification successful"],
-                    "conclusions": ["The application is functioning, but requires a valid API key for real AI insights."]
-                }
+                result = DEMO_INSIGHTS
 
             return Response(result)
         except Exception as e:
@@ -131,15 +137,12 @@ class SearchView(APIView):
              return Response({'error': 'No query provided'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-             prompt = f"""Based on the user query "{query}", generate a simulated search response 
-             that looks like it came from a semantic search of research papers.
-             Provide a direct answer based on general knowledge about the potential topic.
-             """
+             prompt = search_prompt(query)
              
              result = call_openrouter_api(prompt, json_response=False)
              
              if result is None:
-                 result = f"⚠️ DEMO SEARCH: We couldn't reach the AI to answer '{query}' because the API key is invalid. Please check your .env file."
+                 result = demo_search_answer(query)
                  
              return Response({'answer': result})
         except Exception as e:
@@ -150,14 +153,23 @@ class ChatView(APIView):
         messages = request.data.get('messages', [])
         if not messages:
             return Response({'error': 'No messages provided'}, status=status.HTTP_400_BAD_REQUEST)
+        last_message = last_message_content(messages)
+        if last_message is None:
+            return Response(
+                {'error': 'messages must be a list of objects with a string "content"'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if request_flag(request.data, 'stream'):
+            return event_stream_response(stream_completion(
+                last_message, False, lambda result: {'response': result}, {'response': DEMO_CHAT}
+            ))
         
         try:
-            last_message = messages[-1].get('content', '')
-            
             result = call_openrouter_api(last_message, json_response=False)
             
             if result is None:
-                result = "I'm sorry, but I cannot process your request right now because the OpenRouter API Key is invalid. I am running in Demo Mode. Please update the key in your .env file."
+                result = DEMO_CHAT
 
             return Response({'response': result})
         except Exception as e:
@@ -191,36 +203,12 @@ class ResearchReadinessView(APIView):
         
         try:
             # Call readiness evaluation service
-            result = evaluate_research_readiness(text)
+            result = evaluate_research_readiness(text, chunked=request_flag(request.data, 'chunked'))
             
             # Handle fallback for invalid API key
             if result is None:
                 # Return demo/fallback response
-                result = {
-                    "novelty_score": 75,
-                    "technical_depth_score": 70,
-                    "experimental_rigor_score": 65,
-                    "literature_coverage_score": 68,
-                    "publication_readiness_score": 72,
-                    "strengths": [
-                        "⚠️ DEMO MODE: API key is invalid (401 Unauthorized)",
-                        "This is a simulated evaluation to demonstrate the response structure",
-                        "Please update OPENROUTER_API_KEY in your .env file"
-                    ],
-                    "weaknesses": [
-                        "No actual AI analysis performed",
-                        "Scores are placeholder values"
-                    ],
-                    "suggestions": [
-                        "Configure valid OpenRouter API key",
-                        "Retry the request after updating credentials"
-                    ],
-                    "suitable_venues": [
-                        "Demo Venue 1",
-                        "Demo Venue 2"
-                    ],
-                    "final_verdict": "Not Ready"
-                }
+                result = DEMO_READINESS
             
             return Response(result, status=status.HTTP_200_OK)
             
@@ -229,3 +217,58 @@ class ResearchReadinessView(APIView):
                 {'error': f'Evaluation failed: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+class AnalyzeView(APIView):
+    """
+    POST /api/analyze/
+
+    Summary, insights and readiness evaluation of one text in a single
+    request. The parts run concurrently, so latency is close to the slowest
+    one. Optional fields: "parts" (subset of summary, insights, readiness)
+    and "chunked". Parts that fail or time out are listed under "errors".
+    """
+    def post(self, request):
+        text = request.data.get('text', '')
+        if not text:
+            return Response({'error': 'No text provided'}, status=status.HTTP_400_BAD_REQUEST)
+
+        parts = requested_parts(request.data.get('parts'))
+        if parts is None:
+            return Response(
+                {'error': 'Unknown analysis part. Choose from summary, insights, readiness.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        chunked = request_flag(request.data, 'chunked')
+        jobs = {
+            'summary': lambda: (
+                analyze_chunked('summary', text, call_openrouter_json) if chunked
+                else call_openrouter_json(summary_prompt(text))
+            ),
+            'insights': lambda: (
+                analyze_chunked('insights', text, call_openrouter_json) if chunked
+                else call_openrouter_json(insight_prompt(text))
+            ),
+            'readiness': lambda: evaluate_research_readiness(text, chunked=chunked),
+        }
+        errors = skipped_parts(text, parts)
+        results, failures = run_parts(
+            {name: jobs[name] for name in parts if name not in errors}, analysis_timeout()
+        )
+        errors.update(failures)
+
+        body, code = combine(results, errors)
+        return Response(body, status=code)
+
+class MetricsView(APIView):
+    """
+    GET /metrics
+
+    LLM latency, token, cache and fallback metrics of every worker in the
+    Prometheus text format. Internal only: requires METRICS_TOKEN as a
+    bearer token, or a loopback client if it is unset.
+    """
+    def get(self, request):
+        if not metrics.authorized(request):
+            return Response({'error': 'Metrics are only served internally'}, status=status.HTTP_403_FORBIDDEN)
+        return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
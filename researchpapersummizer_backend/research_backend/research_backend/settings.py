@@ -46,9 +46,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.timing.ServerTimingMiddleware',
+    'api.metrics.MetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'research_backend.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -137,3 +139,52 @@ if not DEBUG:
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# OpenRouter client: pooled keep-alive connections, per-call deadline and retries
+OPENROUTER_BASE_URL = os.environ.get('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1')
+OPENROUTER_MAX_CONNECTIONS = int(os.environ.get('OPENROUTER_MAX_CONNECTIONS', 20))
+# Connection cap for the async views' client (one per event loop)
+OPENROUTER_ASYNC_MAX_CONNECTIONS = int(os.environ.get('OPENROUTER_ASYNC_MAX_CONNECTIONS', 500))
+OPENROUTER_MAX_RETRIES = int(os.environ.get('OPENROUTER_MAX_RETRIES', 3))
+OPENROUTER_DEADLINE = float(os.environ.get('OPENROUTER_DEADLINE', 60))
+
+# Chunked (map-reduce) analysis of papers longer than one prompt; LLM_MAX_CHUNKS
+# is the most partial results one reduce call merges
+LLM_CHUNK_CHARS = int(os.environ.get('LLM_CHUNK_CHARS', 24000))
+LLM_MAX_CHUNKS = int(os.environ.get('LLM_MAX_CHUNKS', 16))
+LLM_CHUNK_CONCURRENCY = int(os.environ.get('LLM_CHUNK_CONCURRENCY', 6))
+
+# Deadline for the combined analyze/ endpoint; parts still running are reported as timed out
+ANALYZE_TIMEOUT = float(os.environ.get('ANALYZE_TIMEOUT', 90))
+
+# Per-stage request timings (api/timing.py): Server-Timing response header,
+# and a log line for requests slower than SLOW_REQUEST_MS (0 disables)
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'True') == 'True'
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 1000)) or None
+
+# Prometheus metrics (api/metrics.py): each worker writes a snapshot here and
+# /metrics sums the snapshots of all live workers
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(BASE_DIR, '.metrics'))
+METRICS_FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 1.0))
+# /metrics must stay internal: scrapers send "Authorization: Bearer <token>";
+# when unset, only loopback clients are answered
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# LLM response cache: an in-process LRU in front of the persistent "llm" cache
+LLM_CACHE_TTL = int(os.environ.get('LLM_CACHE_TTL', 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 512))
+LLM_CACHE_MAX_BYTES = int(os.environ.get('LLM_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'llm': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('LLM_CACHE_DIR', os.path.join(BASE_DIR, '.llm_cache')),
+        'TIMEOUT': LLM_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('LLM_CACHE_PERSISTENT_MAX_ENTRIES', 5000)),
+        },
+    },
+}
+